@@ -0,0 +1,49 @@
+"""
+Benchmark deep attribute access on a datamodel.
+
+Times ``model.meta.exposure.start_time`` and counts the nodes created by it.
+
+Usage::
+
+    python benchmarks/bench_access.py [--number N]
+"""
+
+import argparse
+import timeit
+
+from roman_datamodels import datamodels
+from roman_datamodels._stnode import DNode
+
+
+def main(number):
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    node = model._instance
+
+    def access():
+        return node.meta.exposure.start_time
+
+    times = timeit.repeat(access, number=number, repeat=5)
+    print(f"node.meta.exposure.start_time: min {min(times) / number * 1e6:.2f}us over 5 runs of {number}")
+
+    created = 0
+    init = DNode.__init__
+
+    def counting_init(self, *args, **kwargs):
+        nonlocal created
+        created += 1
+        init(self, *args, **kwargs)
+
+    DNode.__init__ = counting_init
+    try:
+        for _ in range(number):
+            access()
+    finally:
+        DNode.__init__ = init
+    print(f"nodes created per access: {created / number:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=100_000, help="number of accesses per run")
+    args = parser.parse_args()
+    main(args.number)
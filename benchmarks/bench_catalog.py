@@ -0,0 +1,54 @@
+"""
+Benchmark creating a large source catalog and looking up its column definitions.
+
+Times creating a multiband catalog with many aperture radii and bands (empty and
+preallocated with rows), and looking up the definition of each of its columns
+(first and repeated lookups).
+
+Usage::
+
+    python benchmarks/bench_catalog.py [--radii N] [--bands N] [--nrows N]
+"""
+
+import argparse
+import time
+
+from roman_datamodels import datamodels
+from roman_datamodels._stnode import _mixins
+
+
+def main(radii, bands, nrows):
+    aperture_radii = list(range(radii))
+    filters = [f"f{band:03d}" for band in range(100, 100 + bands)]
+    model = datamodels.MultibandSourceCatalogModel.create_fake_data()
+
+    for rows in (0, nrows):
+        times = []
+        for _ in range(5):
+            start = time.perf_counter()
+            catalog = model.create_empty_catalog(aperture_radii=aperture_radii, filters=filters, nrows=rows)
+            times.append(time.perf_counter() - start)
+        print(f"create catalog of {len(catalog.colnames)} columns x {rows} rows: min {min(times) * 1e3:.1f}ms over 5 runs")
+    names = catalog.colnames
+
+    _mixins._get_column_definitions.cache_clear()
+    start = time.perf_counter()
+    for name in names:
+        model.get_column_definition(name)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in names:
+        model.get_column_definition(name)
+    repeated = time.perf_counter() - start
+
+    print(f"{len(names)} columns: first lookup {first * 1e3:.1f}ms, repeated {repeated * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--radii", type=int, default=20, help="number of aperture radii")
+    parser.add_argument("--bands", type=int, default=10, help="number of bands")
+    parser.add_argument("--nrows", type=int, default=100_000, help="number of preallocated rows")
+    args = parser.parse_args()
+    main(args.radii, args.bands, args.nrows)
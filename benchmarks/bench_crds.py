@@ -0,0 +1,65 @@
+"""
+Benchmark getting the CRDS parameters of many files.
+
+Writes ``--files`` small ``ImageModel`` files to a temporary directory and times
+opening each of them to call ``get_crds_parameters`` against
+``scan_crds_parameters`` (with one process and with a process pool).
+
+Usage::
+
+    python benchmarks/bench_crds.py [--files N] [--workers N]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from roman_datamodels import datamodels
+
+
+def _write_files(directory, count):
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    paths = []
+    for index in range(count):
+        path = Path(directory) / f"file{index}.asdf"
+        model.meta.filename = path.name
+        model.save(path)
+        paths.append(path)
+    return paths
+
+
+def _open_models(paths):
+    for path in paths:
+        with datamodels.open(path) as model:
+            model.get_crds_parameters()
+
+
+def _scan(paths, workers):
+    durations = [result.duration for result in datamodels.scan_crds_parameters(paths, max_workers=workers)]
+    return max(durations)
+
+
+def main(count, workers):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = _write_files(directory, count)
+
+        start = time.perf_counter()
+        _open_models(paths)
+        print(f"open + get_crds_parameters: {time.perf_counter() - start:.2f}s for {count} files")
+
+        for n_workers in (1, workers):
+            start = time.perf_counter()
+            slowest = _scan(paths, n_workers)
+            print(
+                f"scan_crds_parameters (max_workers={n_workers}): {time.perf_counter() - start:.2f}s "
+                f"for {count} files, slowest file {slowest * 1e3:.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=200, help="number of files to scan")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes for the pool")
+    args = parser.parse_args()
+    main(args.files, args.workers)
@@ -0,0 +1,37 @@
+"""
+Benchmark creating datamodels from their schemas.
+
+Times ``create_minimal`` and ``create_fake_data`` for a few of the larger
+models (after a warm-up call so that schema loading is not included).
+
+Usage::
+
+    python benchmarks/bench_create.py [--repeat N] [--models RampModel ImageModel ...]
+"""
+
+import argparse
+import timeit
+
+from roman_datamodels import datamodels
+
+_MODELS = ("RampModel", "ImageModel", "MosaicModel", "ScienceRawModel")
+
+
+def main(models, repeat):
+    for name in models:
+        model_class = getattr(datamodels, name)
+        for method in ("create_minimal", "create_fake_data"):
+            create = getattr(model_class, method)
+            # Warm up the schema caches
+            create()
+
+            times = timeit.repeat(create, number=1, repeat=repeat)
+            print(f"{name}.{method}: min {min(times) * 1e3:.2f}ms over {repeat} runs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="number of times to create each model")
+    parser.add_argument("--models", nargs="+", default=_MODELS, help="names of the models to create")
+    args = parser.parse_args()
+    main(args.models, args.repeat)
@@ -0,0 +1,53 @@
+"""
+Benchmark comparing two models by their content digests.
+
+Times ``assert_node_equal`` on two copies of a model against computing the content
+digests of both, with one and several threads, and the cached digest of a model
+opened read-only.
+
+Usage::
+
+    python benchmarks/bench_digest.py [--shape N] [--threads N]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from roman_datamodels import datamodels
+from roman_datamodels.testing import assert_node_equal
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(shape, threads):
+    model = datamodels.ImageModel.create_fake_data(shape=(shape, shape))
+    model.data[:] = np.random.default_rng(0).random((shape, shape), dtype=np.float32)
+    other = model.copy()
+
+    print(f"assert_node_equal: {timed(lambda: assert_node_equal(model._instance, other._instance)) * 1e3:.1f}ms")
+    for max_workers in sorted({1, threads}):
+        elapsed = timed(lambda workers=max_workers: model.content_digest(workers) == other.content_digest(workers))
+        print(f"content digests ({max_workers} threads): {elapsed * 1e3:.1f}ms")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "model.asdf"
+        model.save(path, all_array_compression=None)
+        with datamodels.open(path, readonly=True) as opened:
+            print(f"read-only model, first digest: {timed(opened.content_digest) * 1e3:.1f}ms")
+            print(f"read-only model, cached digest: {timed(opened.content_digest) * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shape", type=int, default=4088, help="size of the (square) arrays")
+    parser.add_argument("--threads", type=int, default=4, help="number of hashing threads")
+    args = parser.parse_args()
+    main(args.shape, args.threads)
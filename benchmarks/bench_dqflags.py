@@ -0,0 +1,64 @@
+"""
+Benchmark decoding and counting DQ flags on full 4088x4088 frames.
+
+Compares `dqflags.count_flags` and `dqflags.decode_flags` with a per-flag
+``dq & flag`` loop, on a memory mapped ``dq`` frame and ``groupdq`` cube.
+
+Usage::
+
+    python benchmarks/bench_dqflags.py [--ngroups N]
+"""
+
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+from roman_datamodels import dqflags
+
+SHAPE = (4088, 4088)
+
+
+def _memmap(path, dtype, shape, rng):
+    array = np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+    bits = 8 * np.dtype(dtype).itemsize
+    for index in np.ndindex(shape[:-2]):
+        # Sparse flags: each bit is set in about 1/8 of the pixels
+        plane = rng.integers(0, 2**bits, SHAPE, dtype=np.uint64)
+        plane &= rng.integers(0, 2**bits, SHAPE, dtype=np.uint64)
+        plane &= rng.integers(0, 2**bits, SHAPE, dtype=np.uint64)
+        array[index] = plane
+    array.flush()
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+def _report(label, function):
+    times = timeit.repeat(function, number=1, repeat=3)
+    print(f"{label:<40} min {min(times):.3f}s over 3 runs")
+
+
+def main(ngroups):
+    rng = np.random.default_rng(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        arrays = {
+            "dq": (_memmap(Path(tmp) / "dq.dat", np.uint32, SHAPE, rng), dqflags.pixel),
+            "groupdq": (_memmap(Path(tmp) / "groupdq.dat", np.uint8, (ngroups, *SHAPE), rng), dqflags.group),
+        }
+        for name, (dq, flags) in arrays.items():
+            print(f"{name} {dq.shape} {dq.dtype}")
+            _report(
+                "per-flag count_nonzero(dq & flag)", lambda dq=dq, flags=flags: {f.name: np.count_nonzero(dq & f) for f in flags}
+            )
+            _report("count_flags", lambda dq=dq: dqflags.count_flags(dq))
+            _report("per-flag (dq & flag) != 0", lambda dq=dq, flags=flags: {f.name: (dq & f) != 0 for f in flags})
+            _report("decode_flags", lambda dq=dq: dqflags.decode_flags(dq))
+            del dq
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ngroups", type=int, default=6, help="number of groups of the groupdq cube")
+    args = parser.parse_args()
+    main(args.ngroups)
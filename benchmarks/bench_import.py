@@ -0,0 +1,51 @@
+"""
+Benchmark the time it takes to import roman_datamodels.
+
+Each import is run in a fresh interpreter, first with an empty (cold) on-disk
+cache and then with the (warm) cache populated by the cold imports.
+
+Usage::
+
+    python benchmarks/bench_import.py [--repeat N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_IMPORT = "import roman_datamodels.datamodels"
+
+
+def _time_import(env):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", _IMPORT], env=env, check=True)  # noqa: S603
+    return time.perf_counter() - start
+
+
+def main(repeat):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {**os.environ, "ROMAN_DATAMODELS_CACHE_DIR": cache_dir}
+        env.pop("ROMAN_DATAMODELS_DISABLE_CACHE", None)
+
+        cold = []
+        for _ in range(repeat):
+            # Clear the cache so every cold import has to rebuild it
+            for root, _, files in os.walk(cache_dir):
+                for name in files:
+                    os.remove(os.path.join(root, name))
+            cold.append(_time_import(env))
+
+        warm = [_time_import(env) for _ in range(repeat)]
+
+    for label, times in (("cold cache", cold), ("warm cache", warm)):
+        print(f"{label}: median {statistics.median(times):.3f}s, min {min(times):.3f}s over {repeat} runs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="number of imports to time for each case")
+    main(parser.parse_args().repeat)
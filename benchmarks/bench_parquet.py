@@ -0,0 +1,99 @@
+"""
+Benchmark writing a large source catalog to Parquet.
+
+Fills a ``MosaicSourceCatalogModel`` with ``--rows`` random rows and times
+``to_parquet`` with a few settings, against building one in-memory table
+and writing it uncompressed. Each setting is run in its own process so that
+the peak RSS (above that of the process with the catalog) can be measured.
+
+Usage::
+
+    python benchmarks/bench_parquet.py [--rows N]
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from astropy.table import Table
+
+from roman_datamodels import datamodels
+
+_SETTINGS = {
+    "single table, uncompressed": None,
+    "streamed, uncompressed": {"compression": None},
+    "streamed, snappy": {"compression": "snappy"},
+    "streamed, zstd": {"compression": "zstd"},
+    "streamed, zstd, no dictionary": {"compression": "zstd", "use_dictionary": False},
+}
+
+
+def _model(rows):
+    rng = np.random.default_rng(42)
+    model = datamodels.MosaicSourceCatalogModel.create_fake_data()
+    empty = model.source_catalog
+    table = Table(meta=empty.meta)
+    for name in empty.colnames:
+        dtype = empty[name].dtype
+        if dtype.kind == "f":
+            # Measurements with a few significant digits
+            data = np.round(rng.normal(20, 2, rows), 3).astype(dtype)
+        elif dtype.kind == "b":
+            data = rng.random(rows) < 0.1
+        else:
+            data = rng.integers(0, 100, rows).astype(dtype)
+        table[name] = data
+        table[name].unit = empty[name].unit
+        table[name].description = empty[name].description
+    model.source_catalog = table
+    return model
+
+
+def _write_table(model, path):
+    """Build a single table of copies of the columns (as to_parquet used to)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    catalog = model.source_catalog
+    table = pa.Table.from_arrays([np.array(catalog[name]) for name in catalog.colnames], names=catalog.colnames)
+    pq.write_table(table, path, compression=None)
+
+
+def _run(setting, rows):
+    model = _model(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "catalog.parquet"
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        if _SETTINGS[setting] is None:
+            _write_table(model, path)
+        else:
+            model.to_parquet(path, **_SETTINGS[setting])
+        elapsed = time.perf_counter() - start
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+        size = path.stat().st_size
+    print(
+        f"{setting:<28} {elapsed:6.2f}s {rows / elapsed / 1e6:6.2f}M rows/s "
+        f"peak RSS +{peak / 1024:7.0f}MB file {size / 2**20:7.0f}MB"
+    )
+
+
+def main(rows):
+    for setting in _SETTINGS:
+        subprocess.run([sys.executable, __file__, "--rows", str(rows), "--setting", setting], check=True)  # noqa: S603
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000, help="number of rows of the catalog")
+    parser.add_argument("--setting", choices=_SETTINGS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.setting is None:
+        main(args.rows)
+    else:
+        _run(args.setting, args.rows)
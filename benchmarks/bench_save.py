@@ -0,0 +1,63 @@
+"""
+Benchmark saving a large ``RampModel``.
+
+Writes a ``RampModel`` of ``--ngroups`` full 4088x4088 frames (filled with
+Poisson ramps and a few DQ flags) with lz4 compressed on one thread and on
+``--threads`` threads, and with the ``dq`` arrays compressed with zlib.
+
+Usage::
+
+    python benchmarks/bench_save.py [--ngroups N] [--threads N]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from roman_datamodels import datamodels, dqflags
+
+
+def _model(ngroups):
+    rng = np.random.default_rng(42)
+    shape = (ngroups, 4096, 4096)
+    model = datamodels.RampModel.create_fake_data(shape=(ngroups, 8, 8))
+    model.data = (rng.integers(9000, 11000, shape[1:]) + np.cumsum(rng.poisson(30, shape), axis=0)).astype(np.float32)
+    model.pixeldq = np.zeros(shape[1:], dtype=np.uint32)
+    model.groupdq = np.zeros(shape, dtype=np.uint8)
+    model.amp33 = np.zeros((ngroups, 4096, 128), dtype=np.uint16)
+    for side, side_shape in (("left", (4096, 4)), ("right", (4096, 4)), ("top", (4, 4096)), ("bottom", (4, 4096))):
+        model[f"border_ref_pix_{side}"] = np.zeros((ngroups, *side_shape), dtype=np.float32)
+        model[f"dq_border_ref_pix_{side}"] = np.zeros(side_shape, dtype=np.uint32)
+
+    index = rng.integers(0, 4096, (2, 100_000))
+    model.pixeldq[tuple(index)] = dqflags.pixel.HOT
+    model.groupdq[:, index[0], index[1]] = dqflags.group.JUMP_DET
+    return model
+
+
+def main(ngroups, threads):
+    model = _model(ngroups)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ramp.asdf"
+        for label, kwargs in (
+            ("lz4, 1 thread", {"compression_threads": 1}),
+            (f"lz4, {threads} threads", {"compression_threads": threads}),
+            (
+                f"lz4, {threads} threads, zlib dq",
+                {"compression_threads": threads, "array_compression": {"pixeldq": "zlib", "groupdq": "zlib"}},
+            ),
+        ):
+            start = time.perf_counter()
+            model.save(path, **kwargs)
+            print(f"{label:<32} {time.perf_counter() - start:.2f}s {path.stat().st_size / 2**20:.0f}MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ngroups", type=int, default=6, help="number of groups of the ramp")
+    parser.add_argument("--threads", type=int, default=4, help="number of compression threads")
+    args = parser.parse_args()
+    main(args.ngroups, args.threads)
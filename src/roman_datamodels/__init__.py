@@ -1,5 +1,13 @@
-from ._stnode import get_latest_schema
+from ._stnode import clear_template_cache, get_latest_schema, get_schema_uris, prewarm_schema_cache
 from ._version import version as __version__
 from .datamodels import DataModel, open
 
-__all__ = ["DataModel", "__version__", "get_latest_schema", "open"]
+__all__ = [
+    "DataModel",
+    "__version__",
+    "clear_template_cache",
+    "get_latest_schema",
+    "get_schema_uris",
+    "open",
+    "prewarm_schema_cache",
+]
@@ -6,8 +6,10 @@ The STNode classes and supporting objects generated dynamically at import time
 from __future__ import annotations
 
 from ._converters import *  # noqa: F403
+from ._digest import *  # noqa: F403
 from ._mixins import *  # noqa: F403
 from ._node import *  # noqa: F403
 from ._schema import *  # noqa: F403
 from ._stnode import *  # noqa: F403
 from ._tagged import *  # noqa: F403
+from ._templates import *  # noqa: F403
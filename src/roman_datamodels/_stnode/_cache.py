@@ -0,0 +1,155 @@
+"""
+On-disk cache for the information roman_datamodels derives from RAD at import time.
+    Everything stored here can be recomputed from the installed RAD resources, so the
+    cache is strictly best-effort: any failure to read or write it falls back to
+    recomputing the value.
+
+    The cache location can be controlled with the ``ROMAN_DATAMODELS_CACHE_DIR``
+    environment variable, and the cache can be turned off entirely by setting
+    ``ROMAN_DATAMODELS_DISABLE_CACHE`` to a true value (``1``, ``true``, ``yes``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any
+
+__all__ = ["cache_dir", "cache_key", "read_cache", "write_cache"]
+
+CACHE_DIR_ENV = "ROMAN_DATAMODELS_CACHE_DIR"
+DISABLE_CACHE_ENV = "ROMAN_DATAMODELS_DISABLE_CACHE"
+
+
+def cache_dir() -> Path | None:
+    """
+    Get the directory used for the on-disk cache.
+
+    Returns
+    -------
+    Path or None
+        The cache directory, or None if caching is disabled or no
+        suitable directory can be determined.
+    """
+    if os.environ.get(DISABLE_CACHE_ENV, "").lower() in ("1", "true", "yes"):
+        return None
+
+    if path := os.environ.get(CACHE_DIR_ENV):
+        return Path(path)
+
+    if path := os.environ.get("XDG_CACHE_HOME"):
+        return Path(path) / "roman_datamodels"
+
+    try:
+        return Path.home() / ".cache" / "roman_datamodels"
+    except RuntimeError:
+        # The home directory cannot be determined
+        return None
+
+
+def cache_key(*parts: str | bytes) -> str:
+    """
+    Compute a cache key from the things the cached value depends on.
+
+    Parameters
+    ----------
+    *parts : str or bytes
+        Anything which, if changed, should invalidate the cached value
+        (versions, URIs, file hashes, ...).
+
+    Returns
+    -------
+    str
+        Hex digest identifying the cached value.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode() if isinstance(part, str) else part)
+        # Separate the parts so that ("ab", "c") and ("a", "bc") differ
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+def _cache_path(category: str, key: str) -> Path | None:
+    if (directory := cache_dir()) is None:
+        return None
+
+    return directory / category / f"{key}.json"
+
+
+def read_cache(category: str, key: str) -> Any | None:
+    """
+    Read a value from the on-disk cache.
+
+    Parameters
+    ----------
+    category : str
+        The kind of value being read (e.g. "manifests").
+    key : str
+        The key returned by `cache_key` for the value.
+
+    Returns
+    -------
+    Any or None
+        The cached value or None if it is not available.
+    """
+    if (path := _cache_path(category, key)) is None:
+        return None
+
+    try:
+        return json.loads(path.read_bytes())
+    except (OSError, ValueError):
+        # Missing, unreadable or corrupted cache entries are simply recomputed
+        return None
+
+
+def write_cache(category: str, key: str, value: Any) -> None:
+    """
+    Write a value to the on-disk cache.
+
+    The value is written to a temporary file which is then moved into place
+    so that concurrent processes never observe a partially written entry.
+
+    Parameters
+    ----------
+    category : str
+        The kind of value being written (e.g. "manifests").
+    key : str
+        The key returned by `cache_key` for the value.
+    value : Any
+        A value which can be round-tripped through JSON, anything else is
+        not cached.
+    """
+    if (path := _cache_path(category, key)) is None:
+        return
+
+    try:
+        content = json.dumps(value, separators=(",", ":"))
+    except (TypeError, ValueError):
+        # The value cannot be represented in JSON, so it cannot be cached
+        return
+
+    if json.loads(content) != value:
+        # JSON would silently change the value (e.g. non-string keys or tuples)
+        return
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{key}", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+    except OSError:
+        # A read-only or full file system should not prevent importing
+        return
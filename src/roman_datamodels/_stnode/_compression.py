@@ -0,0 +1,131 @@
+"""
+Parallel lz4 compression of the ASDF blocks.
+    The lz4 blocks are compressed in chunks (of ``compression_block_size`` bytes) with
+    ``lz4.block``, which releases the GIL, so the chunks can be compressed on a thread
+    pool. The chunks are framed as by asdf's own lz4 compressor.
+
+    The compressor has its own (roman) label, so that registering it does not change
+    how the ``lz4`` blocks of other files are written or read. Blocks are only written
+    with it when asked for (more than one thread), and then need roman_datamodels to
+    be read.
+"""
+
+from __future__ import annotations
+
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asdf.extension import Compressor, Extension
+
+__all__ = ["COMPRESSION_EXTENSION_URI", "PARALLEL_LZ4", "CompressionExtension", "ParallelLz4Compressor", "parallel_compression"]
+
+COMPRESSION_EXTENSION_URI = "asdf://stsci.edu/datamodels/roman/extensions/compression-1.0.0"
+
+# The label of the blocks compressed by the compressor (labels are at most 4 bytes)
+PARALLEL_LZ4 = "rlz4"
+
+# asdf's default size of the lz4 chunks
+_LZ4_BLOCK_SIZE = 1 << 22
+
+# The thread pool (and the number of chunks compressed ahead) of the current `parallel_compression`
+_POOL = ContextVar("_POOL", default=None)
+
+
+class ParallelLz4Compressor(Compressor):
+    """
+    lz4 compressor, compressing the chunks of a block on the thread pool of the
+    current `parallel_compression` (in this thread outside of it).
+    """
+
+    label = PARALLEL_LZ4.encode("ascii")
+
+    def compress(self, data, **kwargs):
+        import lz4.block
+
+        kwargs["mode"] = kwargs.get("mode", "default")
+        nelem = kwargs.pop("compression_block_size", _LZ4_BLOCK_SIZE) // data.itemsize
+        chunks = (data[start : start + nelem] for start in range(0, len(data), nelem))
+
+        if (pool := _POOL.get()) is None:
+            for chunk in chunks:
+                yield self._frame(lz4.block.compress(chunk, **kwargs))
+            return
+
+        # Chunks compressed ahead of the one being written, bounding the memory used
+        executor, window = pool
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(lz4.block.compress, chunk, **kwargs))
+            if len(pending) >= window:
+                yield self._frame(pending.popleft().result())
+        while pending:
+            yield self._frame(pending.popleft().result())
+
+    @staticmethod
+    def _frame(compressed):
+        return struct.pack("!I", len(compressed)) + compressed
+
+    def decompress(self, blocks, out, **kwargs):
+        import lz4.block
+
+        nbytes = 0
+        pending = bytearray()
+        for block in blocks:
+            pending += block
+
+            # Decompress the chunks read whole, keep the rest for the next block
+            start = 0
+            with memoryview(pending) as view:
+                while len(view) - start >= 4:
+                    (size,) = struct.unpack_from("!I", view, start)
+                    if len(view) - start - 4 < size:
+                        break
+                    chunk = lz4.block.decompress(view[start + 4 : start + 4 + size], return_bytearray=True, **kwargs)
+                    out[nbytes : nbytes + len(chunk)] = chunk
+                    nbytes += len(chunk)
+                    start += 4 + size
+            del pending[:start]
+
+        return nbytes
+
+
+class CompressionExtension(Extension):
+    """
+    Extension providing the parallel lz4 compressor.
+    """
+
+    extension_uri = COMPRESSION_EXTENSION_URI
+
+    def __init__(self):
+        self._compressors = [ParallelLz4Compressor()]
+
+    @property
+    def compressors(self):
+        return self._compressors
+
+
+@contextmanager
+def parallel_compression(max_workers=1):
+    """
+    Compress the blocks written with the `PARALLEL_LZ4` label within the context
+    on a thread pool.
+
+    Parameters
+    ----------
+    max_workers : int or None
+        The number of threads, if 1 (the default) or None the blocks are compressed
+        in this thread.
+    """
+    if max_workers is None or max_workers <= 1:
+        yield
+        return
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        token = _POOL.set((executor, 2 * max_workers))
+        try:
+            yield
+        finally:
+            _POOL.reset(token)
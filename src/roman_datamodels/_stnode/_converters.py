@@ -4,11 +4,15 @@ The ASDF Converters to handle the serialization/deseialization of the STNode cla
 
 from __future__ import annotations
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import TYPE_CHECKING
 
+import numpy as np
 from asdf.extension import Converter
 from astropy.time import Time
 
+from ._node import CompactList, LazyArray, LazyTable, PackedDQ
 from ._registry import (
     LIST_NODE_CLASSES_BY_PATTERN,
     MANIFEST_TAG_REGISTRY,
@@ -24,12 +28,32 @@ if TYPE_CHECKING:
     from ._tagged import SerializationNode, TaggedListNode, TaggedObjectNode, TaggedScalarNode
 
 __all__ = [
+    "CompactListConverter",
+    "LazyArrayConverter",
+    "LazyTableConverter",
     "TaggedListNodeConverter",
     "TaggedObjectNodeConverter",
     "TaggedScalarNodeConverter",
 ]
 
 
+# If the trees are being converted only to be validated (see `shape_only_validation`)
+_SHAPE_ONLY = ContextVar("_SHAPE_ONLY", default=False)
+
+
+@contextmanager
+def shape_only_validation():
+    """
+    Validate the lazy arrays which have not been allocated (or decoded) within the
+    context by their shape and dtype only, rather than allocating them.
+    """
+    token = _SHAPE_ONLY.set(True)
+    try:
+        yield
+    finally:
+        _SHAPE_ONLY.reset(token)
+
+
 class _RomanConverter(Converter):
     """
     Base class for the roman_datamodels converters.
@@ -37,6 +61,11 @@ class _RomanConverter(Converter):
 
     lazy = True
 
+    def from_yaml_tree(self, node, tag, ctx):
+        # Converters without tags defer the serialization to another converter,
+        #    so they are never used to deserialize
+        raise NotImplementedError("Converter deserialization deferred")
+
 
 class SerializationNodeConverter(_RomanConverter):
     """
@@ -95,9 +124,6 @@ class _TaggedNodeConverter(_RomanConverter):
     def to_yaml_tree(self, obj, tag, ctx):
         return SERIALIZATION_BY_MANIFEST[TAG_MANIFEST_REGISTRY[tag]](obj, tag)
 
-    def from_yaml_tree(self, node, tag, ctx):
-        raise NotImplementedError("Converter deserialization deferred")
-
 
 class TaggedObjectNodeConverter(_TaggedNodeConverter):
     """
@@ -142,3 +168,64 @@ class TaggedScalarNodeConverter(_TaggedNodeConverter):
             node = converter.to_yaml_tree(node, tag, ctx)
 
         return super().to_yaml_tree(node, obj.tag, ctx)
+
+
+class LazyArrayConverter(_RomanConverter):
+    """
+    Converter for the lazy arrays created for fake data and the packed DQ arrays.
+        The array is allocated (or decoded) and then serialized by the ndarray
+        converter. When only validating, the arrays which have not been allocated
+        are stood in for by (unallocated) broadcast arrays of their shape and dtype.
+    """
+
+    tags = ()
+    types = (LazyArray, PackedDQ)
+
+    def select_tag(self, obj, tags, ctx):
+        return None
+
+    def to_yaml_tree(self, obj: LazyArray, tag, ctx):
+        if _SHAPE_ONLY.get() and not obj.materialized:
+            return np.broadcast_to(np.zeros((), dtype=obj.dtype), obj.shape)
+        return obj.materialize()
+
+
+NODE_CONVERTERS[LazyArrayConverter.__name__] = LazyArrayConverter()
+
+
+class LazyTableConverter(_RomanConverter):
+    """
+    Converter for the lazily read tables (of the catalogs opened from Parquet).
+        The table is read and then serialized by the table converter.
+    """
+
+    tags = ()
+    types = (LazyTable,)
+
+    def select_tag(self, obj, tags, ctx):
+        return None
+
+    def to_yaml_tree(self, obj: LazyTable, tag, ctx):
+        return obj.materialize()
+
+
+NODE_CONVERTERS[LazyTableConverter.__name__] = LazyTableConverter()
+
+
+class CompactListConverter(_RomanConverter):
+    """
+    Converter for the compactly stored lists.
+        These are serialized as plain lists.
+    """
+
+    tags = ()
+    types = (CompactList,)
+
+    def select_tag(self, obj, tags, ctx):
+        return None
+
+    def to_yaml_tree(self, obj: CompactList, tag, ctx):
+        return list(obj)
+
+
+NODE_CONVERTERS[CompactListConverter.__name__] = CompactListConverter()
@@ -0,0 +1,233 @@
+"""
+Content digests of node trees.
+    The digest of a tree is built Merkle-style from the digests of its values, so
+    two trees have the same digest when they hold the same content (the keys of
+    the dicts in any order). Arrays are hashed in fixed size chunks, which are
+    hashed on a thread pool (``hashlib`` releases the GIL), and the digests of
+    arrays backed by read-only buffers (such as the memory mapped arrays opened
+    with ``memmap=True, readonly=True``) are cached.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import os
+import weakref
+from collections import deque
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from asdf.tags.core import ndarray
+from astropy.table import Table
+from astropy.time import Time
+from astropy.units import Quantity
+
+from ..dqflags import unpack_bitplanes
+from ._node import DNode, LazyArray, LazyTable, LNode, PackedDQ
+from ._tagged import TaggedListNode, TaggedObjectNode, TaggedScalarNode
+
+__all__ = ["content_digest"]
+
+# The number of bytes of the array chunks which are hashed separately, the digest
+#    of an array depends on it
+DIGEST_CHUNK_SIZE = 1 << 22
+
+# Digests of the read-only arrays, keyed by the id of the array
+_ARRAY_DIGESTS = {}
+
+
+def _hash(*parts):
+    """Hash the concatenated parts"""
+    hasher = hashlib.blake2b(digest_size=32)
+    for part in parts:
+        hasher.update(part)
+    return hasher.digest()
+
+
+def _label(kind, name=""):
+    """The (length prefixed) label of a value in the digest of its container"""
+    label = f"{kind}:{name}".encode()
+    return len(label).to_bytes(4, "little") + label
+
+
+def _cacheable(array):
+    """
+    If the array (and so its buffer) cannot be changed: the array and its bases are
+    read-only and the buffer they end in is read-only (e.g. a read-only memory map).
+        An array owning its data is not, its ``writeable`` flag can be set back.
+    """
+    while isinstance(array, np.ndarray | ndarray.NDArrayType):
+        if isinstance(array, ndarray.NDArrayType):
+            # The array read by asdf (e.g. its memory map)
+            array = array.__array__()
+        if array.flags.writeable:
+            return False
+        array = array.base
+    if array is None:
+        return False
+    try:
+        return memoryview(array).readonly
+    except TypeError:
+        return False
+
+
+class _Digester:
+    """
+    Compute the digest of a node tree, hashing the array chunks on an executor.
+    """
+
+    def __init__(self, executor=None, max_workers=1):
+        self._executor = executor
+        # Chunks hashed ahead of the one being collected, bounding the memory used
+        self._window = 2 * max_workers
+
+    def digest(self, value):
+        """The digest of any value of a node tree"""
+        if isinstance(value, TaggedScalarNode):
+            return _hash(_label("scalar", value.tag), self.digest(type(value).__bases__[0](value)))
+
+        if isinstance(value, PackedDQ) and not value.materialized:
+            # Decode without keeping the decoded array
+            value = unpack_bitplanes(value._planes, value.shape, value.dtype)
+        elif isinstance(value, LazyArray):
+            if not value.materialized:
+                return self._zeros_digest(value.shape, value.dtype)
+            value = value.materialize()
+        elif isinstance(value, LazyTable):
+            value = value.materialize()
+
+        if isinstance(value, Mapping):
+            label = _label("object", value.tag) if isinstance(value, TaggedObjectNode) else _label("dict")
+            # The raw values, so that lazy arrays are not allocated
+            data = value._data if isinstance(value, DNode) else value
+            # The keys are labeled with their type, so that e.g. 1 and "1" differ
+            items = sorted((f"{type(key).__name__}:{key}", self.digest(item)) for key, item in data.items())
+            return _hash(label, *(_label("key", key) + digest for key, digest in items))
+
+        if isinstance(value, Sequence) and not isinstance(value, str | bytes):
+            label = _label("list", value.tag) if isinstance(value, TaggedListNode) else _label("list")
+            data = value.data if isinstance(value, LNode) else value
+            return _hash(label, *(self.digest(item) for item in data))
+
+        if isinstance(value, Time):
+            return _hash(_label("time", value.scale), self.digest(value.jd1), self.digest(value.jd2))
+
+        if isinstance(value, Quantity):
+            return _hash(_label("quantity", str(value.unit)), self.digest(value.value))
+
+        if isinstance(value, Table):
+            columns = (
+                _hash(
+                    _label("column", name), _label("unit", str(column.unit)), self.digest(column.description), self.digest(column)
+                )
+                for name, column in value.columns.items()
+            )
+            return _hash(_label("table"), self.digest(dict(value.meta)), *columns)
+
+        if isinstance(value, np.ma.MaskedArray):
+            return _hash(_label("masked"), self.digest(value.data), self.digest(np.ma.getmaskarray(value)))
+
+        if isinstance(value, np.ndarray | ndarray.NDArrayType):
+            return self._array_digest(np.asarray(value))
+
+        if isinstance(value, np.generic):
+            # Labeled with the numpy type, so that e.g. float32(1) and 1.0 differ
+            return _hash(_label(type(value).__name__), self.digest(value.item()))
+
+        if isinstance(value, datetime.datetime):
+            value = value.isoformat()
+
+        # Other scalars (and objects, such as the WCS) are hashed by their repr
+        return _hash(_label(type(value).__name__), repr(value).encode())
+
+    def _array_digest(self, array):
+        """The digest of an array, cached for read-only arrays"""
+        if (cached := _ARRAY_DIGESTS.get(id(array))) is not None and cached[0]() is array:
+            return cached[1]
+
+        dtype = array.dtype.newbyteorder("=")
+        header = _label("array", f"{dtype.str}{array.shape}")
+        nelem = max(1, DIGEST_CHUNK_SIZE // max(1, dtype.itemsize))
+        flat = array.reshape(-1) if array.flags.c_contiguous else array.flat
+
+        def chunk_digest(start):
+            # Slicing the flat iterator copies the chunk, in C order
+            chunk = flat[start : start + nelem]
+            if chunk.dtype != dtype:
+                chunk = chunk.astype(dtype)
+            return _hash(np.ascontiguousarray(chunk))
+
+        digest = _hash(header, *self._map(chunk_digest, range(0, array.size, nelem)))
+
+        if _cacheable(array):
+            key = id(array)
+            _ARRAY_DIGESTS[key] = (weakref.ref(array, lambda _: _ARRAY_DIGESTS.pop(key, None)), digest)
+        return digest
+
+    def _zeros_digest(self, shape, dtype):
+        """The digest of a zero filled array, without allocating it"""
+        dtype = np.dtype(dtype).newbyteorder("=")
+        header = _label("array", f"{dtype.str}{tuple(shape)}")
+        size = int(np.prod(shape))
+        nelem = max(1, DIGEST_CHUNK_SIZE // max(1, dtype.itemsize))
+
+        # All the full chunks have the same digest
+        nfull, remainder = divmod(size, nelem)
+        chunks = []
+        if nfull:
+            chunks.extend([_hash(bytes(nelem * dtype.itemsize))] * nfull)
+        if remainder:
+            chunks.append(_hash(bytes(remainder * dtype.itemsize)))
+        return _hash(header, *chunks)
+
+    def _map(self, func, args):
+        """Map func over args, on the executor if there is one, keeping the order"""
+        if self._executor is None:
+            yield from map(func, args)
+            return
+
+        pending = deque()
+        for arg in args:
+            pending.append(self._executor.submit(func, arg))
+            if len(pending) >= self._window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def content_digest(node, max_workers=None):
+    """
+    Compute the content digest of a node tree.
+
+    Two trees have the same digest when they hold the same content: the same
+    keys (in any order) and values, with arrays of the same shape, dtype (in
+    any byte order) and data. The types of the keys and of the (numpy) scalars
+    are part of the content. Lazy arrays hash as the zero filled array without
+    being allocated.
+
+    The digests of the arrays backed by read-only buffers are cached, which is
+    only the case for the memory mapped arrays of the models opened with
+    ``memmap=True, readonly=True``: the arrays read into memory, or mapped
+    copy-on-write, can be changed so they are hashed each time.
+
+    Parameters
+    ----------
+    node : DNode, LNode or TaggedScalarNode
+        The root of the tree.
+    max_workers : int or None
+        The number of threads hashing the array chunks (default: the number of
+        CPUs), if 1 the chunks are hashed in the calling thread.
+
+    Returns
+    -------
+    str
+        The hex digest.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        return _Digester().digest(node).hex()
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        return _Digester(executor, max_workers).digest(node).hex()
@@ -1,3 +1,58 @@
+from asdf.extension import Extension
+
+
+class NodeExtensionProxy(Extension):
+    """
+    Lightweight stand-in for one of the STNode ASDF extensions.
+        asdf is handed these instead of the extensions themselves so that
+        an extension is only created (see ``NODE_EXTENSIONS``) once asdf
+        actually needs more than its URI.
+    """
+
+    def __init__(self, manifest_uri):
+        self._manifest_uri = manifest_uri
+
+    @property
+    def _delegate(self):
+        from ._stnode import NODE_EXTENSIONS
+
+        return NODE_EXTENSIONS[self._manifest_uri]
+
+    @property
+    def extension_uri(self):
+        from ._stnode import NODE_EXTENSIONS
+
+        return NODE_EXTENSIONS.extension_uri(self._manifest_uri)
+
+    @property
+    def legacy_class_names(self):
+        return self._delegate.legacy_class_names
+
+    @property
+    def asdf_standard_requirement(self):
+        return self._delegate.asdf_standard_requirement
+
+    @property
+    def tags(self):
+        return self._delegate.tags
+
+    @property
+    def converters(self):
+        return self._delegate.converters
+
+    @property
+    def compressors(self):
+        return self._delegate.compressors
+
+    @property
+    def validators(self):
+        return self._delegate.validators
+
+    @property
+    def yaml_tag_handles(self):
+        return self._delegate.yaml_tag_handles
+
+
 def get_extensions():
     """
     Get the extension instances for the various astropy
@@ -10,6 +65,7 @@ def get_extensions():
     """
     # Importing from ._stnode itself so that all the dynamically created
     #   objects are in fact created
+    from ._compression import CompressionExtension
     from ._stnode import NODE_EXTENSIONS
 
-    return list(NODE_EXTENSIONS.values())
+    return [*(NodeExtensionProxy(manifest_uri) for manifest_uri in NODE_EXTENSIONS), CompressionExtension()]
@@ -4,13 +4,15 @@ Mixin classes for additional functionality for STNode classes
 
 from __future__ import annotations
 
+import functools
 import re
 from copy import deepcopy
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
+import numpy as np
 from asdf.tags.core.ndarray import asdf_datatype_to_numpy_dtype
 
-from ._schema import Builder, _get_keyword, _get_properties
+from ._schema import Builder, _get_keyword, _get_plan_from_tag, _get_properties
 from ._tagged import _get_schema_from_tag
 
 # This is a workaround for MyPy to understand the Mixin classes
@@ -18,6 +20,7 @@ if TYPE_CHECKING:
     from typing import ClassVar, TypeAlias
 
     from astropy.time import Time
+    from astropy.units import UnitBase
 
     from ._tagged import TaggedObjectNode, TaggedScalarNode
 
@@ -173,7 +176,7 @@ class RefFileMixin(_ObjectBase):
             defaults = deepcopy(defaults)
         else:
             defaults = {}
-        schema = _get_schema_from_tag(tag or cls._default_tag)
+        schema = _get_plan_from_tag(tag or cls._default_tag)
         for k, v in schema["properties"].items():
             if v["type"] != "string":
                 continue
@@ -208,6 +211,112 @@ class L3CalStepMixin(L2CalStepMixin):  # same as L2CalStepMixin
     __slots__ = ()
 
 
+class _ColumnDefinitions:
+    """
+    The column definitions of a catalog schema, looked up by column name.
+        The names of the definitions (with their ``~radius~`` and ``~band~``
+        placeholders) are compiled into a single regex, with the definitions
+        tried in order, and the definition found for each name is memoized.
+    """
+
+    def __init__(self, definitions):
+        self._definitions = list(definitions.values())
+        patterns = []
+        for index, def_name in enumerate(definitions):
+            if "~radius~" in def_name:
+                def_name = def_name.replace("~radius~", r"[0-9]{2}")
+            if "_~band~" in def_name:
+                def_name = def_name.replace("_~band~", r"(_f[0-9]{3}|)")
+            if "~band~" in def_name:
+                def_name = def_name.replace("~band~", r"(f[0-9]{3}|)")
+            patterns.append(f"(?P<d{index}>{def_name})")
+        self._regex = re.compile(f"^(?:{'|'.join(patterns)})$")
+        self._lookups = {}
+
+    def lookup(self, name):
+        """The parsed definition of the named column or None"""
+        try:
+            result = self._lookups[name]
+        except KeyError:
+            result = None
+            # The enclosing (named) group of the definition closes last
+            if (match := self._regex.match(name)) is not None and match.lastgroup is not None:
+                definition = self._definitions[int(match.lastgroup[1:])]
+                result = {
+                    "unit": definition["unit"],
+                    "description": definition["description"],
+                    "datatype": asdf_datatype_to_numpy_dtype(
+                        definition["properties"]["data"]["properties"]["datatype"]["enum"][0]
+                    ),
+                }
+            self._lookups[name] = result
+
+        return None if result is None else dict(result)
+
+
+@functools.cache
+def _get_column_definitions(tag):
+    """
+    Get the column definitions (see `_ColumnDefinitions`) of the catalog schema of the tag_uri.
+
+    Parameters
+    ----------
+    tag : str
+        The tag_uri of the catalog schema.
+    """
+    return _ColumnDefinitions(_get_keyword(_get_schema_from_tag(tag)["properties"]["source_catalog"], "definitions"))
+
+
+# The placeholders for the aperture radius and the band in the column name patterns
+_RADIUS_PATTERN = re.compile(r"\[0-9]\{2}")
+_BAND_PATTERN = re.compile(r"\(.*\)")
+
+
+class _ColumnTemplate(NamedTuple):
+    """
+    A column of a catalog schema, with its name pattern (without the anchors).
+    """
+
+    name: str
+    unit: UnitBase | None
+    description: str
+    dtype: np.dtype
+
+
+@functools.cache
+def _get_column_templates(tag):
+    """
+    Get the column templates (see `_ColumnTemplate`) of the catalog schema of the tag_uri.
+
+    The units are parsed here, once, as parsing them dominates creating the columns.
+
+    Parameters
+    ----------
+    tag : str
+        The tag_uri of the catalog schema.
+    """
+    from astropy.units import Unit
+
+    columns_schema = dict(_get_properties(_get_schema_from_tag(tag)["properties"]["source_catalog"]))
+    if "columns" not in columns_schema:
+        return ()
+
+    templates = []
+    for raw_col_def in columns_schema["columns"]["allOf"]:
+        col_def = raw_col_def["not"]["items"]["not"]
+        properties = dict(_get_properties(col_def))
+        unit = _get_keyword(col_def, "unit")
+        templates.append(
+            _ColumnTemplate(
+                name=properties["name"]["pattern"][1:-1],
+                unit=None if unit is None else Unit(unit, parse_strict="silent"),
+                description=_get_keyword(col_def, "description"),
+                dtype=asdf_datatype_to_numpy_dtype(properties["data"]["properties"]["datatype"]["enum"][0]),
+            )
+        )
+    return tuple(templates)
+
+
 class ImageSourceCatalogMixin(_ObjectBase):
     __slots__ = ()
 
@@ -232,58 +341,40 @@ class ImageSourceCatalogMixin(_ObjectBase):
         """
         if name.startswith("forced_"):
             _, name = name.split("forced_", maxsplit=1)
-        definitions = _get_keyword(self.get_schema()["properties"]["source_catalog"], "definitions")
-        for def_name, definition in definitions.items():
-            if "~radius~" in def_name:
-                def_name = def_name.replace("~radius~", r"[0-9]{2}")
-            if "_~band~" in def_name:
-                def_name = def_name.replace("_~band~", r"(_f[0-9]{3}|)")
-            if "~band~" in def_name:
-                def_name = def_name.replace("~band~", r"(f[0-9]{3}|)")
-            if re.match(f"^{def_name}$", name):
-                return {
-                    "unit": definition["unit"],
-                    "description": definition["description"],
-                    "datatype": asdf_datatype_to_numpy_dtype(
-                        definition["properties"]["data"]["properties"]["datatype"]["enum"][0]
-                    ),
-                }
+        return _get_column_definitions(self.tag).lookup(name)
 
     @classmethod
-    def _create_empty_catalog(cls, tag=None, aperture_radii=None, filters=None):
+    def _create_empty_catalog(cls, tag=None, aperture_radii=None, filters=None, nrows=0):
         from astropy.table import Column, Table
 
         aperture_radii = aperture_radii or ["00"]
         filters = filters or ["f184"]
 
-        columns_schema = dict(_get_properties(_get_schema_from_tag(tag or cls._default_tag)["properties"]["source_catalog"]))
+        substitutions = [
+            (_RADIUS_PATTERN, aperture_radii),
+            (_BAND_PATTERN, filters),
+        ]
         columns = []
-
-        if "columns" in columns_schema:
-            for raw_col_def in columns_schema["columns"]["allOf"]:
-                col_def = raw_col_def["not"]["items"]["not"]
-                properties = dict(_get_properties(col_def))
-                name_regex = properties["name"]["pattern"]
-                unit = _get_keyword(col_def, "unit")
-                description = _get_keyword(col_def, "description")
-                dtype = asdf_datatype_to_numpy_dtype(properties["data"]["properties"]["datatype"]["enum"][0])
-
-                name_queue = [name_regex[1:-1]]
-
-                substitutions = [
-                    (r"\[0-9]\{2}", aperture_radii),
-                    (r"\(.*\)", filters),
-                ]
-                while name_queue:
-                    name = name_queue.pop()
-                    for regex, values in substitutions:
-                        if re.search(regex, name):
-                            name_queue.extend(re.sub(regex, value, name) for value in values)
-                            break
-                    else:
-                        columns.append(Column([], unit=unit, description=description, dtype=dtype, name=name))
-
-        return Table(columns)
+        for template in _get_column_templates(tag or cls._default_tag):
+            name_queue = [template.name]
+            while name_queue:
+                name = name_queue.pop()
+                for regex, values in substitutions:
+                    if regex.search(name):
+                        name_queue.extend(regex.sub(value, name) for value in values)
+                        break
+                else:
+                    columns.append(
+                        Column(
+                            np.zeros(nrows, dtype=template.dtype),
+                            unit=template.unit,
+                            description=template.description,
+                            name=name,
+                            copy=False,
+                        )
+                    )
+
+        return Table(columns, copy=False)
 
     @classmethod
     def _create_fake_data(cls, defaults=None, shape=None, builder=None, *, tag=None):
@@ -5,8 +5,12 @@ Base node classes for all STNode classes.
 
 from __future__ import annotations
 
+import array
 import datetime
-from collections.abc import MutableMapping, MutableSequence
+import functools
+import itertools
+import weakref
+from collections.abc import MutableMapping, MutableSequence, Sequence
 from typing import TYPE_CHECKING
 
 import numpy as np
@@ -14,21 +18,300 @@ from asdf.lazy_nodes import AsdfDictNode, AsdfListNode
 from asdf.tags.core import ndarray
 from astropy.time import Time
 
-__all__ = ["DNode", "LNode"]
+from ..dqflags import pack_bitplanes, unpack_bitplanes
+
+__all__ = ["CompactList", "DNode", "LNode", "LazyArray", "LazyTable", "PackedDQ", "ReadOnlyDNode", "compact_lists"]
+
+# Source of the generations of the nodes, each node gets a new one whenever it (or any of
+#    its descendants) is modified so that values computed from a node (like the flattened
+#    metadata of a model) can be cached until it changes
+_GENERATIONS = itertools.count()
+
+# The wrapper of each (alive) wrapped dict or list by id, so that the trees sharing a
+#    container (e.g. shallow copies) share its wrapper, and so are all told of its changes
+_CONTAINER_WRAPPERS = weakref.WeakValueDictionary()
+
+
+class LazyArray:
+    """
+    Placeholder for a zero filled array which is only allocated when it is first accessed.
+        These are created by the `FakeDataBuilder` when asked for lazy arrays, so that
+        fake models can be built without allocating their (possibly very large) arrays.
+        Accessing the array through a node, converting it with `numpy.asarray` or
+        serializing it to ASDF all return the same, allocated, array.
+    """
+
+    __slots__ = ("_array", "dtype", "shape")
+
+    def __init__(self, shape, dtype):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._array = None
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def materialized(self):
+        """If the array has been allocated"""
+        return self._array is not None
+
+    def materialize(self):
+        """Allocate the array (if it has not been already) and return it"""
+        if self._array is None:
+            self._array = np.zeros(self.shape, dtype=self.dtype)
+        return self._array
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.materialize()
+        if dtype is not None and np.dtype(dtype) != arr.dtype:
+            if copy is False:
+                raise ValueError(f"Unable to avoid a copy while converting {self!r} to {np.dtype(dtype)}")
+            return arr.astype(dtype)
+        return arr.copy() if copy else arr
+
+    def __deepcopy__(self, memo):
+        new = self.__class__(self.shape, self.dtype)
+        if self._array is not None:
+            new._array = self._array.copy()
+        return new
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(shape={self.shape}, dtype={self.dtype})"
+
+
+class PackedDQ(LazyArray):
+    """
+    A DQ array stored as one bit-packed plane per flag which is set in it.
+        Mostly ``GOOD`` DQ arrays take a fraction of their dense size this way.
+        The array is decoded when it is first accessed (like `LazyArray`), which
+        drops the planes, and `pack` packs it again. Only the in-memory form is
+        packed: pickling keeps it, but serializing to ASDF writes the (dense)
+        decoded array.
+    """
+
+    __slots__ = ("_planes",)
+
+    def __init__(self, dq):
+        dq = np.asanyarray(dq)
+        super().__init__(dq.shape, dq.dtype)
+        self._planes = pack_bitplanes(dq)
+
+    @property
+    def packed_nbytes(self):
+        """The size of the packed planes (0 while the array is decoded)"""
+        if self._planes is None:
+            return 0
+        return sum(plane.nbytes for plane in self._planes.values())
+
+    def materialize(self):
+        """Decode the array (if it has not been already) and return it"""
+        if self._array is None:
+            # Only one of the forms is kept
+            self._array = unpack_bitplanes(self._planes, self.shape, self.dtype)
+            self._planes = None
+        return self._array
+
+    def pack(self):
+        """Pack the decoded array (including any changes made to it) and drop it"""
+        if self._array is not None:
+            self._planes = pack_bitplanes(self._array)
+            self._array = None
+
+    @classmethod
+    def _from_planes(cls, shape, dtype, planes):
+        new = cls.__new__(cls)
+        LazyArray.__init__(new, shape, dtype)
+        new._planes = planes
+        return new
+
+    def __deepcopy__(self, memo):
+        if self._array is not None:
+            new = self._from_planes(self.shape, self.dtype, None)
+            new._array = self._array.copy()
+            return new
+        return self._from_planes(self.shape, self.dtype, {bit: plane.copy() for bit, plane in self._planes.items()})
+
+    def __reduce__(self):
+        planes = self._planes if self._array is None else pack_bitplanes(self._array)
+        return (self._from_planes, (self.shape, self.dtype, planes))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(shape={self.shape}, dtype={self.dtype}, packed_nbytes={self.packed_nbytes})"
+
+
+class LazyTable:
+    """
+    Placeholder for a table which is only read when it is first accessed.
+        These are created when opening catalogs saved as Parquet, the loader
+        reads the table (only the columns and rows asked for) once.
+    """
+
+    __slots__ = ("_loader", "_table")
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._table = None
+
+    @property
+    def materialized(self):
+        """If the table has been read"""
+        return self._table is not None
+
+    def materialize(self):
+        """Read the table (if it has not been already) and return it"""
+        if self._table is None:
+            self._table = self._loader()
+        return self._table
+
+    def __deepcopy__(self, memo):
+        new = self.__class__(self._loader)
+        if self._table is not None:
+            new._table = self._table.copy()
+        return new
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._loader!r})"
+
+
+# The array typecodes for the item types of a CompactList, strings are stored by index
+_COMPACT_TYPECODES = {int: "q", float: "d", str: "L"}
+
+
+class CompactList(MutableSequence):
+    """
+    Compact storage for a list of scalars which all have the same type.
+        ints and floats are stored in an `array.array` and strings as indices into a
+        table of the distinct strings, rather than as a list of Python objects. It
+        behaves like a list; storing an item of a different type turns it back
+        into (less compact) list storage.
+    """
+
+    __slots__ = ("_index", "_items", "_strings", "_type")
+
+    def __init__(self, items=()):
+        self._store(list(items))
+
+    @classmethod
+    def supports(cls, items):
+        """If the items all have the same type which can be stored compactly"""
+        types = {type(item) for item in items}
+        return len(types) == 1 and next(iter(types)) in _COMPACT_TYPECODES
+
+    def _store(self, items):
+        """Store the items, compactly if possible"""
+        self._type = type(items[0]) if self.supports(items) else None
+        self._strings = None
+        self._index = None
+
+        if self._type is str:
+            self._strings = []
+            self._index = {}
+            items = [self._encode(item) for item in items]
+
+        try:
+            self._items = items if self._type is None else array.array(_COMPACT_TYPECODES[self._type], items)
+        except OverflowError:
+            # ints which do not fit in 64 bits
+            self._type = None
+            self._items = items
+
+    def _encode(self, value):
+        """Convert a value into its stored form"""
+        if self._strings is None:
+            return value
+        if (index := self._index.get(value)) is None:
+            index = self._index[value] = len(self._strings)
+            self._strings.append(value)
+        return index
+
+    def _compatible(self, value):
+        """If the value can be stored without changing the storage"""
+        return self._type is None or type(value) is self._type
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = self._items[index]
+        return item if self._strings is None else self._strings[item]
+
+    def __setitem__(self, index, value):
+        if not isinstance(index, slice) and self._compatible(value):
+            try:
+                self._items[index] = self._encode(value)
+                return
+            except OverflowError:
+                pass
+
+        items = list(self)
+        items[index] = value
+        self._store(items)
+
+    def __delitem__(self, index):
+        # The strings table is not pruned, it is rebuilt by the next _store
+        del self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        if self._strings is None:
+            return iter(self._items)
+        return map(self._strings.__getitem__, self._items)
+
+    def insert(self, index, value):
+        if self._compatible(value):
+            try:
+                self._items.insert(index, self._encode(value))
+                return
+            except OverflowError:
+                pass
+
+        items = list(self)
+        items.insert(index, value)
+        self._store(items)
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def copy(self):
+        return self.__class__(self)
+
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
 
 
 def _wrap(value):
     """
     Convert dict to DNode and list to LNode
     """
+    # Lazy arrays (and tables) are allocated on first access
+    if isinstance(value, LazyArray | LazyTable):
+        return value.materialize()
+
     # Return objects as node classes, if applicable
     if isinstance(value, dict | AsdfDictNode):
-        return DNode(value)
-
-    if isinstance(value, list | AsdfListNode):
-        return LNode(value)
+        cls = DNode
+    elif isinstance(value, list | AsdfListNode | CompactList):
+        cls = LNode
+    else:
+        return value
 
-    return value
+    # The wrapper keeps the container alive, so its id cannot have been reused
+    wrapper = _CONTAINER_WRAPPERS.get(id(value))
+    if wrapper is None or _unwrap(wrapper) is not value:
+        wrapper = _CONTAINER_WRAPPERS[id(value)] = cls(value)
+    return wrapper
 
 
 def _unwrap(value):
@@ -55,14 +338,73 @@ class _NodeMixin:
     #    __slots__ is defined so that the subclasses will be fully slotted. You can't have the
     #    same slot attributed defined in both parent classes when they are mixed together.
     if TYPE_CHECKING:
-        __slots__ = ("_read_tag",)
+        __slots__ = ("_generation", "_parents", "_read_tag")
     else:
         __slots__ = ()
 
     _read_tag: str | None
+    _generation: int
+    _parents: weakref.WeakValueDictionary | None
 
     def __init__(self, *args, **kwargs):
         self._read_tag = None
+        self._generation = next(_GENERATIONS)
+        self._parents = None
+
+    def _adopt(self, value):
+        """
+        Register the node as a parent of a (wrapped) child, so that the node is told
+        of the child's changes.
+        """
+        if isinstance(value, _NodeMixin):
+            # Nodes are created without parents, and unpickled without the slot
+            #    (the parents are keyed by id, as nodes are not hashable)
+            if (parents := getattr(value, "_parents", None)) is None:
+                parents = value._parents = weakref.WeakValueDictionary()
+            parents[id(self)] = self
+        return value
+
+    def _modified(self):
+        """Mark that the node, and so all of its ancestors, has been modified"""
+        seen = set()
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if id(node) not in seen:
+                seen.add(id(node))
+                node._generation = next(_GENERATIONS)
+                if parents := getattr(node, "_parents", None):
+                    stack.extend(parents.values())
+
+    def _current_generation(self):
+        """
+        The generation of the node, the values computed from the node in the same
+        generation are still valid.
+        """
+        try:
+            return self._generation
+        except AttributeError:
+            # Unpickled nodes do not have the slot
+            self._generation = next(_GENERATIONS)
+            return self._generation
+
+    def content_digest(self, max_workers=None):
+        """
+        Compute the content digest of the node (see `content_digest`).
+
+        Parameters
+        ----------
+        max_workers : int or None
+            The number of threads hashing the array chunks (default: the number of CPUs).
+
+        Returns
+        -------
+        str
+            The hex digest, equal for nodes with the same content.
+        """
+        from ._digest import content_digest
+
+        return content_digest(self, max_workers)
 
 
 class DNode(MutableMapping, _NodeMixin):
@@ -70,7 +412,7 @@ class DNode(MutableMapping, _NodeMixin):
     Base class describing all "object" (dict-like) data nodes for STNode classes.
     """
 
-    __slots__ = ("_data", "_read_tag")
+    __slots__ = ("__weakref__", "_data", "_generation", "_parents", "_read_tag", "_wrappers")
 
     def __init__(self, node=None):
         super().__init__(node)
@@ -83,6 +425,13 @@ class DNode(MutableMapping, _NodeMixin):
         else:
             raise ValueError("Initializer only accepts dicts")
 
+        # The DNode/LNode wrappers of the dict/list children, created on access
+        self._wrappers = None
+
+    def __getstate__(self):
+        # The wrappers (and the parents) are only a cache, so do not copy (or pickle) them
+        return None, {"_data": self._data, "_read_tag": self._read_tag}
+
     def __getattr__(self, key):
         """
         Permit accessing dict keys as attributes, assuming they are legal Python
@@ -95,8 +444,7 @@ class DNode(MutableMapping, _NodeMixin):
 
         # If the key is in the schema, then we can return the value
         if key in self._data:
-            # Return objects as node classes, if applicable
-            return _wrap(self._data[key])
+            return self._get_child(key)
 
         # Raise the correct error for the attribute not being found
         raise AttributeError(f"No such attribute ({key}) found in node: {type(self)}")
@@ -110,6 +458,8 @@ class DNode(MutableMapping, _NodeMixin):
         if key[0] != "_":
             # Finally set the value
             self._data[key] = _unwrap(value)
+            self._discard_wrapper(key)
+            self._modified()
         else:
             if key in DNode.__slots__:
                 DNode.__dict__[key].__set__(self, value)
@@ -126,21 +476,68 @@ class DNode(MutableMapping, _NodeMixin):
         else:
             raise AttributeError(f"No such attribute ({name}) found in node")
 
-    def _recursive_items(self):
-        def recurse(tree, path=None):
-            path = path or []  # Avoid mutable default arguments
-            if isinstance(tree, DNode | dict | AsdfDictNode):
-                for key, val in tree.items():
-                    yield from recurse(val, [*path, key])
-            elif isinstance(tree, LNode | list | tuple | AsdfListNode):
-                for i, val in enumerate(tree):
-                    yield from recurse(val, [*path, i])
-            elif tree is not None:
-                yield (".".join(str(x) for x in path), tree)
-
-        yield from recurse(self)
-
-    def to_flat_dict(self, include_arrays=True, recursive=False):
+    def _recursive_items(self, prefix=None, max_depth=None):
+        """
+        Iterate over the leaves of the node, keyed by their dot-separated path.
+
+        Parameters
+        ----------
+        prefix : str or None
+            Only iterate over the part of the node under this dot-separated path
+            (e.g. ``"meta.exposure"``), the keys still include the prefix.
+        max_depth : int or None
+            Do not descend more than this many levels below the node, deeper
+            dicts and lists are returned as values.
+
+        Yields
+        ------
+        tuple
+            The (``key``, ``value``) of each leaf which is not None.
+        """
+        tree = self
+        path = ""
+        if prefix:
+            for part in prefix.split("."):
+                try:
+                    if isinstance(tree, _MAPPING_TYPES):
+                        tree = tree[part]
+                    elif isinstance(tree, _SEQUENCE_TYPES):
+                        tree = tree[int(part)]
+                    else:
+                        return
+                except (KeyError, IndexError, ValueError):
+                    return
+            path = prefix
+
+        if isinstance(tree, _MAPPING_TYPES):
+            items = _iter_items(tree)
+        elif isinstance(tree, _SEQUENCE_TYPES):
+            items = enumerate(tree)
+        else:
+            if tree is not None:
+                yield (path, tree)
+            return
+
+        # Iterative depth first traversal, the stack holds the path of each container
+        #    being traversed, its depth and the iterator over its remaining items
+        stack = [(path, path.count(".") + 1 if path else 0, items)]
+        while stack:
+            path, depth, items = stack[-1]
+            descend = max_depth is None or depth + 1 < max_depth
+            for key, val in items:
+                name = f"{path}.{key}" if path else str(key)
+                if descend and isinstance(val, _MAPPING_TYPES):
+                    stack.append((name, depth + 1, _iter_items(val)))
+                    break
+                if descend and isinstance(val, _SEQUENCE_TYPES):
+                    stack.append((name, depth + 1, enumerate(val)))
+                    break
+                if val is not None:
+                    yield (name, val)
+            else:
+                stack.pop()
+
+    def to_flat_dict(self, include_arrays=True, recursive=False, prefix=None, max_depth=None):
         """
         Returns a dictionary of all of the schema items as a flat dictionary.
 
@@ -150,6 +547,9 @@ class DNode(MutableMapping, _NodeMixin):
 
             { "meta.observation.date": "2012-04-22T03:22:05.432" }
 
+        When ``recursive`` is True, ``prefix`` (a dot-separated path such as
+        ``"meta.exposure"``) limits the result to the items under that path, and
+        ``max_depth`` to the items at most that many levels deep.
         """
 
         def convert_val(val):
@@ -162,18 +562,25 @@ class DNode(MutableMapping, _NodeMixin):
                 return str(val)
             return val
 
-        item_getter = self._recursive_items if recursive else self.items
+        item_getter = functools.partial(self._recursive_items, prefix, max_depth) if recursive else self._shallow_items
 
         if include_arrays:
             return {key: convert_val(val) for (key, val) in item_getter()}
         else:
             return {
-                key: convert_val(val) for (key, val) in item_getter() if not isinstance(val, np.ndarray | ndarray.NDArrayType)
+                key: convert_val(val)
+                for (key, val) in item_getter()
+                if not isinstance(val, np.ndarray | ndarray.NDArrayType | LazyArray | LazyTable)
             }
 
+    def _shallow_items(self):
+        """Iterate over the (wrapped) items of the node, without allocating the lazy arrays"""
+        for key, value in self._data.items():
+            yield key, value if isinstance(value, LazyArray | LazyTable) else self._get_child(key)
+
     def __asdf_traverse__(self):
         """Asdf traverse method for things like info/search"""
-        return dict(self)
+        return dict(self._items())
 
     def __len__(self):
         """Define length of the node"""
@@ -182,17 +589,64 @@ class DNode(MutableMapping, _NodeMixin):
     def __getitem__(self, key):
         """Dictionary style access data"""
         if key in self._data:
-            return self._data[key]
+            return self._get_child(key)
+
+        raise KeyError(f"No such key ({key}) found in node")
+
+    def _get_child(self, key):
+        """
+        Get the (wrapped) child of a key, the node is told of the changes made
+        to the child.
+        """
+        value = self._data[key]
+        if not isinstance(value, _CHILD_TYPES):
+            return _wrap(value)
+
+        # Return the same wrapper for the child as long as it has not been replaced
+        try:
+            wrappers = self._wrappers
+        except AttributeError:
+            wrappers = None
+        if wrappers is None:
+            wrappers = self._wrappers = {}
+        elif (wrapper := wrappers.get(key)) is not None and _unwrap(wrapper) is value:
+            return wrapper
+
+        wrappers[key] = wrapper = self._adopt(_wrap(value))
+        return wrapper
+
+    def _get(self, key):
+        """Get the (unwrapped) value of a key, allocating it if it is a lazy array"""
+        if key in self._data:
+            if isinstance(value := self._data[key], LazyArray | LazyTable):
+                return value.materialize()
+            return value
 
         raise KeyError(f"No such key ({key}) found in node")
 
+    def _items(self):
+        """
+        Iterate over the (unwrapped) items of the node, for the walks which only read it.
+            The lazy arrays and tables are not allocated (or read).
+        """
+        return iter(self._data.items())
+
     def __setitem__(self, key, value):
         """Dictionary style access set data"""
-        self._data[key] = value
+        self._data[key] = _unwrap(value)
+        self._discard_wrapper(key)
+        self._modified()
 
     def __delitem__(self, key):
         """Dictionary style access delete data"""
         del self._data[key]
+        self._discard_wrapper(key)
+        self._modified()
+
+    def _discard_wrapper(self, key):
+        """Forget the wrapper of a child which has been replaced"""
+        if getattr(self, "_wrappers", None):
+            self._wrappers.pop(key, None)
 
     def __dir__(self):
         return set(super().__dir__()) | set(self._data.keys())
@@ -211,23 +665,90 @@ class DNode(MutableMapping, _NodeMixin):
 
         instance._read_tag = self._read_tag
         instance._data = self._data.copy()
+        instance._wrappers = None
+        instance._generation = next(_GENERATIONS)
+        instance._parents = None
 
         return instance
 
 
+def _freeze(value):
+    """
+    Convert a value into a read-only version of itself
+    """
+    if isinstance(value, DNode):
+        return ReadOnlyDNode(value._data)
+
+    if isinstance(value, dict | AsdfDictNode):
+        return ReadOnlyDNode(value)
+
+    if isinstance(value, LNode):
+        value = value.data
+
+    if isinstance(value, list | tuple | AsdfListNode | CompactList):
+        return tuple(_freeze(val) for val in value)
+
+    if isinstance(value, np.ndarray) and value.flags.writeable:
+        value = value.view()
+        value.flags.writeable = False
+
+    return value
+
+
+class ReadOnlyDNode(DNode):
+    """
+    A DNode which cannot be modified.
+        Nested dicts are returned as read-only nodes, lists as tuples and arrays as
+        read-only views, so that the node can be safely shared.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, key):
+        return _freeze(super().__getattr__(key))
+
+    def __getitem__(self, key):
+        # The value is frozen, so it cannot be modified
+        return _freeze(self._get(key))
+
+    def _items(self):
+        for key, value in super()._items():
+            yield key, _freeze(value)
+
+    def _shallow_items(self):
+        for key, value in super()._shallow_items():
+            yield key, _freeze(value)
+
+    def __setattr__(self, key, value):
+        if key[0] != "_":
+            raise TypeError(f"Cannot set {key}, {type(self).__name__} is read-only")
+        super().__setattr__(key, value)
+
+    def __delattr__(self, name):
+        if name[0] != "_":
+            raise TypeError(f"Cannot delete {name}, {type(self).__name__} is read-only")
+        super().__delattr__(name)
+
+    def __setitem__(self, key, value):
+        raise TypeError(f"Cannot set {key}, {type(self).__name__} is read-only")
+
+    def __delitem__(self, key):
+        raise TypeError(f"Cannot delete {key}, {type(self).__name__} is read-only")
+
+
 class LNode(MutableSequence, _NodeMixin):
     """
     Base class describing all "array" (list-like) data nodes for STNode classes.
     """
 
-    __slots__ = ("_read_tag", "data")
+    __slots__ = ("__weakref__", "_generation", "_parents", "_read_tag", "data")
 
     def __init__(self, node=None):
         super().__init__(node=node)
 
         if node is None:
             self.data = []
-        elif isinstance(node, list | AsdfListNode):
+        elif isinstance(node, list | AsdfListNode | CompactList):
             self.data = node
         elif isinstance(node, self.__class__):
             self.data = node.data
@@ -235,19 +756,22 @@ class LNode(MutableSequence, _NodeMixin):
             raise ValueError("Initializer only accepts lists")
 
     def __getitem__(self, index):
-        return _wrap(self.data[index])
+        return self._adopt(_wrap(self.data[index]))
 
     def __setitem__(self, index, value):
         self.data[index] = _unwrap(value)
+        self._modified()
 
     def __delitem__(self, index):
         del self.data[index]
+        self._modified()
 
     def __len__(self):
         return len(self.data)
 
     def insert(self, index, value):
         self.data.insert(index, value)
+        self._modified()
 
     def __asdf_traverse__(self):
         return list(self)
@@ -261,7 +785,7 @@ class LNode(MutableSequence, _NodeMixin):
     def __eq__(self, other):
         if isinstance(other, LNode):
             return self.data == other.data
-        elif isinstance(other, list | AsdfListNode):
+        elif isinstance(other, list | AsdfListNode | CompactList):
             return self.data == other
         else:
             return False
@@ -272,4 +796,76 @@ class LNode(MutableSequence, _NodeMixin):
 
         instance.data = self.data.copy()
         instance._read_tag = self._read_tag
+        instance._generation = next(_GENERATIONS)
+        instance._parents = None
         return instance
+
+
+# The containers descended into by DNode._recursive_items (tuples are faster than unions in isinstance)
+_MAPPING_TYPES = (DNode, dict, AsdfDictNode)
+_SEQUENCE_TYPES = (LNode, list, tuple, AsdfListNode, CompactList)
+
+# The (unwrapped) containers which _wrap turns into DNode/LNode
+_RAW_CONTAINER_TYPES = (dict, AsdfDictNode, list, AsdfListNode, CompactList)
+
+# The children which are told to their parent node of their changes
+_CHILD_TYPES = (*_RAW_CONTAINER_TYPES, DNode, LNode)
+
+
+def _iter_items(mapping):
+    """Iterate over the (unwrapped) items of a dict or node"""
+    return mapping._items() if isinstance(mapping, DNode) else iter(mapping.items())
+
+
+def compact_lists(node, min_length=16):
+    """
+    Store the lists of scalars within a node compactly, see `CompactList`.
+        This reduces the memory used by trees with many long lists (for example
+        ``cal_logs``) without changing how the lists are accessed or serialized.
+
+    Parameters
+    ----------
+    node : DNode or LNode
+        The node (modified in place).
+    min_length : int
+        Only lists with at least this many items are converted.
+
+    Returns
+    -------
+    int
+        The number of lists converted.
+    """
+
+    def compact(value):
+        # The item types are checked exactly, so lists of tagged scalars keep their types
+        return type(value) is list and len(value) >= min_length and CompactList.supports(value)
+
+    count = 0
+    stack = [node]
+    while stack:
+        tree = stack.pop()
+        if isinstance(tree, DNode):
+            tree = tree._data
+        elif isinstance(tree, LNode):
+            if compact(tree.data):
+                tree.data = CompactList(tree.data)
+                count += 1
+            tree = tree.data
+
+        if isinstance(tree, dict | AsdfDictNode):
+            items = tree.items()
+        elif isinstance(tree, list | AsdfListNode):
+            items = enumerate(tree)
+        else:
+            continue
+
+        for key, value in list(items):
+            if compact(value):
+                tree[key] = CompactList(value)
+                count += 1
+            else:
+                stack.append(value)
+
+    if count and isinstance(node, _NodeMixin):
+        node._modified()
+    return count
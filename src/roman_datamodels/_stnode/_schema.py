@@ -7,20 +7,26 @@ from __future__ import annotations
 import copy
 import enum
 import functools
+import hashlib
 import re
 from collections.abc import Mapping, Sequence
 from typing import TYPE_CHECKING
 
 import asdf
+import asdf.generic_io
 import asdf.schema
+import rad
 from semantic_version import Version
 
+from ._cache import cache_key, read_cache, write_cache
+from ._node import LazyArray
 from ._registry import NODE_CLASSES_BY_TAG, SCHEMA_URIS_BY_TAG
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from typing import Any
 
-__all__ = ["get_latest_schema"]
+__all__ = ["get_latest_schema", "get_schema_uris", "prewarm_schema_cache"]
 
 
 NOSTR = "?"
@@ -28,6 +34,187 @@ NONUM = -999999
 NOBOOL = False
 
 
+def _resource_hash(uri):
+    """
+    Hash the content of a resource registered with asdf's resource manager.
+    """
+    return hashlib.sha256(asdf.get_config().resource_manager[uri]).hexdigest()
+
+
+def _iter_refs(schema):
+    """
+    Generator that produces all the ``$ref`` values in an (unresolved) schema.
+    """
+    if isinstance(schema, Mapping):
+        for key, value in schema.items():
+            if key == "$ref" and isinstance(value, str):
+                yield value
+            else:
+                yield from _iter_refs(value)
+    elif isinstance(schema, list):
+        for value in schema:
+            yield from _iter_refs(value)
+
+
+def _schema_resources(uri):
+    """
+    Find all the resources that the resolved schema for a URI depends on.
+
+    Parameters
+    ----------
+    uri : str
+        The URI of the schema.
+
+    Returns
+    -------
+    dict
+        Hash of each resource (known to asdf's resource manager) that is
+        referenced, directly or indirectly, by the schema.
+    """
+    resource_manager = asdf.get_config().resource_manager
+
+    resources = {}
+    pending = [uri]
+    while pending:
+        if (resource_uri := pending.pop()) in resources or resource_uri not in resource_manager:
+            continue
+
+        resources[resource_uri] = _resource_hash(resource_uri)
+        for ref in _iter_refs(asdf.schema.load_schema(resource_uri)):
+            pending.append(asdf.generic_io.resolve_uri(resource_uri, ref).split("#", 1)[0])
+
+    return resources
+
+
+@functools.cache
+def _load_resolved_schema(uri):
+    """
+    Load a schema with all its references resolved.
+
+    Resolving the references of the larger schemas is expensive, so the
+    resolved schemas are kept in the on-disk cache. The cache key covers the
+    RAD and asdf versions and the content of the schema itself, and an entry is
+    only used if none of the resources referenced by the schema have changed.
+
+    Parameters
+    ----------
+    uri : str
+        The URI of the schema to load.
+
+    Returns
+    -------
+    dict
+        The resolved schema.
+    """
+    key = cache_key(rad.__version__, asdf.__version__, uri, _resource_hash(uri))
+
+    if (cached := read_cache("schemas", key)) is not None and all(
+        resource_uri in asdf.get_config().resource_manager and _resource_hash(resource_uri) == resource_hash
+        for resource_uri, resource_hash in cached["resources"].items()
+    ):
+        return cached["schema"]
+
+    schema = asdf.schema.load_schema(uri, resolve_references=True)
+    write_cache("schemas", key, {"resources": _schema_resources(uri), "schema": schema})
+
+    return schema
+
+
+def prewarm_schema_cache(uris: Iterable[str] | None = None) -> list[str]:
+    """
+    Load schemas into the in-memory and on-disk caches ahead of time.
+
+    This is useful to populate a (shared) on-disk cache once so that, for
+    example, the workers of a process pool do not each have to resolve the
+    schemas on their first use.
+
+    Parameters
+    ----------
+    uris : iterable of str, optional
+        The schema URIs to load, by default the schemas of all the tags
+        supported by the STNode classes.
+
+    Returns
+    -------
+    list of str
+        The URIs of the schemas which were loaded.
+    """
+    if uris is None:
+        uris = SCHEMA_URIS_BY_TAG.values()
+
+    uris = list(dict.fromkeys(uris))
+    for uri in uris:
+        _load_resolved_schema(uri)
+
+    return uris
+
+
+# The resource manager the index was built from and the index itself
+_SCHEMA_VERSION_INDEX: tuple[Any, dict[str, list[tuple[Version, str]]]] = (None, {})
+
+
+def _schema_version_index():
+    """
+    Get the index of all the versions of each resource known to asdf.
+
+    The index maps the URI prefix (the URI without the ``-<version>`` suffix)
+    to the ``(version, uri)`` pairs for that prefix sorted from oldest to
+    newest. It is built once by scanning asdf's resource manager and only
+    rebuilt if asdf replaces its resource manager (e.g. new resource mappings
+    have been added).
+
+    Returns
+    -------
+    dict
+        The index.
+    """
+    global _SCHEMA_VERSION_INDEX
+
+    resource_manager = asdf.get_config().resource_manager
+    indexed_manager, index = _SCHEMA_VERSION_INDEX
+    if indexed_manager is resource_manager:
+        return index
+
+    index = {}
+    for schema_uri in resource_manager:
+        if "-" not in schema_uri:
+            continue
+
+        uri_prefix, version = schema_uri.rsplit("-", 1)
+        try:
+            index.setdefault(uri_prefix, []).append((Version(version), schema_uri))
+        except ValueError:
+            # Not a versioned URI
+            continue
+
+    for versions in index.values():
+        versions.sort()
+
+    _SCHEMA_VERSION_INDEX = (resource_manager, index)
+    return index
+
+
+def get_schema_uris(uri: str) -> list[str]:
+    """
+    Get all the available versions of a schema by URI (or partial URI).
+
+    Parameters
+    ----------
+    uri : str
+        The URI of any version of the schema, or the URI without the
+        ``-<version>`` suffix.
+
+    Returns
+    -------
+    list of str
+        The URIs of all the versions of the schema known to asdf, sorted
+        from oldest to newest.
+    """
+    uri_prefix = uri.rsplit("-", 1)[0] if "-" in uri else uri
+
+    return [schema_uri for _, schema_uri in _schema_version_index().get(uri_prefix, [])]
+
+
 @functools.cache
 def get_latest_schema(uri: str) -> tuple[str, dict[str, Any]]:
     """
@@ -42,17 +229,14 @@ def get_latest_schema(uri: str) -> tuple[str, dict[str, Any]]:
         version = "0.0.0"
         latest_uri = None
 
-    uri_prefix += "-"
     current_version = Version(version)
-    for schema_uri in asdf.get_config().resource_manager:
-        if schema_uri.startswith(uri_prefix) and (new_version := Version(schema_uri.rsplit("-", 1)[-1])) > current_version:
-            current_version = new_version
-            latest_uri = schema_uri
+    if (versions := _schema_version_index().get(uri_prefix)) and versions[-1][0] > current_version:
+        latest_uri = versions[-1][1]
 
     if latest_uri is None:
         raise ValueError(f"No schema found for {uri}")
 
-    return latest_uri, asdf.schema.load_schema(latest_uri, resolve_references=True)
+    return latest_uri, _load_resolved_schema(latest_uri)
 
 
 @functools.cache
@@ -67,7 +251,20 @@ def _get_schema_from_tag(tag):
     """
     schema_uri = SCHEMA_URIS_BY_TAG[tag]
 
-    return asdf.schema.load_schema(schema_uri, resolve_references=True)
+    return _load_resolved_schema(schema_uri)
+
+
+@functools.cache
+def _get_plan_from_tag(tag):
+    """
+    Get the compiled schema (see `_SchemaPlan`) corresponding to the tag_uri.
+
+    Parameters
+    ----------
+    tag : str
+        The tag_uri of the schema to compile.
+    """
+    return _SchemaPlan(_get_schema_from_tag(tag))
 
 
 class _MissingKeywordType:
@@ -97,6 +294,9 @@ def _get_keyword(schema, key):
     value : Any or _MISSING_KEYWORD
         The value for the keyword or _MISSING_KEYWORD if not found.
     """
+    if isinstance(schema, _SchemaPlan):
+        return schema.get_keyword(key)
+
     if key in schema:
         return schema[key]
     for combiner in ("allOf", "anyOf"):
@@ -143,7 +343,9 @@ def _get_properties(schema):
     (str, any)
         Property name and subschema.
     """
-    if "allOf" in schema:
+    if isinstance(schema, _SchemaPlan):
+        yield from schema.properties
+    elif "allOf" in schema:
         for subschema in schema["allOf"]:
             yield from _get_properties(subschema)
     elif "anyOf" in schema:
@@ -169,6 +371,10 @@ def _get_pattern_properties(schema, name):
     dict
         Subschema matching the property (empty if None).
     """
+    if isinstance(schema, _SchemaPlan):
+        yield from schema.pattern_properties(name)
+        return
+
     if patterns := schema.get("patternProperties"):
         for pattern, subschema in patterns.items():
             if re.match(pattern, name):
@@ -194,6 +400,9 @@ def _get_required(schema):
     set of str
         Set of required property names.
     """
+    if isinstance(schema, _SchemaPlan):
+        return schema.required
+
     required = set()
     if "required" in schema:
         required.update(set(schema["required"]))
@@ -248,6 +457,148 @@ _STRING_KEYWORDS = {"pattern", "minLength", "maxLength"}
 _NUMERIC_KEYWORDS = {"multipleOf", "maximum", "exclusiveMaximum", "minimum"}
 
 
+def _get_items(schema):
+    """
+    Get the ``items`` keyword of a schema.
+
+    Parameters
+    ----------
+    schema : dict
+        Schema to search.
+
+    Returns
+    -------
+    dict, list of dict or _MISSING_KEYWORD
+        The schema for all the items, the list of schemas for each item or
+        _MISSING_KEYWORD if the schema does not define items.
+    """
+    if isinstance(schema, _SchemaPlan):
+        return schema.item_schemas
+
+    return _get_keyword(schema, "items")
+
+
+def _get_type(schema):
+    """
+    Determine the type of object a schema describes.
+
+    Parameters
+    ----------
+    schema : dict
+        Schema to check.
+
+    Returns
+    -------
+    SchemaType
+        The type defined by the schema.
+    """
+    if _has_keyword(schema, "tag"):
+        return SchemaType.TAGGED
+    if defined_type := _get_keyword(schema, "type"):
+        defined_type = defined_type.upper()
+        if hasattr(SchemaType, defined_type):
+            return getattr(SchemaType, defined_type)
+    if any(_has_keyword(schema, k) for k in _OBJECT_KEYWORDS):
+        return SchemaType.OBJECT
+    if any(_has_keyword(schema, k) for k in _ARRAY_KEYWORDS):
+        return SchemaType.ARRAY
+    if any(_has_keyword(schema, k) for k in _STRING_KEYWORDS):
+        return SchemaType.STRING
+    # assume anything numeric is a number not an integer
+    if any(_has_keyword(schema, k) for k in _NUMERIC_KEYWORDS):
+        return SchemaType.NUMBER
+    return SchemaType.UNKNOWN
+
+
+def _plan(schema):
+    """Compile a subschema (leaving anything that is not a schema untouched)"""
+    if isinstance(schema, Mapping) and not isinstance(schema, _SchemaPlan):
+        return _SchemaPlan(schema)
+    return schema
+
+
+class _SchemaPlan(Mapping):
+    """
+    A schema "compiled" for the builders.
+
+    Looking up keywords, the type, the required properties, etc. for a schema
+    requires walking its allOf/anyOf combiners. A plan does each of these lookups
+    only once for a schema and remembers the result, as well as the plans for
+    its subschemas, so that repeatedly building from the same schema just walks
+    the plan tree.
+
+    The plan is a read-only mapping of the schema it was compiled from, so it
+    can be used anywhere a schema is expected. The schema must not be modified
+    once a plan has been compiled from it.
+    """
+
+    __slots__ = ("_items", "_keywords", "_pattern_properties", "_properties", "_required", "_schema", "_type")
+
+    def __init__(self, schema):
+        self._schema = schema
+        self._keywords = {}
+        self._type = None
+        self._required = None
+        self._properties = None
+        self._pattern_properties = {}
+        self._items = None
+
+    def __getitem__(self, key):
+        return self._schema[key]
+
+    def __contains__(self, key):
+        return key in self._schema
+
+    def __iter__(self):
+        return iter(self._schema)
+
+    def __len__(self):
+        return len(self._schema)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._schema!r})"
+
+    def get_keyword(self, key):
+        """Memoized `_get_keyword` for this schema"""
+        try:
+            return self._keywords[key]
+        except KeyError:
+            value = self._keywords[key] = _get_keyword(self._schema, key)
+            return value
+
+    @property
+    def type(self):
+        if self._type is None:
+            self._type = _get_type(self)
+        return self._type
+
+    @property
+    def required(self):
+        if self._required is None:
+            self._required = _get_required(self._schema)
+        return self._required
+
+    @property
+    def properties(self):
+        if self._properties is None:
+            self._properties = [(name, _plan(subschema)) for name, subschema in _get_properties(self._schema)]
+        return self._properties
+
+    def pattern_properties(self, name):
+        if (subschemas := self._pattern_properties.get(name)) is None:
+            subschemas = self._pattern_properties[name] = [
+                _plan(subschema) for subschema in _get_pattern_properties(self._schema, name)
+            ]
+        return subschemas
+
+    @property
+    def item_schemas(self):
+        if self._items is None:
+            items = _get_keyword(self._schema, "items")
+            self._items = [_plan(item) for item in items] if isinstance(items, list) else _plan(items)
+        return self._items
+
+
 class Builder:
     """
     Class to build objects based on a schema (and optional defaults).
@@ -263,22 +614,9 @@ class Builder:
     """
 
     def get_type(self, schema):
-        if _has_keyword(schema, "tag"):
-            return SchemaType.TAGGED
-        if defined_type := _get_keyword(schema, "type"):
-            defined_type = defined_type.upper()
-            if hasattr(SchemaType, defined_type):
-                return getattr(SchemaType, defined_type)
-        if any(_has_keyword(schema, k) for k in _OBJECT_KEYWORDS):
-            return SchemaType.OBJECT
-        if any(_has_keyword(schema, k) for k in _ARRAY_KEYWORDS):
-            return SchemaType.ARRAY
-        if any(_has_keyword(schema, k) for k in _STRING_KEYWORDS):
-            return SchemaType.STRING
-        # assume anything numeric is a number not an integer
-        if any(_has_keyword(schema, k) for k in _NUMERIC_KEYWORDS):
-            return SchemaType.NUMBER
-        return SchemaType.UNKNOWN
+        if isinstance(schema, _SchemaPlan):
+            return schema.type
+        return _get_type(schema)
 
     def from_enum(self, schema):
         if enum := _get_keyword(schema, "enum"):
@@ -340,10 +678,10 @@ class Builder:
         if len(arr) == min_items:
             return arr
 
-        items_keyword = _get_keyword(schema, "items")
+        items_keyword = _get_items(schema)
         if items_keyword is _MISSING_KEYWORD:
             return arr
-        if isinstance(items_keyword, dict):
+        if isinstance(items_keyword, Mapping):
             item = self.build_node(items_keyword, _NO_VALUE)
             if item is _NO_VALUE:
                 return arr
@@ -434,11 +772,15 @@ class FakeDataBuilder(Builder):
     If shape is not provided a 0-sized array with the required dimensions
     will be created. If shape is provided only the dimensions that match
     the required dimensions are used.
+
+    If lazy_arrays is True, fake arrays are created as `LazyArray`
+    placeholders which are only allocated once they are accessed.
     """
 
-    def __init__(self, shape=None):
+    def __init__(self, shape=None, lazy_arrays=False):
         super().__init__()
         self._shape = shape
+        self._lazy_arrays = lazy_arrays
 
     def from_enum(self, schema):
         if enum := _get_keyword(schema, "enum"):
@@ -538,7 +880,10 @@ class FakeDataBuilder(Builder):
                 if i == len(shape):
                     break
                 shape[i] = v
-        return np.zeros(shape, dtype=asdf.tags.core.ndarray.asdf_datatype_to_numpy_dtype(dtype))
+        dtype = asdf.tags.core.ndarray.asdf_datatype_to_numpy_dtype(dtype)
+        if self._lazy_arrays:
+            return LazyArray(shape, dtype)
+        return np.zeros(shape, dtype=dtype)
 
     def make_wcs(self, schema, defaults):
         from astropy import coordinates
@@ -574,7 +919,8 @@ class FakeDataBuilder(Builder):
 
         props = dict(_get_properties(schema))
         unit = props.get("unit", {}).get("enum", ["dn"])[0]
-        arr = self.make_array(props.get("value", {}), defaults)
+        # quantities are never lazy
+        arr = np.asarray(self.make_array(props.get("value", {}), defaults))
         if arr.size < 2:
             # astropy will convert 1 and 0 item quantities to scalars
             # which will fail asdf validation (since these aren't arrays)
@@ -624,11 +970,11 @@ class NodeBuilder(Builder):
             return self._copy_default(defaults)
 
         # don't consider minItem maxItems, consider items
-        items_keyword = _get_keyword(schema, "items")
+        items_keyword = _get_items(schema)
         if items_keyword is _MISSING_KEYWORD:
             return self._copy_default(defaults)
 
-        if isinstance(items_keyword, dict):
+        if isinstance(items_keyword, Mapping):
             # single schema for all items
             subschemas = {}
             default_subschema = items_keyword
@@ -6,13 +6,17 @@ Dynamic creation of STNode classes from the RAD manifest.
     used by the user.
 """
 
+import hashlib
 import importlib.resources
+from collections.abc import Mapping
 from pathlib import Path
 
+import rad
 import yaml
 from asdf.extension import ManifestExtension
 from rad import resources
 
+from ._cache import cache_key, read_cache, write_cache
 from ._converters import SerializationNodeConverter
 from ._factories import stnode_factory
 from ._registry import (
@@ -30,6 +34,84 @@ from ._tagged import SerializationNode
 __all__ = ["NODE_CLASSES", "NODE_EXTENSIONS"]
 
 
+def _pattern_from_tag(tag_uri):
+    """
+    Compute the tag pattern/wildcard shared by all versions of a tag
+    """
+    base, _ = tag_uri.rsplit("-", maxsplit=1)
+
+    return f"{base}-*"
+
+
+def _node_specs(manifests):
+    """
+    Compute the arguments needed to create each of the STNode classes.
+
+    Each class is created from the first (newest) manifest that contains a
+    tag matching its pattern.
+
+    Parameters
+    ----------
+    manifests : list of dict
+        The RAD datamodels manifests, newest first.
+
+    Returns
+    -------
+    list of dict
+        The pattern, latest manifest URI and default tag URI for each class.
+    """
+    specs = {}
+    for manifest in manifests:
+        for tag_def in manifest["tags"]:
+            pattern = _pattern_from_tag(tag_def["tag_uri"])
+            if pattern not in specs:
+                specs[pattern] = {
+                    "pattern": pattern,
+                    "latest_manifest": manifest["id"],
+                    "default_tag": tag_def["tag_uri"],
+                }
+
+    return list(specs.values())
+
+
+def _load_manifests(paths):
+    """
+    Load the RAD datamodels manifests and the STNode class specifications.
+
+    Parsing the manifest YAML is the most expensive part of importing this
+    package, so the parsed manifests are kept in an on-disk cache keyed by the
+    RAD and roman_datamodels versions and the hashes of the manifest files.
+
+    Parameters
+    ----------
+    paths : list of Path
+        The manifest files, newest first.
+
+    Returns
+    -------
+    tuple of (list of dict, list of dict)
+        The parsed manifests and the specifications for each STNode class
+        (see `_node_specs`).
+    """
+    from roman_datamodels._version import version
+
+    contents = [path.read_bytes() for path in paths]
+    key = cache_key(
+        rad.__version__,
+        version,
+        *(f"{path.name}:{hashlib.sha256(content).hexdigest()}" for path, content in zip(paths, contents, strict=True)),
+    )
+
+    if (cached := read_cache("manifests", key)) is not None:
+        return cached["manifests"], cached["specs"]
+
+    manifests = [yaml.safe_load(content) for content in contents]
+    specs = _node_specs(manifests)
+    write_cache("manifests", key, {"manifests": manifests, "specs": specs})
+
+    return manifests, specs
+
+
 # Load the manifest directly from the rad resources and not from ASDF.
 #   This is because the ASDF extensions have to be created before they can be registered
 #   and this module creates the classes used by the ASDF extension.
@@ -39,7 +121,7 @@ _DATAMODEL_MANIFEST_PATHS = sorted(
     reverse=True,
     key=lambda v: tuple(int(i) for i in v.stem.rsplit("-")[-1].split(".")),
 )
-DATAMODEL_MANIFESTS = [yaml.safe_load(path.read_bytes()) for path in _DATAMODEL_MANIFEST_PATHS]
+DATAMODEL_MANIFESTS, _NODE_SPECS = _load_manifests(_DATAMODEL_MANIFEST_PATHS)
 # Notice that the static manifests are first so that we defer to them
 _MANIFESTS = DATAMODEL_MANIFESTS
 
@@ -60,21 +142,24 @@ def _factory(pattern, latest_manifest, tag_def):
 
 
 # Main dynamic class creation loop
-#   Reads each tag entry from the manifest and creates a class for it
-_generated = {}
+#   Creates a class for each of the specs derived from the manifests
+_TAG_DEFS = {}
+for manifest in _MANIFESTS:
+    for tag_def in manifest["tags"]:
+        _TAG_DEFS.setdefault(tag_def["tag_uri"], tag_def)
+
+_generated = {
+    spec["pattern"]: _factory(spec["pattern"], spec["latest_manifest"], _TAG_DEFS[spec["default_tag"]]) for spec in _NODE_SPECS
+}
+
+# Register each tag from the manifests
 for manifest in _MANIFESTS:
     _add_cls(SerializationNode._factory(manifest_uri := manifest["id"]))
 
     MANIFEST_TAG_REGISTRY[manifest_uri] = []
     for tag_def in manifest["tags"]:
         SCHEMA_URIS_BY_TAG[(tag_uri := tag_def["tag_uri"])] = tag_def["schema_uri"]
-        base, _ = tag_uri.rsplit("-", maxsplit=1)
-
-        # make pattern from tag
-        pattern = f"{base}-*"
-        if pattern not in _generated:
-            _generated[pattern] = _factory(pattern, manifest_uri, tag_def)
-        NODE_CLASSES_BY_TAG[tag_uri] = _generated[pattern]
+        NODE_CLASSES_BY_TAG[tag_uri] = _generated[_pattern_from_tag(tag_uri)]
 
         # Make serialization intermediate
         if tag_uri not in TAG_MANIFEST_REGISTRY:
@@ -82,14 +167,49 @@ for manifest in _MANIFESTS:
             MANIFEST_TAG_REGISTRY[manifest_uri].append(tag_uri)
 
 
+class _NodeExtensions(Mapping):
+    """
+    Mapping of manifest URI to the ASDF extension for the STNode classes.
+        The extensions are created from the already parsed manifests the first
+        time they are requested, so manifests which are never used (by asdf or
+        `DataModel.schema_uri`) never have an extension built for them.
+    """
+
+    def __init__(self, manifests):
+        self._manifests = {manifest["id"]: manifest for manifest in manifests if manifest["id"] in MANIFEST_TAG_REGISTRY}
+        self._extensions = {}
+
+    def __getitem__(self, manifest_uri):
+        if (extension := self._extensions.get(manifest_uri)) is None:
+            extension = self._extensions.setdefault(
+                manifest_uri,
+                ManifestExtension(
+                    self._manifests[manifest_uri],
+                    converters=(SerializationNodeConverter(manifest_uri), *tuple(NODE_CONVERTERS.values())),
+                ),
+            )
+
+        return extension
+
+    def __iter__(self):
+        return iter(self._manifests)
+
+    def __len__(self):
+        return len(self._manifests)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self._manifests)})"
+
+    def extension_uri(self, manifest_uri):
+        """
+        Get the extension URI for a manifest without creating its extension.
+        """
+        return self._manifests[manifest_uri]["extension_uri"]
+
+
 # Create the ASDF extension for the STNode classes.
 #    ASDF extension is setup here so that it is after the dynamic object creation
-NODE_EXTENSIONS = {
-    manifest_uri: ManifestExtension.from_uri(
-        manifest_uri, converters=(SerializationNodeConverter(manifest_uri), *tuple(NODE_CONVERTERS.values()))
-    )
-    for manifest_uri in MANIFEST_TAG_REGISTRY
-}
+NODE_EXTENSIONS = _NodeExtensions(_MANIFESTS)
 
 
 # List of node classes made available by this library.
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from typing import Any
 
 from asdf.extension import ManifestExtension
@@ -49,4 +50,4 @@ class WfiScienceRaw(TaggedObjectNode): ...
 class WfiWcs(TaggedObjectNode): ...
 
 _MANIFESTS: list[dict[str, Any]]
-NODE_EXTENSIONS: dict[str, ManifestExtension]
+NODE_EXTENSIONS: Mapping[str, ManifestExtension]
@@ -16,7 +16,8 @@ from ._registry import (
     SCALAR_NODE_CLASSES_BY_PATTERN,
     SERIALIZATION_BY_MANIFEST,
 )
-from ._schema import _NO_VALUE, Builder, FakeDataBuilder, NodeBuilder, _get_schema_from_tag
+from ._schema import _NO_VALUE, Builder, FakeDataBuilder, NodeBuilder, _get_plan_from_tag, _get_schema_from_tag
+from ._templates import create_fake_data_from_template
 
 if TYPE_CHECKING:
     from collections.abc import Mapping, MutableMapping
@@ -91,7 +92,7 @@ class _TaggedNodeMixin(NodeMixin):
         cls, defaults: Mapping[str, Any] | None = None, builder: Builder | None = None, *, tag: str | None = None
     ) -> Self:
         builder = builder or Builder()
-        new = cls(builder.build(_get_schema_from_tag(tag or cls._default_tag), defaults))
+        new = cls(builder.build(_get_plan_from_tag(tag or cls._default_tag), defaults))
 
         if tag:
             new._read_tag = tag
@@ -131,7 +132,12 @@ class _TaggedNodeMixin(NodeMixin):
 
     @classmethod
     def create_fake_data(
-        cls, defaults: Mapping[str, Any] | None = None, shape: tuple[int, ...] | None = None, *, tag: str | None = None
+        cls,
+        defaults: Mapping[str, Any] | None = None,
+        shape: tuple[int, ...] | None = None,
+        *,
+        tag: str | None = None,
+        lazy_arrays: bool = False,
     ) -> Self:
         """
         Create an instance of this class with with all required attributes
@@ -145,13 +151,21 @@ class _TaggedNodeMixin(NodeMixin):
             The shape of the data to create
         tag: str | None
             The tag to use when creating the instance. If None, the default tag for the class will be used.
+        lazy_arrays: bool
+            If True, the fake arrays are only allocated when they are first accessed.
 
         Returns
         -------
         Self
             An instance of this class
+
+        Notes
+        -----
+        The result is built once for each combination of class, tag, shape and
+        defaults and then cached (see `clear_template_cache`), later calls return
+        an independent copy of the cached node.
         """
-        return cls._create_fake_data(defaults, shape, tag=tag)
+        return create_fake_data_from_template(cls, defaults, shape, tag=tag, lazy_arrays=lazy_arrays)
 
     @classmethod
     def _create_from_node(cls, node: MutableMapping[str, Any], builder: Builder | None = None, *, tag: str | None = None) -> Self:
@@ -258,7 +272,7 @@ class TaggedScalarNode(_TaggedNodeMixin):
     @classmethod
     def _create_minimal(cls, defaults=None, builder=None, *, tag: str | None = None):
         builder = builder or Builder()
-        value = builder.build(_get_schema_from_tag(tag or cls._default_tag), defaults)
+        value = builder.build(_get_plan_from_tag(tag or cls._default_tag), defaults)
         if value is _NO_VALUE:
             return value
 
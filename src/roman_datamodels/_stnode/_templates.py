@@ -0,0 +1,209 @@
+"""
+In-memory cache of "template" nodes for ``create_fake_data``.
+    Building a node with fake data walks its whole schema and creates a fresh WCS,
+    table, arrays, etc. for it. As the result only depends on the node class, tag,
+    shape and defaults, the first node built for each of these is kept as a template
+    and later calls return a deep copy of it instead.
+
+    Arrays created by the `FakeDataBuilder` are all zeros, so rather than copying
+    them the copies get new zero filled arrays. These are allocated lazily by the
+    operating system so their memory is shared (copy-on-write) until it is written to.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+
+import numpy as np
+from astropy.time import Time
+
+from ._node import DNode, LNode
+from ._schema import FakeDataBuilder
+
+if TYPE_CHECKING:
+    from typing import Any
+
+__all__ = ["clear_template_cache"]
+
+# Maximum number of templates kept, the least recently used are discarded first
+TEMPLATE_CACHE_SIZE = 32
+
+_TEMPLATES: OrderedDict[tuple, tuple[Any, dict[int, np.ndarray], list[Time]]] = OrderedDict()
+_TEMPLATES_LOCK = threading.Lock()
+
+
+class _UnhashableDefaultError(Exception):
+    """Raised when the defaults cannot be turned into a cache key"""
+
+
+def _fingerprint(value):
+    """
+    Turn the defaults into a hashable value which is equal for equal defaults.
+
+    Parameters
+    ----------
+    value : Any
+        The defaults (or a value within them).
+
+    Returns
+    -------
+    tuple or scalar
+        The hashable fingerprint.
+
+    Raises
+    ------
+    _UnhashableDefaultError
+        If the defaults contain something which cannot be fingerprinted (for example
+        an array), in which case the result should not be cached.
+    """
+    if value is None or isinstance(value, str | int | float | bool | np.generic):
+        return (type(value), value, getattr(value, "_read_tag", None))
+    if isinstance(value, Time):
+        return (
+            type(value),
+            value.scale,
+            value.format,
+            value.shape,
+            np.asarray(value.jd1).tobytes(),
+            np.asarray(value.jd2).tobytes(),
+            getattr(value, "_read_tag", None),
+        )
+    if isinstance(value, Mapping):
+        return (
+            type(value),
+            getattr(value, "_read_tag", None),
+            tuple((_fingerprint(k), _fingerprint(v)) for k, v in value.items()),
+        )
+    if isinstance(value, list | tuple | LNode):
+        return (type(value), getattr(value, "_read_tag", None), tuple(_fingerprint(v) for v in value))
+    raise _UnhashableDefaultError(f"Cannot fingerprint {type(value)}")
+
+
+class _TemplateBuilder(FakeDataBuilder):
+    """FakeDataBuilder which keeps track of the (zero filled) arrays it creates"""
+
+    def __init__(self, shape=None, lazy_arrays=False):
+        super().__init__(shape, lazy_arrays)
+        self.zeros = {}
+
+    def make_array(self, schema, defaults):
+        arr = super().make_array(schema, defaults)
+        # lazy arrays are cheap to copy as long as they are not allocated
+        if isinstance(arr, np.ndarray):
+            self.zeros[id(arr)] = arr
+        return arr
+
+
+def _tagged_times(tree):
+    """
+    Find the tagged Time nodes (like FileDate) in a tree.
+
+    Parameters
+    ----------
+    tree : Any
+        The tree to search.
+
+    Yields
+    ------
+    Time
+        Each tagged time node with a read tag.
+    """
+    if isinstance(tree, DNode):
+        tree = tree._data
+    elif isinstance(tree, LNode):
+        tree = tree.data
+
+    if isinstance(tree, dict):
+        tree = tree.values()
+    elif not isinstance(tree, list):
+        if isinstance(tree, Time) and getattr(tree, "_read_tag", None) is not None:
+            yield tree
+        return
+
+    for value in tree:
+        yield from _tagged_times(value)
+
+
+def _clone(template, zeros, times):
+    """
+    Create an independent copy of a template.
+
+    Parameters
+    ----------
+    template : Any
+        The template node.
+    zeros : dict[int, np.ndarray]
+        The zero filled arrays within the template, by id.
+    times : list of Time
+        The tagged time nodes within the template.
+
+    Returns
+    -------
+    Any
+        Deep copy of the template, with new zero filled arrays.
+    """
+    memo = {key: np.zeros(arr.shape, dtype=arr.dtype) for key, arr in zeros.items()}
+
+    # Time does not copy the read tag
+    for time in times:
+        memo[id(time)] = new_time = copy.deepcopy(time)
+        new_time._read_tag = time._read_tag
+
+    return copy.deepcopy(template, memo)
+
+
+def create_fake_data_from_template(cls, defaults=None, shape=None, *, tag=None, lazy_arrays=False):
+    """
+    Create fake data for a tagged node class using the template cache.
+
+    Parameters
+    ----------
+    cls : type
+        The tagged node class.
+    defaults : Mapping or None
+        The defaults passed to ``create_fake_data``.
+    shape : tuple of int or None
+        The shape passed to ``create_fake_data``.
+    tag : str or None
+        The tag passed to ``create_fake_data``.
+    lazy_arrays : bool
+        The lazy_arrays passed to ``create_fake_data``.
+
+    Returns
+    -------
+    Any
+        A new node, independent of the cached template and of any other node
+        returned by this function.
+    """
+    try:
+        key = (cls, tag, None if shape is None else tuple(shape), lazy_arrays, _fingerprint(defaults))
+    except (_UnhashableDefaultError, TypeError):
+        # The result depends on something we cannot key on, so just build it
+        return cls._create_fake_data(defaults, shape, FakeDataBuilder(shape, lazy_arrays), tag=tag)
+
+    with _TEMPLATES_LOCK:
+        if (entry := _TEMPLATES.get(key)) is not None:
+            _TEMPLATES.move_to_end(key)
+
+    if entry is None:
+        builder = _TemplateBuilder(shape, lazy_arrays)
+        template = cls._create_fake_data(defaults, shape, builder, tag=tag)
+        entry = (template, builder.zeros, list(_tagged_times(template)))
+        with _TEMPLATES_LOCK:
+            _TEMPLATES[key] = entry
+            while len(_TEMPLATES) > TEMPLATE_CACHE_SIZE:
+                _TEMPLATES.popitem(last=False)
+
+    return _clone(*entry)
+
+
+def clear_template_cache() -> None:
+    """
+    Discard all the templates cached by ``create_fake_data``.
+    """
+    with _TEMPLATES_LOCK:
+        _TEMPLATES.clear()
@@ -1,6 +1,7 @@
 from ._core import *  # noqa: F403
 from ._datamodels import *  # noqa: F403
+from ._index import build_meta_index, query_meta_index  # noqa: F401
+from ._utils import CrdsParametersResult, FilenameMismatchWarning, read_meta, scan_crds_parameters  # noqa: F401
 
 # rename rdm_open to open to match the current roman_datamodels API
-from ._utils import FilenameMismatchWarning  # noqa: F401
 from ._utils import rdm_open as open  # noqa: F401
@@ -11,6 +11,7 @@ This provides the abstract base class ``Datamodel`` for all the specific datamod
 from __future__ import annotations
 
 import abc
+import contextlib
 import copy
 import datetime
 import functools
@@ -23,13 +24,16 @@ import numpy as np
 from asdf.exceptions import ValidationError
 from asdf.tags.core.ndarray import NDArrayType
 from asdf.util import NotSet
+from astropy.table import Table
 from astropy.time import Time
 
-from roman_datamodels._stnode import NODE_EXTENSIONS, DNode, TaggedObjectNode
+from roman_datamodels._stnode import NODE_EXTENSIONS, DNode, LazyArray, LazyTable, PackedDQ, TaggedObjectNode
+from roman_datamodels._stnode._compression import PARALLEL_LZ4, parallel_compression
+from roman_datamodels._stnode._converters import shape_only_validation
 
 if TYPE_CHECKING:
     from collections.abc import Mapping
-    from typing import Any, Self
+    from typing import Any, ClassVar, Self
 
 __all__ = ["MODEL_REGISTRY", "DataModel"]
 
@@ -38,6 +42,27 @@ MODEL_REGISTRY: dict[str, type[DataModel]] = {}
 DEFAULT_ARRAY_INLINE_THRESHOLD = 512
 
 
+def _crds_parameters(meta):
+    """
+    Get the CRDS parameters from the ``meta`` of a model.
+
+    Parameters
+    ----------
+    meta : DNode
+        The ``roman.meta`` node.
+
+    Returns
+    -------
+    dict
+        The scalar metadata, keyed by their ``roman.meta.`` prefixed dotted names.
+    """
+    return {
+        f"roman.meta.{key}": val
+        for key, val in meta.to_flat_dict(include_arrays=False, recursive=True).items()
+        if isinstance(val, str | int | float | complex | bool)
+    }
+
+
 def _set_default_asdf(func):
     """
     Decorator which ensures that a DataModel has an asdf file available for use
@@ -61,6 +86,10 @@ class DataModel(abc.ABC):
 
     crds_observatory = "roman"
 
+    # The compression of specific arrays (by their flattened key, e.g. "dq") when
+    #    the model is saved, the other arrays use ``all_array_compression``
+    default_array_compression: ClassVar[Mapping[str, str | None]] = {}
+
     _node_type: type[TaggedObjectNode]
 
     def __init_subclass__(cls, **kwargs):
@@ -127,7 +156,12 @@ class DataModel(abc.ABC):
 
     @classmethod
     def create_fake_data(
-        cls, defaults: Mapping[str, Any] | None = None, shape: tuple[int, ...] | None = None, *, tag: str | None = None
+        cls,
+        defaults: Mapping[str, Any] | None = None,
+        shape: tuple[int, ...] | None = None,
+        *,
+        tag: str | None = None,
+        lazy_arrays: bool = False,
     ) -> Self:
         """
         Class method that constructs a model filled with fake data.
@@ -156,14 +190,18 @@ class DataModel(abc.ABC):
             If provided, specifically create a model using this tag not the
             default one.
 
+        lazy_arrays: bool
+            If True, the fake arrays are only allocated when they are
+            first accessed (or the model is saved).
+
         Returns
         -------
         DataModel
             A valid model with fake data.
         """
-        return cls(cls._node_type.create_fake_data(defaults, shape, tag=tag))
+        return cls(cls._node_type.create_fake_data(defaults, shape, tag=tag, lazy_arrays=lazy_arrays))
 
-    __slots__ = ("_asdf", "_files_to_close", "_instance", "_iscopy", "_shape")
+    __slots__ = ("_asdf", "_files_to_close", "_flat_cache", "_instance", "_iscopy", "_shape")
 
     @classmethod
     def create_from_model(cls, model: DataModel | DNode) -> Self:
@@ -186,6 +224,7 @@ class DataModel(abc.ABC):
         self._instance = None
         self._asdf = None
         self._files_to_close = None
+        self._flat_cache = {}
 
         if isinstance(init, TaggedObjectNode):
             if not isinstance(self, MODEL_REGISTRY.get(init.__class__)):
@@ -243,6 +282,12 @@ class DataModel(abc.ABC):
         if not (self._iscopy or self._asdf is None):
             self._asdf.close()
 
+            # The private memory maps of the file (see `rdm_open`), the arrays of the model
+            #    still in use keep theirs open until they are released
+            for private_map in self._files_to_close or ():
+                with contextlib.suppress(BufferError):
+                    private_map.close()
+
     def __enter__(self):
         return self
 
@@ -286,7 +331,7 @@ class DataModel(abc.ABC):
                 output_path, *args, all_array_compression=all_array_compression, all_array_storage=all_array_storage, **kwargs
             )
         elif ext == ".parquet" and hasattr(self, "to_parquet"):
-            self.to_parquet(output_path)
+            self.to_parquet(output_path, **kwargs)
         else:
             raise ValueError(f"unknown filetype {ext}")
 
@@ -300,7 +345,39 @@ class DataModel(abc.ABC):
 
         return asdf.AsdfFile(init, **kwargs)
 
-    def to_asdf(self, init, *args, all_array_compression="lz4", all_array_storage=NotSet, **kwargs):
+    def to_asdf(
+        self,
+        init,
+        *args,
+        all_array_compression="lz4",
+        all_array_storage=NotSet,
+        array_compression=None,
+        compression_threads=1,
+        **kwargs,
+    ):
+        """
+        Write the model to an ASDF file.
+
+        Parameters
+        ----------
+        init : str or file-like
+            The file to write to.
+        all_array_compression : str or None
+            The compression of the arrays which are not in ``array_compression``.
+        all_array_storage : str
+            The storage of all the arrays (see `asdf.AsdfFile.write_to`).
+        array_compression : Mapping or None
+            The compression of specific arrays, keyed by their flattened key (e.g.
+            ``{"dq": "zlib", "var_rnoise": None}``). These update the model's
+            ``default_array_compression``.
+        compression_threads : int or None
+            The number of threads the lz4 blocks are compressed with, if 1 (the default)
+            the blocks are compressed in this thread. With more threads the blocks are
+            written with the roman_datamodels lz4 compressor (labelled ``rlz4``), so
+            they need roman_datamodels to be read.
+        *args, **kwargs
+            Passed to `asdf.AsdfFile.write_to`.
+        """
         from ._utils import temporary_update_filedate, temporary_update_filename
 
         with (
@@ -309,7 +386,20 @@ class DataModel(abc.ABC):
         ):
             asdf_file = self.open_asdf(**kwargs)
             asdf_file["roman"] = self._instance
-            with asdf.config_context() as cfg:
+
+            compression = {**self.default_array_compression, **(array_compression or {})}
+            if compression_threads is not None and compression_threads > 1:
+                # Only the roman lz4 compressor compresses on the thread pool
+                compression = {key: PARALLEL_LZ4 if value == "lz4" else value for key, value in compression.items()}
+                if all_array_compression == "lz4":
+                    all_array_compression = PARALLEL_LZ4
+
+            if compression:
+                # asdf applies all_array_compression over any per-array compression
+                self._set_array_compression(asdf_file, compression, all_array_compression)
+                all_array_compression = NotSet
+
+            with asdf.config_context() as cfg, parallel_compression(compression_threads):
                 # only set array inline threshold if not already set by the user
                 if cfg.array_inline_threshold is None and all_array_storage is NotSet:
                     cfg.array_inline_threshold = DEFAULT_ARRAY_INLINE_THRESHOLD
@@ -318,6 +408,31 @@ class DataModel(abc.ABC):
                     init, *args, all_array_compression=all_array_compression, all_array_storage=all_array_storage, **kwargs
                 )
 
+    def _set_array_compression(self, asdf_file, compression, default):
+        """
+        Set the compression of each array of the model in the file to be written.
+
+        Parameters
+        ----------
+        asdf_file : asdf.AsdfFile
+            The file the model is written with.
+        compression : Mapping
+            The compression of specific arrays, keyed by their flattened key.
+        default : str or None
+            The compression of the other arrays.
+        """
+        for key, value in self._instance._recursive_items():
+            if isinstance(value, LazyArray | LazyTable):
+                # The converter writes the same (allocated) array
+                value = value.materialize()
+            if isinstance(value, np.ndarray | NDArrayType):
+                asdf_file.set_array_compression(value, compression.get(key, default))
+            elif isinstance(value, Table):
+                # The columns of tables are written as arrays too (keyed e.g. "source_catalog.flux")
+                for name, column in value.columns.items():
+                    if isinstance(column, np.ndarray):
+                        asdf_file.set_array_compression(column, compression.get(f"{key}.{name}", default))
+
     def get_primary_array_name(self):
         """
         Returns the name "primary" array for this model, which
@@ -394,11 +509,40 @@ class DataModel(abc.ABC):
                 return str(val)
             return val
 
-        return {
-            f"roman.{key}": convert_val(val)
-            for (key, val) in self.items()
-            if include_arrays or not isinstance(val, np.ndarray | NDArrayType)
-        }
+        return self._cached(
+            ("to_flat_dict", include_arrays),
+            lambda: {
+                f"roman.{key}": convert_val(val)
+                for (key, val) in self.items()
+                if include_arrays or not isinstance(val, np.ndarray | NDArrayType | LazyArray | LazyTable)
+            },
+        )
+
+    def _cached(self, key, compute):
+        """
+        Get a flattened view of the model from the cache, or compute it.
+            The cached views are invalidated whenever the model, or any node within
+            it, is modified (the nodes tell their parents of their changes), so
+            repeated calls on an unchanged model do not walk it.
+
+        Parameters
+        ----------
+        key : tuple
+            The key of the view in the cache.
+        compute : callable
+            Function computing the (dict) view.
+
+        Returns
+        -------
+        dict
+            A (shallow) copy of the view, so that the cache is not modified by callers.
+        """
+        generation = self._instance._current_generation()
+        cached = self._flat_cache.get(key)
+        if cached is None or cached[0] != generation or cached[1] is not self._instance:
+            cached = (generation, self._instance, compute())
+            self._flat_cache[key] = cached
+        return dict(cached[2])
 
     def items(self):
         """
@@ -426,18 +570,70 @@ class DataModel(abc.ABC):
         -------
         dict
         """
-        return {
-            f"roman.meta.{key}": val
-            for key, val in self.meta.to_flat_dict(include_arrays=False, recursive=True).items()
-            if isinstance(val, str | int | float | complex | bool)
-        }
+        return self._cached(("get_crds_parameters",), lambda: _crds_parameters(self.meta))
+
+    def pack_dq(self):
+        """
+        Store the DQ arrays of the model (``dq``, ``pixeldq``, ``groupdq``, ...) as
+        bit-packed `PackedDQ` planes.
+            The arrays are still read as ordinary arrays, they are decoded (and the
+            planes dropped) when they are first accessed. Calling this again re-packs
+            the decoded arrays. Only the arrays in memory are packed, the model is
+            still saved with the dense arrays.
+
+        Returns
+        -------
+        int
+            The number of bytes saved.
+        """
+        saved = 0
+        for key, value in list(self._instance._data.items()):
+            if isinstance(value, PackedDQ):
+                before = value.packed_nbytes + (0 if value._array is None else value._array.nbytes)
+                value.pack()
+                saved += before - value.packed_nbytes
+            elif (
+                key.endswith("dq")
+                and not isinstance(value, LazyArray)
+                and isinstance(value, np.ndarray | NDArrayType)
+                and value.dtype.kind in "ui"
+            ):
+                packed = PackedDQ(value)
+                self._instance[key] = packed
+                saved += value.nbytes - packed.packed_nbytes
+        return saved
+
+    def content_digest(self, max_workers=None):
+        """
+        Compute the content digest of the model.
+
+        Models with the same content (metadata and arrays) have the same digest, so
+        models can be compared (or deduplicated) by their digests. The arrays are
+        hashed in chunks on a thread pool. The digests of the arrays are only cached
+        for the models opened with ``memmap=True, readonly=True`` (see `rdm_open`),
+        the arrays read into memory or mapped copy-on-write can be changed.
+
+        Parameters
+        ----------
+        max_workers : int or None
+            The number of threads hashing the array chunks (default: the number of CPUs).
+
+        Returns
+        -------
+        str
+            The hex digest.
+        """
+        return self._instance.content_digest(max_workers)
 
     @_set_default_asdf
     def validate(self):
         """
         Re-validate the model instance against the tags
+            The lazy arrays which have not been allocated are validated by their
+            shape and dtype, without allocating them.
         """
-        self._asdf.validate()
+        with shape_only_validation():
+            self._asdf.validate()
 
     @_set_default_asdf
     def info(self, *args, **kwargs):
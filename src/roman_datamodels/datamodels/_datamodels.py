@@ -12,16 +12,20 @@ import copy
 import functools
 import itertools
 import logging
+import mmap
 import pathlib
 import warnings
 from collections import abc
 from typing import TYPE_CHECKING
 
+import asdf
 import astropy.table.meta
 import numpy as np
 from astropy import time as _time
 from astropy.modeling import models
 
+from roman_datamodels import _stnode
+
 from ._core import DataModel
 from ._utils import node_update, temporary_update_filedate, temporary_update_filename
 
@@ -44,6 +48,15 @@ if TYPE_CHECKING:
 
 DTYPE_MAP: dict[str, Any] = {}
 
+# Number of rows of each row group of the Parquet catalogs
+_DEFAULT_ROW_GROUP_SIZE = 1024**2
+
+# Number of bytes of each array converted at once by streaming conversions
+_DEFAULT_CHUNK_SIZE = 64 * 1024**2
+
+# Width of the border of reference pixels around the detector
+_NBORDER = 4
+
 # Define logging
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
@@ -54,7 +67,7 @@ class _SourceCatalogMixin:
 
     __slots__ = ()
 
-    def create_empty_catalog(self, aperture_radii=None, filters=None):
+    def create_empty_catalog(self, aperture_radii=None, filters=None, nrows=0):
         """
         Create an empty but valid source catalog table
 
@@ -66,6 +79,10 @@ class _SourceCatalogMixin:
         filters: list of str (optional)
             List of filters (for example: "f184")
 
+        nrows: int (optional)
+            Preallocate the columns with this many (zero filled) rows, so that
+            a catalog of known length can be filled in place.
+
         Returns
         -------
         Table
@@ -73,7 +90,7 @@ class _SourceCatalogMixin:
         if aperture_radii:
             aperture_radii = [f"{i:02}" for i in aperture_radii]
 
-        return self._instance._create_empty_catalog(aperture_radii, filters)
+        return self._instance._create_empty_catalog(aperture_radii=aperture_radii, filters=filters, nrows=nrows)
 
     @functools.wraps(ImageSourceCatalogMixin.get_column_definition)
     def get_column_definition(self, name):
@@ -85,11 +102,24 @@ class _ParquetMixin:
 
     __slots__ = ()
 
-    def to_parquet(self, filepath):
+    def to_parquet(self, filepath, *, row_group_size=_DEFAULT_ROW_GROUP_SIZE, compression="zstd", use_dictionary=True):
         """
         Save catalog in parquet format.
 
         Defers import of parquet to minimize import overhead for all other models.
+        The columns are handed to Arrow without copying them and written one row
+        group at a time, so large catalogs are not copied into a table first.
+
+        Parameters
+        ----------
+        filepath : str or Path
+            The file to write.
+        row_group_size : int
+            The number of rows of each row group.
+        compression : str or None
+            The compression of the columns (e.g. ``"zstd"``, ``"snappy"`` or None).
+        use_dictionary : bool or list of str
+            Dictionary encode all the columns or only the columns listed.
         """
         from roman_datamodels._stnode import DNode
 
@@ -133,19 +163,94 @@ class _ParquetMixin:
         flat_scmeta = {"source_catalog." + k: str(v) for (k, v) in flat_scmeta.items()}
         # merge the two meta dicts
         flat_meta.update(flat_scmeta)
-        # Turn numpy structured array into list of arrays
+        # Views of the column data (without any mask), these are not copied
         keys = list(source_cat.columns.keys())
-        arrs = [np.array(source_cat[key]) for key in keys]
+        arrs = [np.asarray(source_cat[key]) for key in keys]
         units = [str(source_cat[key].unit) for key in keys]
-        dtypes = [DTYPE_MAP[np.array(source_cat[key]).dtype.name] for key in keys]
+        dtypes = [DTYPE_MAP[arr.dtype.name] for arr in arrs]
         fields = [
             pa.field(key, type=dtype, metadata={"unit": unit}) for (key, dtype, unit) in zip(keys, dtypes, units, strict=False)
         ]
         extra_astropy_metadata = astropy.table.meta.get_yaml_from_table(source_cat)
         flat_meta["table_meta_yaml"] = "\n".join(extra_astropy_metadata)
         schema = pa.schema(fields, metadata=flat_meta)
-        table = pa.Table.from_arrays(arrs, schema=schema)
-        pq.write_table(table, filepath, compression=None)
+
+        with pq.ParquetWriter(filepath, schema, compression=compression, use_dictionary=use_dictionary) as writer:
+            for start in range(0, len(source_cat), row_group_size):
+                # Arrow wraps (native byte order) numeric data without copying it
+                batch = pa.RecordBatch.from_arrays(
+                    [
+                        pa.array(_native(arr[start : start + row_group_size]), type=dtype)
+                        for arr, dtype in zip(arrs, dtypes, strict=True)
+                    ],
+                    schema=schema,
+                )
+                writer.write_batch(batch, row_group_size=row_group_size)
+
+
+def _native(array):
+    """The array in native byte order, only copied if it is not already"""
+    return array if array.dtype.isnative else array.astype(array.dtype.newbyteorder("="))
+
+
+def _release_pages(array):
+    """
+    Tell the OS that the pages of a memory mapped array are no longer needed.
+        The data is not lost, any changes are kept in the (shared) mapping of the file,
+        but the pages no longer count towards this process's memory use until they are
+        accessed again.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The (contiguous) array, nothing is done if it is not memory mapped.
+    """
+    base = array
+    while base is not None and not isinstance(base, mmap.mmap):
+        base = getattr(base, "base", None)
+    if base is None or not hasattr(mmap, "MADV_DONTNEED") or array.size == 0:
+        return
+
+    start = array.ctypes.data - np.frombuffer(base, dtype=np.uint8).ctypes.data
+    stop = start + array.nbytes
+    start -= start % mmap.PAGESIZE
+    base.madvise(mmap.MADV_DONTNEED, start, stop - start)
+
+
+def _copy_chunked(target, source, chunk_size):
+    """
+    Copy (and convert) the source array into the target array in chunks.
+
+    Parameters
+    ----------
+    target : np.ndarray
+        The array to copy into, this must have the same shape as the source.
+
+    source : np.ndarray
+        The array to copy from.
+
+    chunk_size : int
+        Maximum number of bytes of the arrays to copy at once.
+    """
+    target = np.asarray(target)
+    source = np.asarray(source)
+    if target.shape != source.shape:
+        raise ValueError(f"Cannot copy array of shape {source.shape} into array of shape {target.shape}")
+
+    if target.flags.c_contiguous and source.flags.c_contiguous:
+        target = target.reshape(-1)
+        source = source.reshape(-1)
+        step = max(1, chunk_size // max(target.itemsize, source.itemsize))
+    else:
+        # Copy whole "rows" at a time
+        step = 1
+
+    for start in range(0, len(target), step):
+        target[start : start + step] = source[start : start + step]
+        # Drop the pages of any memory mapped chunks so they do not pile up
+        for chunk in (target[start : start + step], source[start : start + step]):
+            if chunk.flags.c_contiguous:
+                _release_pages(chunk)
 
 
 class _RomanDataModel(DataModel):
@@ -236,7 +341,7 @@ class _RomanDataModel(DataModel):
         return super().create_minimal(defaults=cls._creator_defaults(defaults), tag=tag)
 
     @classmethod
-    def create_fake_data(cls, defaults=None, shape=None, *, tag=None):
+    def create_fake_data(cls, defaults=None, shape=None, *, tag=None, lazy_arrays=False):
         """
         Class method that constructs a model filled with fake data.
 
@@ -260,6 +365,10 @@ class _RomanDataModel(DataModel):
             When provided use this shape to determine the
             shape used to construct fake arrays.
 
+        lazy_arrays: bool
+            If True, the fake arrays are only allocated when they are
+            first accessed (or the model is saved).
+
         Returns
         -------
         DataModel
@@ -269,6 +378,7 @@ class _RomanDataModel(DataModel):
             defaults=cls._creator_defaults(defaults, time=_time.Time("2020-01-01T00:00:00.0", format="isot", scale="utc")),
             shape=shape,
             tag=tag,
+            lazy_arrays=lazy_arrays,
         )
 
 
@@ -401,14 +511,18 @@ class RampModel(_RomanDataModel):
         shape = model.data.shape
         ramp_model.pixeldq = np.zeros(shape[1:], dtype=np.uint32)
         ramp_model.groupdq = np.zeros(shape, dtype=np.uint8)
-        ramp_model.data = model.data.astype(np.float32)
-        ramp_model.amp33 = model.amp33.copy()
+        # strip the units of tvac/fps quantities
+        data = model.data.astype(np.float32)
+        ramp_model.data = getattr(data, "value", data)
+        amp33 = model.amp33.copy()
+        ramp_model.amp33 = getattr(amp33, "value", amp33)
 
         # check if the input model has a resultantdq from SDF
         if hasattr(model, "resultantdq"):
             ramp_model.groupdq = model.resultantdq.copy()
 
-        node_update(ramp_model._instance, model, ignore=("resultantdq", "meta.model_type"))
+        # data and amp33 have already been converted above, skip them so they are not copied again
+        node_update(ramp_model._instance, model, ignore=("resultantdq", "meta.model_type", "data", "amp33"))
 
         # check for exposure data_problem
         if isinstance(ramp_model.meta.exposure.data_problem, bool):
@@ -419,6 +533,103 @@ class RampModel(_RomanDataModel):
 
         return ramp_model
 
+    @classmethod
+    def stream_from_science_raw(cls, init, path, *, chunk_size=_DEFAULT_CHUNK_SIZE):
+        """
+        Convert a raw model into a RampModel file without holding the arrays in memory.
+
+        The RampModel is built with `RampModel.create_from_model` (with all the
+        calibration steps ``INCOMPLETE``), but rather than building the ramp arrays
+        in memory it is first written to ``path`` with zero filled (uncompressed)
+        arrays, which are then filled in chunk by chunk through a memory map of the
+        new file (and their checksums updated). When ``init`` is a file it is opened
+        with ``memmap=True`` so only one chunk of the input is read at a time.
+
+        Peak memory is bounded by ``chunk_size`` (plus the metadata) as long as the
+        input arrays can be memory mapped, compressed input arrays are decompressed
+        in full by ASDF when accessed.
+
+        As the file must be valid when it is written, the border reference pixel
+        arrays (which are only filled in by romancal's dq_init step) are written as
+        zeros.
+
+        Parameters
+        ----------
+        init : str, ``Path`` or ScienceRawModel
+            The raw model (or the path to a file containing one).
+
+        path : str or ``Path``
+            Path to write the RampModel to.
+
+        chunk_size : int
+            Maximum number of bytes of each array to convert at once.
+
+        Returns
+        -------
+        Path
+            The path the RampModel was written to.
+        """
+        from ._utils import rdm_open
+
+        path = pathlib.Path(path)
+        model = init if isinstance(init, DataModel) else rdm_open(init, memmap=True)
+        try:
+            if not isinstance(model, ScienceRawModel):
+                raise TypeError("Input must be a ScienceRawModel, use ScienceRawModel.from_tvac_raw to convert TVAC/FPS models")
+
+            # The ramp arrays are placeholders (with the shapes and dtypes of the ramp), which
+            #    are written as zeros, the resultantdq of the SDF is streamed into the groupdq
+            nresultants, ny, nx = model.data.shape
+            node = {key: value for key, value in model._instance._data.items() if key != "resultantdq"}
+            node["data"] = _stnode.LazyArray((nresultants, ny, nx), np.float32)
+            node["amp33"] = _stnode.LazyArray(model.amp33.shape, model.amp33.dtype)
+            node["pixeldq"] = _stnode.LazyArray((ny, nx), np.uint32)
+            node["groupdq"] = _stnode.LazyArray((nresultants, ny, nx), np.uint8)
+
+            # The border reference pixels are extracted later (by romancal's dq_init), but
+            # the file must be valid when written, so fill in placeholders for them.
+            border_shapes = {
+                "left": ((nresultants, ny, _NBORDER), (ny, _NBORDER)),
+                "right": ((nresultants, ny, _NBORDER), (ny, _NBORDER)),
+                "top": ((nresultants, _NBORDER, nx), (_NBORDER, nx)),
+                "bottom": ((nresultants, _NBORDER, nx), (_NBORDER, nx)),
+            }
+            for side, (shape, dq_shape) in border_shapes.items():
+                node.setdefault(f"border_ref_pix_{side}", _stnode.LazyArray(shape, np.float32))
+                node.setdefault(f"dq_border_ref_pix_{side}", _stnode.LazyArray(dq_shape, np.uint32))
+
+            ramp_model = cls.create_from_model(node)
+            ramp_model.meta.cal_step = {}
+            for step_name in ramp_model.schema_info("required")["roman"]["meta"]["cal_step"]["required"].info:
+                ramp_model.meta.cal_step[step_name] = "INCOMPLETE"
+
+            # arrays are written to (uncompressed) blocks so they can be memory mapped
+            with (
+                temporary_update_filename(ramp_model, path.name),
+                temporary_update_filedate(ramp_model, _time.Time.now()),
+            ):
+                asdf_file = asdf.AsdfFile()
+                asdf_file["roman"] = ramp_model._instance
+                asdf_file.write_to(path, all_array_storage="internal", all_array_compression=None)
+            del ramp_model, asdf_file
+
+            sources = {"data": model.data, "amp33": model.amp33}
+            # check if the input model has a resultantdq from SDF
+            if hasattr(model, "resultantdq"):
+                sources["groupdq"] = model.resultantdq
+
+            with asdf.open(path, mode="rw", memmap=True, lazy_tree=False) as asdf_file:
+                for name, source in sources.items():
+                    _copy_chunked(asdf_file["roman"][name], getattr(source, "value", source), chunk_size)
+
+                # The checksums of the blocks were computed for the zeros, update them
+                asdf_file.update()
+        finally:
+            if model is not init:
+                model.close()
+
+        return path
+
 
 class RampFitOutputModel(_RomanDataModel):
     from roman_datamodels._stnode import RampFitOutput
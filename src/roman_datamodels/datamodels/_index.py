@@ -0,0 +1,228 @@
+"""
+Columnar (Parquet) index of the metadata of many Roman datamodel files.
+    Each row of the index is a file, with its path, modification time and the
+    flattened ``roman.meta`` scalars (as in `DataModel.to_flat_dict`, with the
+    times as ISO strings) as columns.
+    The metadata is read with `read_meta` so only the YAML headers of the files
+    are read.
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import warnings
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from astropy.time import Time
+
+from ._utils import _READ_META_ERRORS, _map_files, read_meta
+
+if TYPE_CHECKING:
+    from typing import Any
+
+__all__ = ["build_meta_index", "query_meta_index"]
+
+# Columns added to the metadata of each file
+PATH_COLUMN = "path"
+MTIME_COLUMN = "mtime"
+
+
+def _read_flat_meta(path):
+    """
+    Read the flattened scalar metadata of a single file (in a worker process).
+
+    Parameters
+    ----------
+    path : str
+        The file to read.
+
+    Returns
+    -------
+    tuple
+        The path and either the row for the file or the (repr of the) error raised
+        reading it.
+    """
+    try:
+        # The time before reading, so that changes made while reading are picked up later
+        mtime = os.stat(path).st_mtime_ns
+        meta = read_meta(path)
+    except _READ_META_ERRORS as err:
+        return path, repr(err)
+
+    row = {PATH_COLUMN: path, MTIME_COLUMN: mtime}
+    for key, value in meta._recursive_items():
+        if isinstance(value, Time):
+            # Times are stored as ISO strings whatever their format, so they can be compared
+            value = value.isot
+        elif isinstance(value, datetime.datetime):
+            value = value.isoformat()
+        elif isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, str | int | float | bool):
+            row[f"roman.meta.{key}"] = value
+
+    # As when the file is opened, the filename is the name of the file (it may have been renamed)
+    if "roman.meta.filename" in row:
+        row["roman.meta.filename"] = Path(path).name
+    return path, row
+
+
+def _to_table(rows):
+    """
+    Turn the rows into a table, columns with mixed types are stored as strings.
+
+    Parameters
+    ----------
+    rows : list of dict
+        The rows of the index.
+
+    Returns
+    -------
+    pyarrow.Table
+    """
+    import pyarrow as pa
+
+    if not rows:
+        return pa.table({PATH_COLUMN: pa.array([], pa.string()), MTIME_COLUMN: pa.array([], pa.int64())})
+
+    types: dict[str, set[type]] = {}
+    for row in rows:
+        for key, value in row.items():
+            types.setdefault(key, set()).add(type(value))
+
+    columns = {}
+    for key in [PATH_COLUMN, MTIME_COLUMN, *sorted(types.keys() - {PATH_COLUMN, MTIME_COLUMN})]:
+        values = [row.get(key) for row in rows]
+        # ints are stored as floats alongside floats, any other mix as strings
+        if len(types[key] - {int} if float in types[key] else types[key]) > 1:
+            values = [None if value is None else str(value) for value in values]
+        columns[key] = values
+
+    return pa.table(columns)
+
+
+def build_meta_index(files, index_path=None, *, pattern="*.asdf", max_workers=None):
+    """
+    Build (or update) an index of the metadata of many files.
+
+    Parameters
+    ----------
+    files : str, ``Path`` or iterable of str or ``Path``
+        The files to index, or a directory in which the files matching ``pattern``
+        are indexed.
+    index_path : str, ``Path`` or None
+        The Parquet file to store the index in. If it already exists only the files
+        which are new or have been modified since they were indexed are read, and the
+        files which are no longer in ``files`` are dropped from the index.
+    pattern : str
+        The glob pattern of the files to index when ``files`` is a directory.
+    max_workers : int or None
+        The number of processes used to read the files (default: the number of CPUs),
+        if 1 the files are read in this process.
+
+    Returns
+    -------
+    pyarrow.Table
+        The index, one row per file. The ``path`` column is the path of the file as
+        a string, the ``mtime`` column its modification time (in ns) and the other
+        columns the ``roman.meta`` scalars of the file (null if the file does not
+        have them).
+    """
+    import pyarrow.parquet as pq
+
+    if isinstance(files, str | Path):
+        files = sorted(Path(files).glob(pattern)) if Path(files).is_dir() else [files]
+    paths = [str(path) for path in files]
+
+    # Keep the rows of the files which have not changed
+    indexed = {}
+    if index_path is not None and Path(index_path).exists():
+        indexed = {row[PATH_COLUMN]: row for row in pq.read_table(index_path).to_pylist()}
+
+    rows = {}
+    stale = []
+    for path in paths:
+        row = indexed.get(path)
+        try:
+            unchanged = row is not None and row[MTIME_COLUMN] == os.stat(path).st_mtime_ns
+        except OSError:
+            unchanged = False
+        if unchanged:
+            # Drop the nulls the table filled in for the columns of other files
+            rows[path] = {key: value for key, value in row.items() if value is not None}
+        else:
+            stale.append(path)
+
+    for path, result in _map_files(_read_flat_meta, stale, max_workers):
+        if isinstance(result, str):
+            warnings.warn(f"Could not index {path}: {result}", UserWarning, stacklevel=2)
+        else:
+            rows[path] = result
+
+    table = _to_table([rows[path] for path in paths if path in rows])
+    if index_path is not None:
+        pq.write_table(table, index_path)
+
+    return table
+
+
+def query_meta_index(index, conditions: Mapping[str, Any]):
+    """
+    Find the files in an index matching all the conditions.
+
+    Parameters
+    ----------
+    index : pyarrow.Table, str or ``Path``
+        The index (as returned by `build_meta_index`) or the Parquet file it is stored in.
+    conditions : Mapping
+        The conditions, keyed by the column (e.g. ``"roman.meta.instrument.optical_element"``).
+        The value of a condition is either
+            - a tuple ``(low, high)``: the column is in this (inclusive) range, either
+              bound can be None. Times are stored as ISO strings, so they can be
+              compared to strings or `astropy.time.Time` values.
+            - a list or set: the column is one of these values.
+            - anything else: the column is equal to this value.
+
+    Returns
+    -------
+    list of str
+        The paths of the matching files.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    if isinstance(index, str | Path):
+        index = pq.read_table(index)
+
+    def scalar(value):
+        return value.isot if isinstance(value, Time) else value
+
+    mask = None
+    for column, condition in conditions.items():
+        if column not in index.column_names:
+            return []
+        values = index[column]
+
+        if isinstance(condition, tuple):
+            low, high = condition
+            match = pc.is_valid(values)
+            if low is not None:
+                match = pc.and_(match, pc.greater_equal(values, scalar(low)))
+            if high is not None:
+                match = pc.and_(match, pc.less_equal(values, scalar(high)))
+        elif isinstance(condition, Iterable) and not isinstance(condition, str):
+            match = pc.is_in(values, value_set=pa.array([scalar(value) for value in condition], type=values.type))
+        else:
+            match = pc.equal(values, scalar(condition))
+
+        match = pc.fill_null(match, False)
+        mask = match if mask is None else pc.and_(mask, match)
+
+    if mask is None:
+        return index[PATH_COLUMN].to_pylist()
+    return index.filter(mask)[PATH_COLUMN].to_pylist()
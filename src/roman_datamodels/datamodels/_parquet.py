@@ -0,0 +1,179 @@
+"""
+Reading of the source catalog models saved as Parquet files.
+    `SourceCatalogModel.to_parquet` writes the ``roman.meta`` of the model as
+    flattened strings in the metadata of the Parquet schema. These are parsed back
+    guided by the types of the fake metadata of the model, and the table itself is
+    only read (with astropy) when it is first accessed, so that only the columns and
+    row groups asked for are read.
+"""
+
+from __future__ import annotations
+
+import functools
+import warnings
+from collections.abc import Mapping, Sequence
+from numbers import Integral, Real
+from pathlib import Path
+
+import numpy as np
+from astropy import units as u
+from astropy.table import Table
+from astropy.time import Time
+
+from roman_datamodels._stnode import LazyTable, TaggedScalarNode
+
+from ._core import MODEL_REGISTRY
+from ._utils import FilenameMismatchWarning
+
+__all__ = ["open_parquet"]
+
+# Prefix of the flattened model metadata in the Parquet metadata
+_META_PREFIX = "roman.meta."
+
+
+def _parse(text, template):
+    """
+    Parse a flattened metadata value back to the type of the template value.
+
+    Parameters
+    ----------
+    text : str
+        The value as written to the Parquet metadata.
+    template : Any
+        The value of the same key in the fake model, or None if it has no such key.
+
+    Returns
+    -------
+    Any
+        The parsed value, or the text if it cannot be parsed as the template type.
+    """
+    if template is None:
+        return None if text == "None" else text
+
+    try:
+        if isinstance(template, bool | np.bool_):
+            value = text == "True"
+        elif isinstance(template, str):
+            value = text
+        elif isinstance(template, Integral):
+            value = int(text)
+        elif isinstance(template, Real):
+            value = float(text)
+        elif isinstance(template, Time):
+            value = Time(text, scale=template.scale)
+        elif isinstance(template, u.Quantity):
+            value = u.Quantity(text)
+        else:
+            return text
+    except ValueError:
+        return text
+
+    if isinstance(template, TaggedScalarNode):
+        return type(template)(value)
+    return value
+
+
+def _child(template, key):
+    """The template value for a key of a (dict or list) template"""
+    if isinstance(template, Mapping):
+        return template.get(key)
+    if isinstance(template, Sequence) and not isinstance(template, str) and key.isdigit():
+        if int(key) < len(template):
+            return template[int(key)]
+        # Lists may be longer than the fake one
+        return template[-1] if template else None
+    return None
+
+
+def _restore(values, template):
+    """
+    Rebuild a metadata (sub)tree from its flattened values.
+
+    Parameters
+    ----------
+    values : dict
+        The flattened values keyed by their dot-separated key relative to the
+        (sub)tree, with the key ``""`` for a scalar value.
+    template : Any
+        The fake value of the (sub)tree.
+
+    Returns
+    -------
+    Any
+    """
+    if "" in values:
+        return _parse(values[""], template)
+
+    children = {}
+    for key, text in values.items():
+        head, _, rest = key.partition(".")
+        children.setdefault(head, {})[rest] = text
+
+    if all(key.isdigit() for key in children) and not isinstance(template, Mapping):
+        items = [_restore(children[key], _child(template, key)) for key in sorted(children, key=int)]
+        return type(template)(items) if isinstance(template, list) and type(template) is not list else items
+
+    node = {key: _restore(value, _child(template, key)) for key, value in children.items()}
+    if isinstance(template, Mapping):
+        # Empty lists and dicts are not flattened, restore them
+        for key, value in template.items():
+            if key not in node and isinstance(value, list | dict) and not value:
+                node[key] = type(value)()
+    return type(template)(node) if isinstance(template, Mapping) and type(template) is not dict else node
+
+
+def _model_class(model_type):
+    """Find the catalog model class from its name"""
+    for model_class in MODEL_REGISTRY.values():
+        if model_class.__name__ == model_type:
+            return model_class
+
+    raise TypeError(f"Parquet file is not a Roman source catalog (model_type: {model_type})")
+
+
+def open_parquet(init, columns=None, filters=None):
+    """
+    Open a source catalog saved with `SourceCatalogModel.to_parquet`.
+
+    Only the footer of the file is read, the table is read when it is first
+    accessed.
+
+    Parameters
+    ----------
+    init : str or ``Path``
+        The Parquet file.
+    columns : list of str or None
+        Only read these columns of the table (default: all the columns).
+    filters : list or None
+        Only read the rows (of the row groups) matching these predicates, see
+        `pyarrow.parquet.read_table` (default: all the rows).
+
+    Returns
+    -------
+    `DataModel`
+        The ``*SourceCatalogModel`` which was saved.
+    """
+    import pyarrow.parquet as pq
+
+    path = Path(init)
+    metadata = pq.read_schema(path).metadata or {}
+    flat_meta = {
+        key.decode()[len(_META_PREFIX) :]: value.decode()
+        for key, value in metadata.items()
+        if key.decode().startswith(_META_PREFIX)
+    }
+    model_class = _model_class(flat_meta.get("model_type"))
+
+    template = model_class._node_type.create_fake_data()._data["meta"]
+    meta = _restore(flat_meta, template)
+
+    if (filename := meta.get("filename", path.name)) != path.name:
+        warnings.warn(
+            f"meta.filename: {filename} does not match filename: {path.name}, updating the filename in memory!",
+            FilenameMismatchWarning,
+            stacklevel=3,
+        )
+        meta["filename"] = type(filename)(path.name)
+
+    loader = functools.partial(Table.read, str(path), format="parquet", include_names=columns, filters=filters)
+    return model_class(model_class._node_type({"meta": meta, "source_catalog": LazyTable(loader)}))
@@ -5,26 +5,46 @@ This module contains the utility functions for the datamodels sub-package. Mainl
 
 from __future__ import annotations
 
+import mmap
 import warnings
-from collections.abc import Generator, Mapping
-from contextlib import contextmanager
+from collections.abc import Generator, Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, NamedTuple
 from urllib.parse import urlparse
 
 import asdf
 import numpy as np
+import yaml
+from asdf.exceptions import ValidationError
 from astropy import time
 
-from roman_datamodels._stnode import TaggedScalarNode
+from roman_datamodels._stnode import ReadOnlyDNode, TaggedScalarNode
 
-from ._core import MODEL_REGISTRY, DataModel
+from ._core import MODEL_REGISTRY, DataModel, _crds_parameters
 
 if TYPE_CHECKING:
     from roman_datamodels._stnode import DNode, LNode
 
+# The errors expected when reading the metadata of a file which is missing, not a roman
+#    file or damaged, the scans report them rather than stopping
+_READ_META_ERRORS = (OSError, KeyError, TypeError, ValueError, ValidationError, yaml.YAMLError)
 
-__all__ = ["FilenameMismatchWarning", "node_update", "rdm_open", "temporary_update_filedate", "temporary_update_filename"]
+__all__ = [
+    "CrdsParametersResult",
+    "FilenameMismatchWarning",
+    "node_update",
+    "rdm_open",
+    "read_meta",
+    "scan_crds_parameters",
+    "temporary_update_filedate",
+    "temporary_update_filename",
+]
+
+# How node_update transfers arrays whose dtype already matches
+ARRAY_POLICIES = ("copy", "view", "readonly")
 
 
 class FilenameMismatchWarning(UserWarning):
@@ -95,12 +115,42 @@ def temporary_update_filedate(datamodel: DataModel, file_date: time.Time) -> Gen
     yield from _temporary_update(datamodel, "file_date", file_date)
 
 
+def _transfer_array(array, dtype, array_policy):
+    """
+    Get the array to assign for node_update.
+
+    Parameters
+    ----------
+    array : np.ndarray or astropy.units.Quantity
+        The array being transferred.
+    dtype : np.dtype
+        The dtype the array must have.
+    array_policy : str
+        See `node_update`.
+
+    Returns
+    -------
+    np.ndarray
+        The array (or a copy or view of it) with the requested dtype.
+    """
+    if array_policy == "copy" or array.dtype != dtype:
+        value = array.astype(dtype)
+        return getattr(value, "value", value)
+
+    value = getattr(array, "value", array)
+    if array_policy == "readonly":
+        value = value.view()
+        value.flags.writeable = False
+    return value
+
+
 def node_update(
     to_node: DNode | LNode | TaggedScalarNode,
     from_node: DNode | LNode | TaggedScalarNode | DataModel,
     extras: list[str] | tuple[str, ...] | None = None,
     extras_key: str | None = None,
     ignore: list[str] | tuple[str, ...] | None = None,
+    array_policy: str = "copy",
 ) -> None:
     """Copy node contents from an existing node to another existing node
 
@@ -118,7 +168,8 @@ def node_update(
 
     Keys in ``ignore`` are not considered.
 
-    Keys are also
+    Arrays are converted to the dtype of the array they replace. Arrays which already
+    have that dtype are transferred according to ``array_policy``.
 
     Parameters
     ----------
@@ -138,7 +189,20 @@ def node_update(
 
     ignore : list[str], tuple[str, ...] or None
         Keys that should be completely ignored.
+
+    array_policy : str
+        How to transfer arrays which already have the expected dtype:
+            - ``"copy"`` (default) copy the array.
+            - ``"view"`` use the array itself, so ``to_node`` and ``from_node``
+              share the array (and any changes made to it).
+            - ``"readonly"`` use a read-only view of the array, so the array is shared
+              but cannot be modified through ``to_node``. This is as close as numpy
+              gets to copy-on-write: replace the array (for example with a copy of it)
+              before modifying it.
+        Memory mapped arrays are shared (not loaded) by ``"view"`` and ``"readonly"``.
     """
+    if array_policy not in ARRAY_POLICIES:
+        raise ValueError(f"Unknown array_policy {array_policy!r}, must be one of {ARRAY_POLICIES}")
 
     # Define utilities functions
     def _descend(attributes, key):
@@ -175,8 +239,7 @@ def node_update(
                     if isinstance(to_node[key], list):
                         value = getattr(from_node, key).data
                     elif isinstance(to_node[key], np.ndarray):
-                        value = getattr(from_node, key).astype(to_node[key].dtype)
-                        value = getattr(value, "value", value)
+                        value = _transfer_array(getattr(from_node, key), to_node[key].dtype, array_policy)
                     else:
                         value = getattr(from_node, key)
                     if isinstance(value, TaggedScalarNode):
@@ -282,7 +345,102 @@ def _open_asdf(init, lazy_tree=True, **kwargs):
     return _patch_meta_filename(init, asdf_file)
 
 
-def rdm_open(init, memmap=False, **kwargs):
+def _mmap_base(array):
+    """
+    Find the memory map backing an array.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The array to check.
+
+    Returns
+    -------
+    mmap.mmap or None
+        The memory map, or None if the array is not memory mapped.
+    """
+    base = array
+    while base is not None and not isinstance(base, mmap.mmap):
+        base = getattr(base, "base", None)
+    return base
+
+
+def _apply_memmap_policy(asdf_file, init, memmap, readonly):
+    """
+    Decide, array by array, which of the arrays of the opened model stay memory mapped.
+        The file has to have been opened with ``memmap=True``. Only the arrays stored
+        directly on the model (``data``, ``err``, ``dq``, ...) are considered, other
+        arrays are left to `asdf`.
+
+    Parameters
+    ----------
+    asdf_file : `asdf.AsdfFile`
+        The opened file.
+    init : str, ``Path`` or file-like
+        What the file was opened from.
+    memmap : True or collection of str
+        The memmap argument passed to `rdm_open`.
+    readonly : bool
+        If the memory mapped (and compressed) arrays should be read-only.
+
+    Returns
+    -------
+    mmap.mmap or None
+        The private (copy-on-write) mapping of the file, if one was made, to be
+        closed with the model.
+    """
+    node = asdf_file.tree["roman"]
+    if not isinstance(node, Mapping):
+        return None
+
+    # The private (copy-on-write) mapping of the whole file, shared by all its arrays
+    private_map = None
+
+    for key, value in list(node.items()):
+        if not isinstance(value, np.ndarray | asdf.tags.core.NDArrayType):
+            continue
+
+        # Compressed arrays cannot be memory mapped, asdf reads them on access unless they
+        #    have to be read-only, then they are decoded now so their flag can be cleared
+        if asdf_file.get_array_compression(value) is not None:
+            if memmap is True or key in memmap:
+                if not readonly:
+                    continue
+                array = np.asarray(value)
+                array.flags.writeable = False
+                node[key] = array
+                continue
+            node[key] = np.asarray(value)
+            continue
+
+        array = np.asarray(value)
+        if (base := _mmap_base(array)) is None:
+            continue
+
+        if memmap is True:
+            # Shared mapping, writes go to the file in "rw" mode
+            pass
+        elif key in memmap:
+            if not readonly:
+                if private_map is None:
+                    with open(init, "rb") if isinstance(init, str | Path) else nullcontext(init) as fd:
+                        private_map = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_COPY)
+                offset = array.ctypes.data - np.frombuffer(base, dtype=np.uint8).ctypes.data
+                array = np.ndarray(array.shape, array.dtype, private_map, offset, array.strides)
+        else:
+            # Read small arrays now rather than keeping the file mapped for them
+            node[key] = array.copy()
+            continue
+
+        if readonly:
+            array = array.view()
+            array.flags.writeable = False
+        node[key] = array
+
+    return private_map
+
+
+def rdm_open(init, memmap=False, readonly=False, **kwargs):
     """
     Datamodel open/create function.
         This function opens a Roman datamodel from an asdf file or generates
@@ -294,15 +452,36 @@ def rdm_open(init, memmap=False, **kwargs):
         May be any one of the following types:
             - `asdf.AsdfFile` instance
             - string or ``Path`` indicating the path to an ASDF file
+            - string or ``Path`` indicating the path to a Parquet catalog
+              (saved with ``to_parquet``), the ``columns`` and ``filters``
+              keyword arguments select the columns and rows which are read
             - `DataModel` Roman data model instance
             - file-like object compatible with `asdf.open`
-    memmap : bool
-        Open ASDF file binary data using memmap (default: False)
+    memmap : bool or collection of str
+        How the arrays of the model are accessed:
+            - False (default): the arrays are read into memory when accessed.
+            - True: the arrays are memory mapped directly, changing them in
+              ``mode="rw"`` changes the file.
+            - collection of array names (e.g. ``{"data", "err"}``): only these
+              arrays are memory mapped, copy-on-write so that they are only read
+              from the file when accessed and changing them does not change the
+              file. The others are read into memory when the file is opened.
+        Compressed arrays cannot be memory mapped and are always read into
+        memory when accessed.
+    readonly : bool
+        Make the memory mapped arrays read-only so that they can be safely
+        shared, for example between threads (default: False). The compressed
+        arrays which would otherwise be mapped are read-only too, they are
+        then read when the file is opened.
 
     Returns
     -------
     `DataModel`
     """
+
+    # Temp fix to catch JWST args before being passed to asdf open
+    kwargs.pop("asn_n_members", None)
+
     if isinstance(init, str | Path):
         if Path(init).suffix.lower() == ".json":
             try:
@@ -312,14 +491,25 @@ def rdm_open(init, memmap=False, **kwargs):
             except ImportError as err:
                 raise ImportError("Please install romancal to allow opening associations with roman_datamodels") from err
 
+        if Path(init).suffix.lower() == ".parquet":
+            from ._parquet import open_parquet
+
+            # The other arguments are for asdf, which does not read the catalog
+            if unsupported := sorted(kwargs.keys() - {"columns", "filters"}):
+                raise TypeError(f"Parquet catalogs only accept the columns and filters arguments, got: {', '.join(unsupported)}")
+            return open_parquet(init, **kwargs)
+
     if isinstance(init, DataModel):
         # Copy the object so it knows not to close here
         return init.copy(deepcopy=False)
 
-    # Temp fix to catch JWST args before being passed to asdf open
-    kwargs.pop("asn_n_members", None)
+    if not (memmap is None or isinstance(memmap, bool)):
+        memmap = frozenset([memmap] if isinstance(memmap, str) else memmap)
 
-    asdf_file = init if isinstance(init, asdf.AsdfFile) else _open_asdf(init, memmap=memmap, **kwargs)
+    if isinstance(init, asdf.AsdfFile):
+        asdf_file = init
+    else:
+        asdf_file = _open_asdf(init, memmap=bool(memmap), **kwargs)
 
     # Check for "roman" key
     if "roman" not in asdf_file.tree:
@@ -328,8 +518,143 @@ def rdm_open(init, memmap=False, **kwargs):
         raise ValueError(f"'{init}' is not a roman file, please use asdf.open")
 
     if (model_type := type(asdf_file.tree["roman"])) in MODEL_REGISTRY:
-        return MODEL_REGISTRY[model_type](asdf_file, **kwargs)
+        private_map = None
+        if not isinstance(init, asdf.AsdfFile) and memmap:
+            private_map = _apply_memmap_policy(asdf_file, init, memmap, readonly)
+
+        model = MODEL_REGISTRY[model_type](asdf_file, **kwargs)
+        if private_map is not None:
+            model._files_to_close = [private_map]
+        return model
 
     if not isinstance(init, asdf.AsdfFile):
         asdf_file.close()
     raise TypeError(f"Unknown datamodel type: {model_type}, please use asdf.open for non-roman_datamodels files")
+
+
+def read_meta(init):
+    """
+    Read only the metadata of a Roman datamodel file.
+        Only the YAML header of the file is read and only the ``roman.meta`` part
+        of it is converted, the binary blocks are never read (nor their index).
+        This is much faster than opening the model when only the metadata is needed.
+
+    Parameters
+    ----------
+    init : str, ``Path`` or file-like
+        The ASDF file to read; if file-like it must be opened in binary mode.
+
+    Returns
+    -------
+    `ReadOnlyDNode`
+        The (read-only) ``meta`` of the model. ``meta.filename`` is the one stored
+        in the file.
+    """
+    try:
+        tree = asdf.util.load_yaml(init, tagged=True)
+    except ValueError as err:
+        raise TypeError("read_meta requires a filepath or file-like object") from err
+
+    if not isinstance(tree, Mapping) or "roman" not in tree:
+        raise ValueError(f"'{init}' is not a roman file, please use asdf.open")
+    if not isinstance((meta := tree["roman"]), Mapping) or not isinstance((meta := meta.get("meta")), Mapping):
+        raise TypeError(f"'{init}' does not contain roman metadata")
+
+    return ReadOnlyDNode(asdf.yamlutil.tagged_tree_to_custom_tree(meta, asdf.AsdfFile()))
+
+
+class CrdsParametersResult(NamedTuple):
+    """
+    The CRDS parameters of one file, as returned by `scan_crds_parameters`.
+    """
+
+    path: str | Path
+    """The file"""
+
+    parameters: dict[str, Any] | None
+    """The CRDS parameters (as `DataModel.get_crds_parameters`), None if reading the file failed"""
+
+    duration: float
+    """Time spent reading the file, in seconds"""
+
+    error: str | None
+    """The (repr of the) error raised reading the file, if any"""
+
+
+def _map_files(function, paths, max_workers):
+    """
+    Call a function on each file in a pool of processes.
+
+    Parameters
+    ----------
+    function : callable
+        The (picklable) function to call with each path.
+    paths : iterable of str or ``Path``
+        The files.
+    max_workers : int or None
+        The number of processes to use, if 1 the function is called in this process.
+
+    Yields
+    ------
+    Any
+        The result of each call, in the order they finish.
+    """
+    if max_workers == 1:
+        for path in paths:
+            yield function(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(function, path) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _read_crds_parameters(path):
+    """
+    Read the CRDS parameters of a single file (in a worker process).
+
+    Parameters
+    ----------
+    path : str or ``Path``
+        The file to read.
+
+    Returns
+    -------
+    CrdsParametersResult
+    """
+    start = perf_counter()
+    try:
+        parameters = _crds_parameters(read_meta(path))
+    except _READ_META_ERRORS as err:
+        return CrdsParametersResult(path, None, perf_counter() - start, repr(err))
+
+    # As when the file is opened, the filename is the name of the file (it may have been renamed)
+    if "roman.meta.filename" in parameters:
+        parameters["roman.meta.filename"] = Path(path).name
+    return CrdsParametersResult(path, parameters, perf_counter() - start, None)
+
+
+def scan_crds_parameters(paths: Iterable[str | Path], max_workers: int | None = None):
+    """
+    Get the CRDS parameters of many files.
+        The files are read in a pool of processes using `read_meta` (so only their
+        YAML headers are read) and the results are yielded as soon as each file is
+        done, so not in the order of ``paths``.
+
+    Parameters
+    ----------
+    paths : iterable of str or ``Path``
+        The files to read.
+    max_workers : int or None
+        The number of processes to use (default: the number of CPUs), if 1 the files
+        are read in this process.
+
+    Yields
+    ------
+    CrdsParametersResult
+        The parameters (or error) and time spent for each file. A file which cannot
+        be read does not stop the scan, its result has the error instead. As with
+        `rdm_open`, ``roman.meta.filename`` is the name of the file.
+    """
+    yield from _map_files(_read_crds_parameters, paths, max_workers)
@@ -21,6 +21,7 @@ the formula `2**bit_number` where `bit_number` is the 0-index bit of interest.
 
 # Something with pickling of multiclassed enums was changed in 3.11 + allowing
 # us to directly us `np.uint32` as the enum object rather than a python `int`.
+import sys
 from enum import Enum, unique
 
 import numpy as np
@@ -79,3 +80,254 @@ class group(np.uint8, Enum):
     WFI18_TRANSIENT = 2**7  # Affected by the WFI18 transient anomaly
 
 # fmt: on
+
+
+# Vectorized helpers
+# ------------------
+# These work on a flat view of the DQ array one chunk at a time, so the only
+# temporaries are chunk sized (the arrays may be memory mapped).
+
+# The number of array elements processed at a time
+CHUNK_SIZE = 2**20
+
+# The bits of each byte value, _BYTE_BITS[value, bit]
+_BYTE_BITS = (np.arange(256, dtype=np.int64)[:, None] >> np.arange(8)) & 1
+
+
+def _flags_for(dq):
+    """The flags enum matching the dtype of a DQ array"""
+    return group if dq.dtype.itemsize == 1 else pixel
+
+
+def _select(names, flags):
+    """The flags named, all of them if names is None"""
+    if names is None:
+        return list(flags)
+    if isinstance(names, str | Enum):
+        names = [names]
+    return [name if isinstance(name, flags) else flags[name] for name in names]
+
+
+def _chunks(dq, chunk_size):
+    """
+    Iterate over the chunks of the flattened DQ array.
+        Yields the offset of each chunk in the flattened array and the chunk,
+        which is a view unless the array is not C-contiguous. The offsets are
+        multiples of 8 (so that the chunks can be bit-packed on their own).
+    """
+    chunk_size = -(-chunk_size // 8) * 8
+    if dq.flags.c_contiguous:
+        flat = dq.reshape(-1)
+        for start in range(0, flat.size, chunk_size):
+            yield start, flat[start : start + chunk_size]
+    else:
+        row_size = dq[0].size
+        step = max(8, chunk_size // max(1, row_size) // 8 * 8)
+        for row in range(0, dq.shape[0], step):
+            yield row * row_size, np.ascontiguousarray(dq[row : row + step]).reshape(-1)
+
+
+def _scratch(scratch, size):
+    """A buffer for a chunk, scratch is reused if it is large enough"""
+    return scratch if scratch.size >= size else np.empty(size, dtype=scratch.dtype)
+
+
+def _check_dq(dq):
+    dq = np.asanyarray(dq)
+    if dq.dtype.kind not in "ui":
+        raise TypeError(f"DQ arrays must be integers, not {dq.dtype}")
+    return dq
+
+
+def encode_flags(names, flags=pixel):
+    """
+    Combine flags into a mask.
+
+    Parameters
+    ----------
+    names : str, flag or iterable of str or flags
+        The names of the flags (or the flags themselves) to combine.
+    flags : type
+        The flags enum the names belong to, `pixel` or `group`.
+
+    Returns
+    -------
+    np.uint32 or np.uint8
+        The mask with the bits of all the flags set, of the dtype of ``flags``.
+    """
+    mask = flags.GOOD.dtype.type(0)
+    for flag in _select(names, flags):
+        mask |= flag
+    return mask
+
+
+def decode_flags(dq, names=None, *, flags=None, chunk_size=CHUNK_SIZE):
+    """
+    Decode a DQ array into a boolean plane per flag.
+
+    Parameters
+    ----------
+    dq : array-like
+        The DQ array, e.g. ``dq``, ``pixeldq`` or ``groupdq``.
+    names : str, flag or iterable of str or flags, optional
+        The flags to decode, by default all of them.
+    flags : type, optional
+        The flags enum, by default `group` for 8-bit arrays and `pixel` otherwise.
+    chunk_size : int
+        The number of elements processed at a time.
+
+    Returns
+    -------
+    dict
+        The boolean array of the shape of ``dq`` (True where the flag is set) for each
+        flag, keyed by the flag name. The plane of ``GOOD`` is True where no flag is set.
+    """
+    dq = _check_dq(dq)
+    flags = _flags_for(dq) if flags is None else flags
+    selected = _select(names, flags)
+
+    planes = {flag.name: np.empty(dq.shape, dtype=bool) for flag in selected}
+    flat_planes = [(flag, planes[flag.name].reshape(-1)) for flag in selected]
+    scratch = np.empty(0, dtype=dq.dtype)
+    for start, chunk in _chunks(dq, chunk_size):
+        stop = start + chunk.size
+        scratch = _scratch(scratch, chunk.size)
+        bits = scratch[: chunk.size]
+        for flag, plane in flat_planes:
+            if flag:
+                np.bitwise_and(chunk, flag, out=bits, casting="unsafe")
+                np.not_equal(bits, 0, out=plane[start:stop])
+            else:
+                np.equal(chunk, 0, out=plane[start:stop])
+
+    return planes
+
+
+def count_flags(dq, names=None, *, flags=None, chunk_size=CHUNK_SIZE):
+    """
+    Count the elements of a DQ array with each flag set, in a single pass.
+
+    Parameters
+    ----------
+    dq : array-like
+        The DQ array, e.g. ``dq``, ``pixeldq`` or ``groupdq``.
+    names : str, flag or iterable of str or flags, optional
+        The flags to count, by default all of them.
+    flags : type, optional
+        The flags enum, by default `group` for 8-bit arrays and `pixel` otherwise.
+    chunk_size : int
+        The number of elements processed at a time.
+
+    Returns
+    -------
+    dict
+        The number of elements with each flag set, keyed by the flag name. The count
+        of ``GOOD`` is the number of elements without any flag set.
+    """
+    dq = _check_dq(dq)
+    flags = _flags_for(dq) if flags is None else flags
+    selected = _select(names, flags)
+
+    itemsize = dq.dtype.itemsize
+    little = dq.dtype.byteorder == "<" or (dq.dtype.byteorder in "=|" and sys.byteorder == "little")
+
+    # The bits counted from the histogram of the byte holding them, the other flags directly
+    lanes = {}
+    other = []
+    for flag in selected:
+        value = int(flag)
+        if value and value & (value - 1) == 0 and value.bit_length() <= 8 * itemsize:
+            bit = value.bit_length() - 1
+            lane = bit // 8 if little else itemsize - 1 - bit // 8
+            lanes.setdefault(lane, []).append((flag.name, bit % 8))
+        else:
+            other.append(flag)
+
+    bit_counts = {lane: np.zeros(8, dtype=np.int64) for lane in lanes}
+    counts = {flag.name: 0 for flag in other}
+    for _, chunk in _chunks(dq, chunk_size):
+        if lanes:
+            chunk_bytes = chunk.view(np.uint8).reshape(-1, itemsize)
+            for lane in lanes:
+                bit_counts[lane] += np.bincount(chunk_bytes[:, lane], minlength=256) @ _BYTE_BITS
+        for flag in other:
+            if flag:
+                counts[flag.name] += int(np.count_nonzero(chunk & flag))
+            else:
+                counts[flag.name] += chunk.size - int(np.count_nonzero(chunk))
+
+    for lane, lane_flags in lanes.items():
+        for name, bit in lane_flags:
+            counts[name] = int(bit_counts[lane][bit])
+
+    return {flag.name: counts[flag.name] for flag in selected}
+
+
+def pack_bitplanes(dq, *, chunk_size=CHUNK_SIZE):
+    """
+    Pack a DQ array into one bit-packed plane per bit which is set in it.
+
+    Parameters
+    ----------
+    dq : array-like
+        The DQ array.
+    chunk_size : int
+        The number of elements processed at a time.
+
+    Returns
+    -------
+    dict
+        The planes (`numpy.packbits` of the flattened array) keyed by the bit
+        number, bits which are not set anywhere have no plane.
+    """
+    dq = _check_dq(dq)
+
+    used = 0
+    for _, chunk in _chunks(dq, chunk_size):
+        used |= int(np.bitwise_or.reduce(chunk, initial=0))
+    bits = [bit for bit in range(8 * dq.dtype.itemsize) if used >> bit & 1]
+
+    planes = {bit: np.empty(-(-dq.size // 8), dtype=np.uint8) for bit in bits}
+    scratch = np.empty(0, dtype=dq.dtype)
+    for start, chunk in _chunks(dq, chunk_size):
+        stop = start // 8 + -(-chunk.size // 8)
+        scratch = _scratch(scratch, chunk.size)
+        set_bits = scratch[: chunk.size]
+        for bit, plane in planes.items():
+            np.bitwise_and(chunk, np.array(1 << bit).astype(dq.dtype), out=set_bits)
+            plane[start // 8 : stop] = np.packbits(set_bits != 0)
+
+    return planes
+
+
+def unpack_bitplanes(planes, shape, dtype, *, chunk_size=CHUNK_SIZE):
+    """
+    Rebuild a DQ array from the planes made by `pack_bitplanes`.
+
+    Parameters
+    ----------
+    planes : dict
+        The bit-packed planes keyed by bit number.
+    shape : tuple
+        The shape of the DQ array.
+    dtype : numpy.dtype
+        The dtype of the DQ array.
+    chunk_size : int
+        The number of elements processed at a time.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    dq = np.zeros(shape, dtype=dtype)
+    scratch = np.empty(0, dtype=dq.dtype)
+    for start, chunk in _chunks(dq, chunk_size):
+        scratch = _scratch(scratch, chunk.size)
+        bits = scratch[: chunk.size]
+        for bit, plane in planes.items():
+            unpacked = np.unpackbits(plane[start // 8 : start // 8 + -(-chunk.size // 8)], count=chunk.size)
+            bits[...] = unpacked
+            bits <<= bit
+            chunk |= bits
+
+    return dq
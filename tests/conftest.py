@@ -1,10 +1,23 @@
 import asdf
 import pytest
 
+from roman_datamodels._stnode._cache import CACHE_DIR_ENV
 from roman_datamodels._stnode._registry import OBJECT_NODE_CLASSES_BY_PATTERN, SCHEMA_URIS_BY_TAG
 from roman_datamodels._stnode._stnode import _MANIFESTS as MANIFESTS
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache_dir(tmp_path_factory):
+    """
+    Keep the on-disk cache written by the tests out of the user's cache.
+        The cache directory is looked up on each access, so this applies to
+        everything cached while the tests run.
+    """
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path_factory.mktemp("cache")))
+        yield
+
+
 @pytest.fixture(scope="session", params=MANIFESTS)
 def manifest(request):
     return request.param
@@ -0,0 +1,129 @@
+import json
+
+import asdf
+import yaml
+
+from roman_datamodels._stnode import _cache
+from roman_datamodels._stnode._schema import _load_resolved_schema, _schema_resources, prewarm_schema_cache
+from roman_datamodels._stnode._stnode import _DATAMODEL_MANIFEST_PATHS, _MANIFESTS, _NODE_SPECS, _load_manifests, _node_specs
+
+
+def test_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv(_cache.CACHE_DIR_ENV, str(tmp_path))
+    assert _cache.cache_dir() == tmp_path
+
+    monkeypatch.setenv(_cache.DISABLE_CACHE_ENV, "1")
+    assert _cache.cache_dir() is None
+
+
+def test_cache_key():
+    assert _cache.cache_key("a", "b") == _cache.cache_key("a", b"b")
+    assert _cache.cache_key("ab", "c") != _cache.cache_key("a", "bc")
+
+
+def test_read_write_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv(_cache.CACHE_DIR_ENV, str(tmp_path))
+    key = _cache.cache_key("test")
+
+    assert _cache.read_cache("test", key) is None
+    _cache.write_cache("test", key, {"foo": [1, 2, 3]})
+    assert _cache.read_cache("test", key) == {"foo": [1, 2, 3]}
+
+    # Values which cannot be cached are ignored
+    _cache.write_cache("test", key, {"foo": object()})
+    assert _cache.read_cache("test", key) == {"foo": [1, 2, 3]}
+
+    # Corrupted entries are treated as missing
+    (tmp_path / "test" / f"{key}.json").write_text("{")
+    assert _cache.read_cache("test", key) is None
+
+
+def test_disabled_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv(_cache.CACHE_DIR_ENV, str(tmp_path))
+    monkeypatch.setenv(_cache.DISABLE_CACHE_ENV, "true")
+    key = _cache.cache_key("test")
+
+    _cache.write_cache("test", key, {"foo": "bar"})
+    assert _cache.read_cache("test", key) is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_manifests_cache(monkeypatch, tmp_path):
+    """
+    The cached manifests and specs match those computed directly from the YAML
+    """
+    monkeypatch.setenv(_cache.CACHE_DIR_ENV, str(tmp_path))
+    manifests = [yaml.safe_load(path.read_bytes()) for path in _DATAMODEL_MANIFEST_PATHS]
+
+    # Cold cache
+    assert _load_manifests(_DATAMODEL_MANIFEST_PATHS) == (manifests, _node_specs(manifests))
+    assert len(list((tmp_path / "manifests").iterdir())) == 1
+
+    # Warm cache
+    assert _load_manifests(_DATAMODEL_MANIFEST_PATHS) == (manifests, _node_specs(manifests))
+
+    # The values loaded at import time are also consistent
+    assert _MANIFESTS == manifests
+    assert _NODE_SPECS == _node_specs(manifests)
+
+
+def test_manifests_cache_corrupted(monkeypatch, tmp_path):
+    monkeypatch.setenv(_cache.CACHE_DIR_ENV, str(tmp_path))
+    _load_manifests(_DATAMODEL_MANIFEST_PATHS)
+
+    (cache_file,) = (tmp_path / "manifests").iterdir()
+    cache_file.write_text("not json")
+
+    assert _load_manifests(_DATAMODEL_MANIFEST_PATHS)[0] == _MANIFESTS
+
+
+def test_write_cache_not_round_trippable(monkeypatch, tmp_path):
+    """Values JSON would silently change are not cached"""
+    monkeypatch.setenv(_cache.CACHE_DIR_ENV, str(tmp_path))
+    key = _cache.cache_key("test")
+
+    _cache.write_cache("test", key, {1: (2, 3)})
+    assert _cache.read_cache("test", key) is None
+
+
+_SCHEMA_URI = "asdf://stsci.edu/datamodels/roman/schemas/wfi_image-1.0.0"
+
+
+def test_schema_resources():
+    resources = _schema_resources(_SCHEMA_URI)
+
+    assert _SCHEMA_URI in resources
+    # The schema references other schemas (e.g. the exposure metadata)
+    assert len(resources) > 1
+    assert all(uri in asdf.get_config().resource_manager for uri in resources)
+
+
+def test_schema_cache(monkeypatch, tmp_path):
+    """The cached resolved schema matches the one asdf resolves"""
+    monkeypatch.setenv(_cache.CACHE_DIR_ENV, str(tmp_path))
+    schema = asdf.schema.load_schema(_SCHEMA_URI, resolve_references=True)
+
+    # Cold cache
+    assert _load_resolved_schema.__wrapped__(_SCHEMA_URI) == schema
+    (cache_file,) = (tmp_path / "schemas").iterdir()
+
+    # Warm cache
+    assert _load_resolved_schema.__wrapped__(_SCHEMA_URI) == schema
+
+    # Entries for which a referenced resource has changed are not used
+    entry = json.loads(cache_file.read_text())
+    entry["schema"] = {"stale": True}
+    entry["resources"][next(uri for uri in entry["resources"] if uri != _SCHEMA_URI)] = "0" * 64
+    cache_file.write_text(json.dumps(entry))
+    assert _load_resolved_schema.__wrapped__(_SCHEMA_URI) == schema
+
+
+def test_prewarm_schema_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv(_cache.CACHE_DIR_ENV, str(tmp_path))
+    _load_resolved_schema.cache_clear()
+
+    try:
+        assert prewarm_schema_cache([_SCHEMA_URI, _SCHEMA_URI]) == [_SCHEMA_URI]
+        assert len(list((tmp_path / "schemas").iterdir())) == 1
+    finally:
+        _load_resolved_schema.cache_clear()
@@ -5,8 +5,20 @@ from astropy.table import Table
 from astropy.time import Time
 from astropy.units import Quantity
 
-from roman_datamodels._stnode import Observation, SkyBackground
-from roman_datamodels._stnode._schema import _NO_VALUE, Builder, FakeDataBuilder, NodeBuilder, SchemaType, _NoValueType
+from roman_datamodels._stnode import DNode, LazyArray, Observation, SkyBackground
+from roman_datamodels._stnode._schema import (
+    _NO_VALUE,
+    Builder,
+    FakeDataBuilder,
+    NodeBuilder,
+    SchemaType,
+    _get_plan_from_tag,
+    _get_properties,
+    _get_schema_from_tag,
+    _NoValueType,
+    _SchemaPlan,
+)
+from roman_datamodels.testing import assert_node_equal
 
 
 @pytest.mark.parametrize(
@@ -31,7 +43,10 @@ from roman_datamodels._stnode._schema import _NO_VALUE, Builder, FakeDataBuilder
         ({"minimum": 0}, SchemaType.NUMBER),
     ),
 )
-def test_type(schema, type_):
+@pytest.mark.parametrize("compiled", (False, True))
+def test_type(schema, type_, compiled):
+    if compiled:
+        schema = _SchemaPlan(schema)
     assert Builder().get_type(schema) == type_
 
 
@@ -84,7 +99,10 @@ def test_type(schema, type_):
         ({"required": ["A", "B"], "patternProperties": {"^(A|B)$": {"enum": [0]}}}, {}, {"A": 0, "B": 0}),
     ),
 )
-def test_build(schema, defaults, expected):
+@pytest.mark.parametrize("compiled", (False, True))
+def test_build(schema, defaults, expected, compiled):
+    if compiled:
+        schema = _SchemaPlan(schema)
     assert Builder().build(schema, defaults) == expected
 
 
@@ -238,3 +256,49 @@ def test_array_shape(ndim, shape, expected):
         schema["ndim"] = ndim
     arr = FakeDataBuilder(shape=shape).build(schema)
     assert arr.shape == expected
+
+
+def test_plan(object_node):
+    """A compiled schema behaves like the schema it was compiled from"""
+    schema = _get_schema_from_tag(object_node._default_tag)
+    plan = _get_plan_from_tag(object_node._default_tag)
+
+    assert plan is _get_plan_from_tag(object_node._default_tag)
+    assert plan == schema
+    assert dict(plan) == schema
+    assert Builder().get_type(plan) == Builder().get_type(schema)
+
+    # The compiled results are remembered
+    properties = plan.properties
+    assert plan.properties is properties
+    assert [name for name, _ in properties] == [name for name, _ in _get_properties(schema)]
+    assert all(isinstance(subschema, _SchemaPlan) for _, subschema in properties)
+
+
+def test_plan_build(object_node):
+    """Building from a compiled schema gives the same result as building from the schema"""
+    schema = _get_schema_from_tag(object_node._default_tag)
+    plan = _get_plan_from_tag(object_node._default_tag)
+
+    # Some minimal nodes contain the current time so only compare their keys
+    assert Builder().build(plan).keys() == Builder().build(schema).keys()
+    assert_node_equal(
+        object_node(FakeDataBuilder((2, 8, 8)).build(plan)),
+        object_node(FakeDataBuilder((2, 8, 8)).build(schema)),
+    )
+
+
+def test_lazy_array():
+    schema = {"tag": "tag:stsci.edu:asdf/core/ndarray-1.*", "ndim": 2, "datatype": "uint32"}
+    arr = FakeDataBuilder(shape=(8, 8), lazy_arrays=True).build(schema)
+    assert isinstance(arr, LazyArray)
+    assert not arr.materialized
+    assert arr.shape == (8, 8)
+    assert arr.dtype == np.uint32
+
+    node = DNode({"arr": arr})
+    assert node.arr is node["arr"]
+    assert arr.materialized
+    assert np.asarray(arr) is node.arr
+    assert node.arr.shape == (8, 8)
+    assert node.arr.dtype == np.uint32
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from roman_datamodels import datamodels
+from roman_datamodels._stnode import WfiImage, _templates
+from roman_datamodels.testing import assert_node_equal
+
+
+@pytest.fixture(autouse=True)
+def clear_templates():
+    _templates.clear_template_cache()
+    yield
+    _templates.clear_template_cache()
+
+
+def test_template_reused():
+    node = WfiImage.create_fake_data(shape=(8, 8))
+    assert len(_templates._TEMPLATES) == 1
+
+    other = WfiImage.create_fake_data(shape=(8, 8))
+    assert len(_templates._TEMPLATES) == 1
+    assert_node_equal(node, other)
+
+    WfiImage.create_fake_data(shape=(4, 4))
+    WfiImage.create_fake_data(defaults={"meta": {"filename": "foo.asdf"}}, shape=(8, 8))
+    assert len(_templates._TEMPLATES) == 3
+
+
+def test_template_independent():
+    node = WfiImage.create_fake_data(shape=(8, 8))
+    node.data[0, 0] = 1
+    node.meta.filename = "foo.asdf"
+    node.meta.wcs.name = "foo"
+
+    other = WfiImage.create_fake_data(shape=(8, 8))
+    assert other.data is not node.data
+    assert not other.data.any()
+    assert other.data.flags.writeable
+    assert other.meta.filename != "foo.asdf"
+    assert other.meta.wcs is not node.meta.wcs
+    assert other.meta.wcs.name != "foo"
+
+
+def test_template_uncacheable_defaults():
+    data = np.ones((8, 8), dtype=np.float32)
+    node = WfiImage.create_fake_data(defaults={"data": data}, shape=(8, 8))
+    assert not _templates._TEMPLATES
+    assert (node.data == 1).all()
+
+
+def test_template_lru(monkeypatch):
+    monkeypatch.setattr(_templates, "TEMPLATE_CACHE_SIZE", 2)
+
+    for size in (2, 3, 4):
+        datamodels.ImageModel.create_fake_data(shape=(size, size))
+    assert len(_templates._TEMPLATES) == 2
+    assert [key[2] for key in _templates._TEMPLATES] == [(3, 3), (4, 4)]
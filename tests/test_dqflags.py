@@ -136,3 +136,83 @@ def test_write_group_flags(tmp_path, flag):
     # Check that we can read the model back in and the flag is preserved
     with rdm.open(filename) as dm:
         assert (dm.groupdq == flag).all()
+
+
+def test_encode_flags():
+    """Test combining flags into a mask"""
+    mask = dqflags.encode_flags(["JUMP_DET", dqflags.pixel.SATURATED])
+    assert mask == dqflags.pixel.JUMP_DET | dqflags.pixel.SATURATED
+    assert isinstance(mask, np.uint32)
+
+    mask = dqflags.encode_flags("DO_NOT_USE", dqflags.group)
+    assert mask == dqflags.group.DO_NOT_USE
+    assert isinstance(mask, np.uint8)
+
+    with pytest.raises(KeyError):
+        dqflags.encode_flags("NOT_A_FLAG")
+
+
+@pytest.mark.parametrize(
+    "dq",
+    [
+        np.arange(2**12, dtype=np.uint32).reshape(64, 64) * 2**20 + np.arange(2**12, dtype=np.uint32).reshape(64, 64),
+        (np.arange(3 * 32 * 32, dtype=np.uint32).reshape(3, 32, 32) % 256).astype(np.uint8),
+        np.arange(64 * 64, dtype=np.uint32).reshape(64, 64)[:, ::3].astype(">u4"),
+    ],
+    ids=["pixel", "group", "strided-big-endian"],
+)
+def test_decode_count_flags(dq):
+    """Test decoding and counting the flags of DQ arrays (in several chunks)"""
+    flags = dqflags.group if dq.dtype.itemsize == 1 else dqflags.pixel
+
+    planes = dqflags.decode_flags(dq, chunk_size=100)
+    counts = dqflags.count_flags(dq, chunk_size=100)
+    assert list(planes) == list(counts) == [flag.name for flag in flags]
+
+    for flag in flags:
+        expected = (dq & flag) != 0 if flag else dq == 0
+        assert planes[flag.name].shape == dq.shape
+        assert (planes[flag.name] == expected).all()
+        assert counts[flag.name] == np.count_nonzero(expected)
+
+    # Only the requested flags
+    assert list(dqflags.count_flags(dq, ["SATURATED", "GOOD"])) == ["SATURATED", "GOOD"]
+    assert list(dqflags.decode_flags(dq, flags.DO_NOT_USE)) == ["DO_NOT_USE"]
+
+
+@pytest.mark.parametrize(
+    "dq",
+    [
+        np.arange(37 * 53, dtype=np.uint32).reshape(37, 53) * 2**19,
+        (np.arange(3 * 7 * 9, dtype=np.uint32).reshape(3, 7, 9) % 256).astype(np.uint8),
+        np.arange(40 * 40, dtype=np.uint32).reshape(40, 40)[:, ::3].astype(">u4"),
+        np.zeros((5, 5), dtype=np.uint32),
+    ],
+    ids=["pixel", "group", "strided-big-endian", "good"],
+)
+def test_pack_bitplanes(dq):
+    """Test packing DQ arrays into bit planes and back (in several chunks)"""
+    planes = dqflags.pack_bitplanes(dq, chunk_size=20)
+    assert sorted(planes) == [bit for bit in range(8 * dq.dtype.itemsize) if ((dq >> bit) & 1).any()]
+    assert all(plane.dtype == np.uint8 and plane.size == -(-dq.size // 8) for plane in planes.values())
+
+    unpacked = dqflags.unpack_bitplanes(planes, dq.shape, dq.dtype, chunk_size=20)
+    assert unpacked.dtype == dq.dtype
+    np.testing.assert_array_equal(unpacked, dq)
+
+
+def test_count_flags_memmap(tmp_path):
+    """Test counting the flags of a memory mapped DQ array"""
+    dq = np.memmap(tmp_path / "dq.dat", dtype=np.uint32, mode="w+", shape=(32, 32))
+    dq[::2] = dqflags.pixel.JUMP_DET | dqflags.pixel.DO_NOT_USE
+    dq.flush()
+
+    dq = np.memmap(tmp_path / "dq.dat", dtype=np.uint32, mode="r", shape=(32, 32))
+    counts = dqflags.count_flags(dq, ["JUMP_DET", "DO_NOT_USE", "GOOD", "HOT"], chunk_size=100)
+    assert counts == {"JUMP_DET": 512, "DO_NOT_USE": 512, "GOOD": 512, "HOT": 0}
+
+
+def test_flags_non_integer():
+    """Test that DQ arrays must be integers"""
+    with pytest.raises(TypeError, match="must be integers"):
+        dqflags.count_flags(np.zeros(4))
@@ -0,0 +1,109 @@
+import os
+
+import pytest
+from astropy.time import Time
+
+from roman_datamodels import datamodels
+
+FILTER = "roman.meta.instrument.optical_element"
+START = "roman.meta.exposure.start_time"
+
+
+def _write(path, optical_element, start_time):
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.meta.filename = path.name
+    model.meta.instrument.optical_element = optical_element
+    model.meta.exposure.start_time = Time(start_time)
+    model.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def files(tmp_path):
+    return [
+        _write(tmp_path / "a.asdf", "F158", "2027-01-01T00:00:00"),
+        _write(tmp_path / "b.asdf", "F158", "2027-01-03T00:00:00"),
+        _write(tmp_path / "c.asdf", "F062", "2027-01-02T00:00:00"),
+    ]
+
+
+def test_build_meta_index(tmp_path, files):
+    index = datamodels.build_meta_index(tmp_path, max_workers=1)
+
+    assert index["path"].to_pylist() == files
+    assert index[FILTER].to_pylist() == ["F158", "F158", "F062"]
+    with datamodels.open(files[0]) as model:
+        flat = {
+            f"roman.{key}": value.isot if isinstance(value, Time) else value
+            for key, value in model.items()
+            if key.startswith("meta.")
+        }
+    row = index.slice(0, 1).to_pylist()[0]
+    assert {key: str(row[key]) for key in row if key in flat} == {key: str(value) for key, value in flat.items() if key in row}
+    assert row[START] == "2027-01-01T00:00:00.000"
+
+
+def test_meta_index_filename(tmp_path, files):
+    # The filename is the name of the file, even if it has been renamed
+    renamed = tmp_path / "renamed.asdf"
+    os.rename(files[0], renamed)
+
+    index = datamodels.build_meta_index([str(renamed)], max_workers=1)
+    assert index["roman.meta.filename"].to_pylist() == ["renamed.asdf"]
+
+
+def test_meta_index_time_format(tmp_path):
+    path = tmp_path / "mjd.asdf"
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.meta.filename = path.name
+    model.meta.exposure.start_time = Time(61406.0, format="mjd")
+    model.save(path)
+
+    # Times are indexed as ISO strings, whatever format they were written in
+    index = datamodels.build_meta_index([str(path)], max_workers=1)
+    assert index[START].to_pylist() == ["2027-01-01T00:00:00.000"]
+    assert datamodels.query_meta_index(index, {START: (Time("2026-12-31"), "2027-01-02")}) == [str(path)]
+
+
+def test_query_meta_index(files):
+    index = datamodels.build_meta_index(files, max_workers=1)
+
+    assert datamodels.query_meta_index(index, {FILTER: "F158"}) == files[:2]
+    assert datamodels.query_meta_index(index, {FILTER: ["F062", "F213"]}) == files[2:]
+    assert datamodels.query_meta_index(index, {FILTER: "F158", START: (None, "2027-01-02")}) == files[:1]
+    assert datamodels.query_meta_index(index, {START: (Time("2027-01-01T12:00:00"), None)}) == files[1:]
+    assert datamodels.query_meta_index(index, {"roman.meta.missing": 1}) == []
+    assert datamodels.query_meta_index(index, {}) == files
+
+
+def test_meta_index_incremental(tmp_path, files, monkeypatch):
+    index_path = tmp_path / "index.parquet"
+    datamodels.build_meta_index(files, index_path, max_workers=1)
+
+    read = []
+    original = datamodels._index._read_flat_meta
+    monkeypatch.setattr(datamodels._index, "_read_flat_meta", lambda path: read.append(path) or original(path))
+
+    # Nothing changed
+    index = datamodels.build_meta_index(files, index_path, max_workers=1)
+    assert not read
+    assert datamodels.query_meta_index(index_path, {FILTER: "F158"}) == files[:2]
+
+    # Change one file, drop another and add a new one
+    _write(tmp_path / "a.asdf", "F213", "2027-01-01T00:00:00")
+    stat = os.stat(files[0])
+    os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    new = _write(tmp_path / "d.asdf", "F158", "2027-01-04T00:00:00")
+
+    index = datamodels.build_meta_index([files[0], files[1], new], index_path, max_workers=1)
+    assert read == [files[0], new]
+    assert index["path"].to_pylist() == [files[0], files[1], new]
+    assert datamodels.query_meta_index(index_path, {FILTER: "F158"}) == [files[1], new]
+
+
+def test_meta_index_bad_file(tmp_path, files):
+    (bad := tmp_path / "bad.asdf").write_text("not asdf")
+
+    with pytest.warns(UserWarning, match="Could not index .*bad.asdf"):
+        index = datamodels.build_meta_index([*files, str(bad)], max_workers=1)
+    assert index["path"].to_pylist() == files
@@ -1,4 +1,5 @@
 import gc
+import pickle
 from contextlib import nullcontext
 from copy import deepcopy
 
@@ -14,24 +15,29 @@ from gwcs import coordinate_frames
 from gwcs.wcs import WCS
 from numpy.testing import assert_array_equal
 
-from roman_datamodels import datamodels
+from roman_datamodels import datamodels, dqflags
 from roman_datamodels._stnode import (
     CalLogs,
     DNode,
     IndividualImageMeta,
+    LazyArray,
     LNode,
     MosaicAssociations,
     Observation,
     OutlierDetection,
+    PackedDQ,
     Resample,
     SkyBackground,
     SourceCatalog,
     WfiImage,
     WfiWcs,
+    _digest,
 )
+from roman_datamodels._stnode._compression import COMPRESSION_EXTENSION_URI, PARALLEL_LZ4
 from roman_datamodels._stnode._registry import NODE_CLASSES_BY_TAG
 from roman_datamodels._stnode._tagged import _NO_VALUE
 from roman_datamodels.datamodels._core import DEFAULT_ARRAY_INLINE_THRESHOLD
+from roman_datamodels.datamodels._utils import node_update
 from roman_datamodels.testing import assert_node_equal, assert_node_is_copy
 
 from .conftest import MANIFESTS
@@ -252,6 +258,37 @@ def test_get_column_description(model_class):
         assert np.dtype(column_def["datatype"]) == column.dtype
 
 
+def test_get_column_definition_memoized():
+    model = datamodels.ImageSourceCatalogModel.create_fake_data()
+    name = model.source_catalog.colnames[0]
+
+    # The memoized definitions are not changed through the returned dicts
+    column_def = model.get_column_definition(name)
+    column_def["unit"] = "changed"
+    assert model.get_column_definition(name)["unit"] != "changed"
+
+    assert model.get_column_definition(f"forced_{name}") == model.get_column_definition(name)
+    assert model.get_column_definition("not_a_column") is None
+    assert model.get_column_definition("not_a_column") is None
+
+
+@pytest.mark.parametrize("nrows", [0, 7])
+def test_create_empty_catalog(nrows):
+    model = datamodels.MultibandSourceCatalogModel.create_fake_data()
+    catalog = model.create_empty_catalog(aperture_radii=[1, 2], filters=["f158", "f184"], nrows=nrows)
+
+    assert len(catalog) == nrows
+    assert {"aper01_f158_flux", "aper02_f184_flux"} <= set(catalog.colnames)
+    for column in catalog.columns.values():
+        column_def = model.get_column_definition(column.name)
+        assert column.dtype == column_def["datatype"]
+        assert column.description == column_def["description"]
+        assert not np.any(column)
+
+    model.source_catalog = catalog
+    model.validate()
+
+
 def test_datamodel_info_search(capsys):
     dm = datamodels.ScienceRawModel.create_fake_data()
     dm.info(max_rows=200)
@@ -279,9 +316,9 @@ def test_datamodel_schema_info_existence(name):
         info = model.schema_info("archive_catalog")
         for keyword in model.meta.keys():
             # Only DNodes or LNodes need to be canvassed
-            if isinstance(model.meta[keyword], DNode | LNode):
+            if isinstance(model.meta._data[keyword], DNode | LNode):
                 # Ignore metadata schemas that lack archive_catalog entries
-                if type(model.meta[keyword]) not in NODES_LACKING_ARCHIVE_CATALOG:
+                if type(model.meta._data[keyword]) not in NODES_LACKING_ARCHIVE_CATALOG:
                     assert keyword in info["roman"]["meta"]
 
 
@@ -308,6 +345,67 @@ def test_crds_parameters(model_class):
     assert "roman.test" not in crds_pars
 
 
+def test_flat_dict_cache(monkeypatch):
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+
+    flat = model.to_flat_dict()
+    crds_pars = model.get_crds_parameters()
+
+    # Repeated calls do not walk the model again
+    walks = []
+    original = DNode._recursive_items
+    monkeypatch.setattr(DNode, "_recursive_items", lambda self, *args: walks.append(1) or original(self, *args))
+    assert model.to_flat_dict() == flat
+    assert model.get_crds_parameters() == crds_pars
+    assert not walks
+
+    # Callers cannot modify the cache
+    model.to_flat_dict()["roman.meta.filename"] = "foo.asdf"
+    assert model.to_flat_dict()["roman.meta.filename"] == flat["roman.meta.filename"]
+
+    # Changes to nested nodes (through setattr, setitem and delitem) invalidate it
+    model.meta.exposure.nresultants = 42
+    assert model.to_flat_dict()["roman.meta.exposure.nresultants"] == 42
+    assert model.get_crds_parameters()["roman.meta.exposure.nresultants"] == 42
+
+    model.meta.exposure["nresultants"] = 43
+    assert model.to_flat_dict()["roman.meta.exposure.nresultants"] == 43
+
+    del model.meta.exposure["nresultants"]
+    assert "roman.meta.exposure.nresultants" not in model.to_flat_dict()
+    assert "roman.meta.exposure.nresultants" not in model.get_crds_parameters()
+
+    # Including changes to children reached through item access
+    model.meta["exposure"]["type"] = "WFI_GRISM"
+    assert model.get_crds_parameters()["roman.meta.exposure.type"] == "WFI_GRISM"
+
+    model["meta"]["instrument"]["optical_element"] = "GRISM"
+    assert model.get_crds_parameters()["roman.meta.instrument.optical_element"] == "GRISM"
+
+    # Or kept from before the cached call
+    exposure = model.meta["exposure"]
+    model.get_crds_parameters()
+    exposure["type"] = "WFI_IMAGE"
+    assert model.get_crds_parameters()["roman.meta.exposure.type"] == "WFI_IMAGE"
+
+    # Reading the model does not invalidate it
+    model.meta["exposure"]["type"]
+    walks.clear()
+    model.get_crds_parameters()
+    assert not walks
+
+    # Nor do changes to other models
+    other = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    other.meta.exposure.nresultants = 44
+    model.get_crds_parameters()
+    assert not walks
+
+    # But changes to the children shared with a shallow copy do
+    meta = model.meta.copy()
+    meta.exposure.type = "WFI_GRISM"
+    assert model.get_crds_parameters()["roman.meta.exposure.type"] == "WFI_GRISM"
+
+
 def test_model_validate_without_save():
     # regression test for rcal-538
     m = datamodels.ImageModel.create_fake_data(shape=(8, 8))
@@ -321,6 +419,149 @@ def test_model_validate_without_save():
         m.validate()
 
 
+def test_lazy_fake_data(tmp_path):
+    file_path = tmp_path / "test.asdf"
+
+    m = datamodels.ImageModel.create_fake_data(shape=(8, 8), lazy_arrays=True)
+    lazy = m._instance._data["data"]
+    assert isinstance(lazy, LazyArray)
+    assert not lazy.materialized
+
+    # Validating and walking the model do not allocate the arrays
+    m.validate()
+    assert m.to_flat_dict()["roman.data"] is lazy
+    assert "roman.data" not in m.to_flat_dict(include_arrays=False)
+    assert dict(m.items())["data"] is lazy
+    assert m._instance.to_flat_dict()["data"] is lazy
+    assert not lazy.materialized
+
+    # A wrong shape is still found without allocating the array
+    m._instance._data["data"] = LazyArray((8,), lazy.dtype)
+    with pytest.raises(ValidationError):
+        m.validate()
+    assert not m._instance._data["data"].materialized
+    m._instance._data["data"] = lazy
+
+    # Like numpy, refuse to convert without a copy when one is needed
+    with pytest.raises(ValueError, match="copy"):
+        np.asarray(lazy, dtype=np.float64, copy=False)
+    assert np.asarray(lazy, copy=False) is lazy.materialize()
+
+    m.save(file_path)
+
+    with datamodels.open(file_path) as m2:
+        assert m2.data.shape == (8, 8)
+        assert m2.data.dtype == m.data.dtype
+        assert not m2.data.any()
+
+
+def test_pack_dq(tmp_path):
+    file_path = tmp_path / "test.asdf"
+
+    m = datamodels.ImageModel.create_fake_data(shape=(64, 64))
+    m.dq[:4] = dqflags.pixel.REFERENCE_PIXEL
+    m.dq[10, 10] |= dqflags.pixel.HOT
+    dq = m.dq.copy()
+
+    assert m.pack_dq() > 0
+    packed = m._instance._data["dq"]
+    assert isinstance(packed, PackedDQ)
+    assert packed.packed_nbytes == 2 * 64 * 64 // 8
+    assert not packed.materialized
+
+    # Pickling and copying keep the packed form
+    for other in (pickle.loads(pickle.dumps(packed)), deepcopy(packed)):  # noqa: S301
+        assert isinstance(other, PackedDQ)
+        assert_array_equal(np.asarray(other), dq)
+
+    # Readers see the decoded array (the planes are dropped), changes to it are kept when re-packing
+    assert_array_equal(m.dq, dq)
+    assert packed.materialized
+    assert packed.packed_nbytes == 0
+    for other in (pickle.loads(pickle.dumps(packed)), deepcopy(packed)):  # noqa: S301
+        assert_array_equal(np.asarray(other), dq)
+    m.dq[20, 20] = dqflags.pixel.DEAD
+    dq[20, 20] = dqflags.pixel.DEAD
+    m.pack_dq()
+    assert not packed.materialized
+    assert packed.packed_nbytes == 3 * 64 * 64 // 8
+
+    m.validate()
+    m.save(file_path)
+    with datamodels.open(file_path) as m2:
+        assert_array_equal(m2.dq, dq)
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_content_digest(max_workers, monkeypatch):
+    # Small chunks so that the arrays are hashed in many chunks
+    monkeypatch.setattr(_digest, "DIGEST_CHUNK_SIZE", 1000)
+
+    m = datamodels.ImageModel.create_fake_data(shape=(64, 64))
+    m.data[:] = np.arange(64 * 64).reshape(64, 64)
+    digest = m.content_digest(max_workers)
+    assert digest == m.content_digest(1)
+    assert digest == m._instance.content_digest(max_workers)
+
+    # Copies, byte order and the order of the keys do not change the digest
+    m2 = m.copy()
+    assert m2.content_digest(max_workers) == digest
+    m2.data = m2.data.astype(m2.data.dtype.newbyteorder())
+    m2.err = np.asfortranarray(m2.err)
+    items = list(m2.meta.items())
+    m2.meta.clear()
+    m2.meta.update(reversed(items))
+    assert m2.content_digest(max_workers) == digest
+
+    # Changing the content does
+    m2.data[10, 10] += 1
+    assert m2.content_digest(max_workers) != digest
+    m2 = m.copy()
+    m2.meta.exposure.start_time += 1 * u.s
+    assert m2.content_digest(max_workers) != digest
+
+    # Packed DQ arrays are hashed without keeping them decoded
+    m.pack_dq()
+    assert m.content_digest(max_workers) == digest
+    assert not m._instance._data["dq"].materialized
+
+    # The types of the keys and of the numpy scalars are part of the content
+    assert DNode({1: "a"}).content_digest(max_workers) != DNode({"1": "a"}).content_digest(max_workers)
+    assert DNode({"a": np.float32(1.0)}).content_digest(max_workers) != DNode({"a": 1.0}).content_digest(max_workers)
+    assert DNode({"a": np.float32(1.0)}).content_digest(max_workers) != DNode({"a": np.float64(1.0)}).content_digest(max_workers)
+
+    # Lazy arrays are hashed like the zero filled arrays without allocating them
+    lazy = datamodels.ImageModel.create_fake_data(shape=(64, 64), lazy_arrays=True)
+    digest = lazy.content_digest(max_workers)
+    assert not lazy._instance._data["data"].materialized
+    assert not np.any(lazy.data)
+    assert lazy.content_digest(max_workers) == digest
+
+
+def test_content_digest_cached(tmp_path):
+    file_path = tmp_path / "test.asdf"
+    datamodels.ImageModel.create_fake_data(shape=(64, 64)).save(file_path, all_array_compression=None)
+
+    with datamodels.open(file_path) as m:
+        digest = m.content_digest()
+        # Writable arrays are not cached
+        assert id(m.data) not in _digest._ARRAY_DIGESTS
+
+    with datamodels.open(file_path, memmap=True, readonly=True) as m:
+        assert m.content_digest() == digest
+        key = id(m.data)
+        assert key in _digest._ARRAY_DIGESTS
+        del m
+    gc.collect()
+    assert key not in _digest._ARRAY_DIGESTS
+
+    # Read-only arrays owning their data are not cached, they can be made writable again
+    model = datamodels.ImageModel.create_fake_data(shape=(64, 64))
+    model.data.flags.writeable = False
+    model.content_digest()
+    assert id(model.data) not in _digest._ARRAY_DIGESTS
+
+
 @pytest.mark.filterwarnings("ignore:ERFA function.*")
 @pytest.mark.parametrize("node_class", datamodels.MODEL_REGISTRY.keys())
 @pytest.mark.parametrize("correct, model", datamodels.MODEL_REGISTRY.items())
@@ -588,6 +829,10 @@ def test_default_array_compression(tmp_path):
     with asdf.open(fn) as af:
         assert af.get_array_compression(af["roman"]["data"]) == "lz4"
 
+        # The blocks are compressed by asdf's own lz4 compressor, not the roman one
+        extensions = [extension.extension_uri for extension in af["history"]["extensions"]]
+        assert COMPRESSION_EXTENSION_URI not in extensions
+
 
 @pytest.mark.parametrize("compression", [None, "bzp2"])
 def test_array_compression_override(tmp_path, compression):
@@ -602,6 +847,64 @@ def test_array_compression_override(tmp_path, compression):
         assert af.get_array_compression(af["roman"]["data"]) == compression
 
 
+def test_per_array_compression(tmp_path, monkeypatch):
+    """
+    Test that arrays can be given their own compression by the model class
+    and when saving.
+    """
+    fn = tmp_path / "foo.asdf"
+    monkeypatch.setattr(datamodels.ImageModel, "default_array_compression", {"dq": "zlib", "err": "zlib"})
+    model = datamodels.ImageModel.create_fake_data(shape=(DEFAULT_ARRAY_INLINE_THRESHOLD + 1, 1))
+    model.save(fn, array_compression={"err": None, "var_poisson": "bzp2"})
+    with asdf.open(fn) as af:
+        assert af.get_array_compression(af["roman"]["dq"]) == "zlib"
+        assert af.get_array_compression(af["roman"]["err"]) is None
+        assert af.get_array_compression(af["roman"]["var_poisson"]) == "bzp2"
+        assert af.get_array_compression(af["roman"]["data"]) == "lz4"
+        assert_array_equal(af["roman"]["dq"], model.dq)
+
+
+def test_per_array_compression_table_columns():
+    """
+    Test that the columns of tables keep the default compression when
+    other arrays are given their own.
+    """
+    model = datamodels.ImageSourceCatalogModel.create_fake_data()
+    model.source_catalog = model.create_empty_catalog(nrows=10)
+
+    asdf_file = asdf.AsdfFile()
+    asdf_file["roman"] = model._instance
+    model._set_array_compression(asdf_file, {"source_catalog.ra": "zlib"}, "lz4")
+    assert asdf_file.get_array_compression(model.source_catalog["ra"]) == "zlib"
+    assert asdf_file.get_array_compression(model.source_catalog["dec"]) == "lz4"
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_compression_threads(tmp_path, threads):
+    """
+    Test that lz4 blocks compressed on a thread pool are read back
+    """
+    fn = tmp_path / "foo.asdf"
+    model = datamodels.ImageModel.create_fake_data(shape=(2048, 1200))
+    model.data[...] = np.arange(model.data.size).reshape(model.data.shape) % 1000
+    model.save(fn, compression_threads=threads)
+
+    # Rewrite the file with lz4 blocks read from it
+    with datamodels.open(fn) as m2:
+        assert_array_equal(m2.data, model.data)
+        m2.save(tmp_path / "bar.asdf", compression_threads=threads)
+
+    with asdf.open(tmp_path / "bar.asdf") as af:
+        assert af.get_array_compression(af["roman"]["data"]) == ("lz4" if threads == 1 else PARALLEL_LZ4)
+        assert_array_equal(af["roman"]["data"], model.data)
+
+    # Blocks written with the roman lz4 compressor out of the thread pool are read back too
+    fn = tmp_path / "baz.asdf"
+    model.save(fn, all_array_compression=PARALLEL_LZ4)
+    with datamodels.open(fn) as m2:
+        assert_array_equal(m2.data, model.data)
+
+
 @pytest.mark.parametrize("storage", ["inline", "internal", "external"])
 def test_array_storage_override(tmp_path, storage):
     """
@@ -973,3 +1276,58 @@ class TestRomanDatamodelCreatorDefaults:
             # Sanity check to show the chosen test data is different from the default
             assert getattr(default_mdl.meta, key) != value
             assert getattr(mdl.meta, key) == value, f"meta.{key} was not set to input default"
+
+
+@pytest.mark.parametrize("array_policy", ("copy", "view", "readonly"))
+def test_node_update_array_policy(array_policy):
+    from_node = DNode({"same": np.ones(4, dtype=np.float32), "other": np.ones(4, dtype=np.uint16)})
+    to_node = DNode({"same": np.zeros(4, dtype=np.float32), "other": np.zeros(4, dtype=np.float32)})
+
+    node_update(to_node, from_node, array_policy=array_policy)
+    assert_array_equal(to_node.same, from_node.same)
+    assert_array_equal(to_node.other, from_node.other)
+
+    # arrays which need converting are always copied
+    assert to_node.other.dtype == np.float32
+    assert not np.shares_memory(to_node.other, from_node.other)
+
+    assert np.shares_memory(to_node.same, from_node.same) == (array_policy != "copy")
+    assert to_node.same.flags.writeable == (array_policy != "readonly")
+
+
+def test_node_update_bad_array_policy():
+    with pytest.raises(ValueError, match="Unknown array_policy"):
+        node_update(DNode(), DNode(), array_policy="bad")
+
+
+def test_ramp_stream_from_science_raw(tmp_path):
+    raw_path = tmp_path / "raw.asdf"
+    ramp_path = tmp_path / "ramp.asdf"
+
+    raw = datamodels.ScienceRawModel.create_fake_data(shape=(3, 8, 8))
+    raw.data = np.arange(raw.data.size, dtype=raw.data.dtype).reshape(raw.data.shape)
+    raw.amp33 = np.arange(raw.amp33.size, dtype=raw.amp33.dtype).reshape(raw.amp33.shape)
+    raw.save(raw_path, all_array_compression=None)
+
+    with pytest.warns(DeprecationWarning, match="from_science_raw is deprecated"):
+        expected = datamodels.RampModel.from_science_raw(raw)
+
+    # use a tiny chunk size to make sure the arrays are copied in several chunks
+    assert datamodels.RampModel.stream_from_science_raw(raw_path, ramp_path, chunk_size=10) == ramp_path
+
+    with datamodels.open(ramp_path, validate_checksums=True, lazy_load=False) as ramp:
+        assert isinstance(ramp, datamodels.RampModel)
+        assert ramp.meta.filename == "ramp.asdf"
+        for key in ("data", "amp33", "groupdq", "pixeldq"):
+            assert ramp[key].dtype == expected[key].dtype
+            assert_array_equal(ramp[key], expected[key])
+        assert ramp.meta.exposure.type == expected.meta.exposure.type
+        assert ramp.meta.cal_step == expected.meta.cal_step
+        assert ramp.border_ref_pix_left.shape == (3, 8, 4)
+        assert "resultantdq" not in ramp
+        ramp.validate()
+
+
+def test_ramp_stream_from_science_raw_bad_model(tmp_path):
+    with pytest.raises(TypeError, match="Input must be a ScienceRawModel"):
+        datamodels.RampModel.stream_from_science_raw(datamodels.ImageModel.create_fake_data(), tmp_path / "ramp.asdf")
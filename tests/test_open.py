@@ -1,4 +1,5 @@
 import json
+import mmap
 import os
 from contextlib import nullcontext
 from pathlib import Path
@@ -194,6 +195,104 @@ def test_no_memmap(tmp_path, kwargs):
         assert (model.data == data).all()
 
 
+def _mapped(array):
+    while array is not None and not isinstance(array, np.memmap | mmap.mmap):
+        array = array.base
+    return array is not None
+
+
+def test_memmap_policy(tmp_path):
+    file_path = tmp_path / "test.asdf"
+    with asdf.AsdfFile() as af:
+        af.tree = {"roman": WfiImage.create_fake_data(shape=(8, 8))}
+        af.tree["roman"].meta.filename = "test.asdf"
+        af.set_array_compression(af.tree["roman"].var_poisson, "zlib")
+        af.write_to(file_path)
+
+    with datamodels.open(file_path, memmap=["data", "err", "var_poisson"]) as model:
+        assert _mapped(model.data)
+        assert _mapped(model.err)
+        assert not _mapped(model.dq)
+        assert not _mapped(model.var_poisson)
+
+        # copy-on-write
+        model.data[0, 0] = 1
+        assert model.data.flags.writeable
+
+    # The arrays are not mapped by default
+    with datamodels.open(file_path) as model:
+        assert not _mapped(model.data)
+        assert model.data[0, 0] == 0
+
+    # The private map of the file is closed with the model, once its arrays are released
+    with datamodels.open(file_path, memmap=["data"]) as model:
+        (private_map,) = model._files_to_close
+        assert _mapped(model.data)
+        model.data = np.zeros((8, 8), dtype=model.data.dtype)
+    assert private_map.closed
+
+
+def test_memmap_readonly(tmp_path):
+    file_path = tmp_path / "test.asdf"
+    with asdf.AsdfFile() as af:
+        af.tree = {"roman": WfiImage.create_fake_data(shape=(8, 8))}
+        af.tree["roman"].meta.filename = "test.asdf"
+        af.write_to(file_path)
+
+    with datamodels.open(file_path, memmap="data", readonly=True, mode="rw") as model:
+        assert _mapped(model.data)
+        assert not model.data.flags.writeable
+        assert model.dq.flags.writeable
+        with pytest.raises(ValueError, match="read-only"):
+            model.data[0, 0] = 1
+
+
+def test_memmap_readonly_compressed(tmp_path):
+    file_path = tmp_path / "test.asdf"
+    model = datamodels.ImageModel.create_fake_data(shape=(32, 32))
+    model.meta.filename = "test.asdf"
+    model.save(file_path, all_array_compression="lz4")
+
+    with datamodels.open(file_path, memmap=["data", "err"], readonly=True) as model:
+        assert not _mapped(model.data)
+        assert not model.data.flags.writeable
+        assert model.dq.flags.writeable
+        with pytest.raises(ValueError, match="read-only"):
+            model.data[0, 0] = 1
+
+
+def test_read_meta(tmp_path):
+    file_path = tmp_path / "test.asdf"
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.meta.filename = "test.asdf"
+    model.save(file_path)
+
+    meta = datamodels.read_meta(file_path)
+    with datamodels.open(file_path) as model:
+        assert meta.keys() == model.meta.keys()
+        assert {key: str(value) for key, value in meta.to_flat_dict(recursive=True).items()} == {
+            key: str(value) for key, value in model.meta.to_flat_dict(recursive=True).items()
+        }
+
+    with pytest.raises(TypeError, match="read-only"):
+        meta.filename = "foo.asdf"
+
+    with open(file_path, "rb") as fd:
+        assert datamodels.read_meta(fd).filename == "test.asdf"
+
+
+def test_read_meta_not_roman(tmp_path):
+    file_path = tmp_path / "test.asdf"
+    asdf.AsdfFile({"meta": {}}).write_to(file_path)
+
+    with pytest.raises(ValueError, match="not a roman file"):
+        datamodels.read_meta(file_path)
+
+    asdf.AsdfFile({"roman": {"meta": []}}).write_to(file_path)
+    with pytest.raises(TypeError, match="does not contain roman metadata"):
+        datamodels.read_meta(file_path)
+
+
 @pytest.mark.parametrize("node_class", [node for node in datamodels.MODEL_REGISTRY])
 def test_node_round_trip(tmp_path, node_class):
     file_path = tmp_path / "test.asdf"
@@ -312,3 +411,42 @@ def test_patch_filename(filename, original, expected):
     with ctx:
         _patch_meta_filename(filename, asdf_file)
     assert asdf_file["roman"]["meta"]["filename"] == expected
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_scan_crds_parameters(tmp_path, max_workers):
+    paths = []
+    for index in range(3):
+        paths.append(file_path := tmp_path / f"test{index}.asdf")
+        model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+        model.meta.filename = file_path.name
+        model.meta.exposure.nresultants = index
+        model.save(file_path)
+    paths.append(missing := tmp_path / "missing.asdf")
+
+    results = {result.path: result for result in datamodels.scan_crds_parameters(paths, max_workers=max_workers)}
+    assert results.keys() == set(paths)
+
+    assert results[missing].parameters is None
+    assert results[missing].error.startswith("FileNotFoundError(")
+
+    for index, file_path in enumerate(paths[:-1]):
+        result = results[file_path]
+        assert result.error is None
+        assert result.duration > 0
+        with datamodels.open(file_path) as model:
+            assert result.parameters == model.get_crds_parameters()
+        assert result.parameters["roman.meta.exposure.nresultants"] == index
+
+
+def test_scan_crds_parameters_renamed(tmp_path):
+    file_path = tmp_path / "test.asdf"
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.meta.filename = file_path.name
+    model.save(file_path)
+    file_path = file_path.rename(tmp_path / "renamed.asdf")
+
+    (result,) = datamodels.scan_crds_parameters([file_path], max_workers=1)
+    assert result.parameters["roman.meta.filename"] == "renamed.asdf"
+    with pytest.warns(datamodels.FilenameMismatchWarning), datamodels.open(file_path) as model:
+        assert result.parameters == model.get_crds_parameters()
@@ -55,3 +55,120 @@ def test_to_parquet_validates(catalog_class, tmp_path):
     sc_dm.meta = {}
     with pytest.raises(ValidationError):
         sc_dm.to_parquet(fn)
+
+
+@pytest.mark.parametrize("compression", [None, "snappy", "zstd"])
+def test_to_parquet_row_groups(compression, tmp_path):
+    sc_dm = datamodels.MosaicSourceCatalogModel.create_fake_data()
+    catalog = sc_dm.source_catalog
+    # Fill the catalog (some columns in non-native byte order)
+    filled = astrotab.Table(meta=catalog.meta)
+    for index, name in enumerate(catalog.colnames):
+        data = (np.arange(25) % 7).astype(catalog[name].dtype)
+        filled[name] = data.astype(data.dtype.newbyteorder()) if index % 2 and data.dtype.itemsize > 1 else data
+        filled[name].unit = catalog[name].unit
+    sc_dm.source_catalog = filled
+
+    fn = tmp_path / "foo.parquet"
+    sc_dm.to_parquet(fn, row_group_size=10, compression=compression)
+
+    metadata = pq.read_metadata(fn)
+    assert [metadata.row_group(index).num_rows for index in range(metadata.num_row_groups)] == [10, 10, 5]
+    assert metadata.row_group(0).column(0).compression == (compression or "uncompressed").upper()
+
+    ptab = astrotab.Table.read(fn, format="parquet")
+    assert ptab.colnames == filled.colnames
+    for name in filled.colnames:
+        assert np.all(ptab[name] == filled[name])
+
+
+@pytest.mark.parametrize("catalog_class", CATALOG_CLASSES)
+def test_open_parquet(catalog_class, tmp_path):
+    sc_dm = catalog_class.create_fake_data()
+    catalog = sc_dm.source_catalog
+    filled = astrotab.Table(meta={"a": 1})
+    for name in catalog.colnames:
+        filled[name] = (np.arange(25) % 7).astype(catalog[name].dtype)
+        filled[name].unit = catalog[name].unit
+    sc_dm.source_catalog = filled
+
+    fn = tmp_path / "foo.parquet"
+    sc_dm.to_parquet(fn, row_group_size=10)
+
+    model = datamodels.open(fn)
+    assert type(model) is catalog_class
+    # Only the footer has been read
+    assert not model._instance._data["source_catalog"].materialized
+
+    # The metadata round trips (except the filename and date updated on saving)
+    assert model.meta.filename == fn.name
+    assert isinstance(model.meta.file_date, type(sc_dm.meta.file_date))
+    flat_meta = model.meta.to_flat_dict(recursive=True)
+    expected = sc_dm.meta.to_flat_dict(recursive=True)
+    for key in ("filename", "file_date"):
+        del flat_meta[key], expected[key]
+    assert flat_meta == expected
+
+    assert model.source_catalog.colnames == filled.colnames
+    assert model.source_catalog.meta == filled.meta
+    for name in filled.colnames:
+        assert model.source_catalog[name].unit == filled[name].unit
+        assert np.all(model.source_catalog[name] == filled[name])
+    model.validate()
+
+
+@pytest.mark.parametrize("catalog_class", CATALOG_CLASSES)
+def test_open_parquet_to_asdf(catalog_class, tmp_path):
+    sc_dm = catalog_class.create_fake_data()
+    catalog = sc_dm.source_catalog
+    filled = astrotab.Table()
+    for name in catalog.colnames:
+        filled[name] = (np.arange(25) % 7).astype(catalog[name].dtype)
+        filled[name].unit = catalog[name].unit
+    sc_dm.source_catalog = filled
+    sc_dm.to_parquet(tmp_path / "foo.parquet")
+
+    # The (not yet read) table of a catalog opened from Parquet is written to ASDF
+    model = datamodels.open(tmp_path / "foo.parquet")
+    assert not model._instance._data["source_catalog"].materialized
+    model.to_asdf(tmp_path / "foo.asdf")
+
+    with datamodels.open(tmp_path / "foo.asdf") as asdf_model:
+        assert type(asdf_model) is catalog_class
+        assert asdf_model.meta.telescope == sc_dm.meta.telescope
+        assert asdf_model.source_catalog.colnames == filled.colnames
+        for name in filled.colnames:
+            # (the fake units which astropy does not recognize are read back as generic units)
+            assert str(asdf_model.source_catalog[name].unit) == str(filled[name].unit)
+            assert np.all(asdf_model.source_catalog[name] == filled[name])
+
+
+def test_open_parquet_columns_filters(tmp_path):
+    sc_dm = datamodels.MosaicSourceCatalogModel.create_fake_data()
+    catalog = sc_dm.source_catalog
+    filled = astrotab.Table()
+    for name in catalog.colnames:
+        filled[name] = np.arange(25).astype(catalog[name].dtype)
+    sc_dm.source_catalog = filled
+
+    fn = tmp_path / "foo.parquet"
+    sc_dm.to_parquet(fn, row_group_size=10)
+
+    name_a, name_b = catalog.colnames[:2]
+    model = datamodels.open(fn, columns=[name_a, name_b], filters=[(name_a, ">=", 20)])
+    assert model.source_catalog.colnames == [name_a, name_b]
+    assert np.all(model.source_catalog[name_a] == np.arange(20, 25))
+
+    # The arguments for asdf are rejected
+    with pytest.raises(TypeError, match="got: lazy_tree, mode"):
+        datamodels.open(fn, lazy_tree=False, mode="rw")
+
+
+def test_open_parquet_filename_mismatch(tmp_path):
+    sc_dm = datamodels.MosaicSourceCatalogModel.create_fake_data()
+    sc_dm.to_parquet(tmp_path / "foo.parquet")
+    (tmp_path / "foo.parquet").rename(tmp_path / "bar.parquet")
+
+    with pytest.warns(datamodels.FilenameMismatchWarning):
+        model = datamodels.open(tmp_path / "bar.parquet")
+    assert model.meta.filename == "bar.parquet"
@@ -1,10 +1,14 @@
+import copy
 from contextlib import nullcontext
 
 import asdf
+import numpy as np
 import pytest
 
 from roman_datamodels import _stnode as stnode
 from roman_datamodels import datamodels
+from roman_datamodels._stnode._compression import COMPRESSION_EXTENSION_URI, PARALLEL_LZ4
+from roman_datamodels._stnode._integration import get_extensions
 from roman_datamodels.testing import assert_node_equal, assert_node_is_copy, wraps_hashable
 
 from .conftest import MANIFESTS
@@ -32,6 +36,49 @@ def test_node_classes_available_via_stnode(node_class):
     assert hasattr(stnode, node_class.__name__)
 
 
+@pytest.mark.parametrize("manifest", MANIFESTS)
+def test_node_extensions(manifest):
+    """NODE_EXTENSIONS creates the same extension as loading the manifest through asdf."""
+    manifest_uri = manifest["id"]
+    extension = asdf.extension.ManifestExtension.from_uri(manifest_uri)
+    node_extension = stnode.NODE_EXTENSIONS[manifest_uri]
+
+    assert node_extension is stnode.NODE_EXTENSIONS[manifest_uri]
+    assert node_extension.extension_uri == stnode.NODE_EXTENSIONS.extension_uri(manifest_uri) == extension.extension_uri
+    assert node_extension.asdf_standard_requirement == extension.asdf_standard_requirement
+    assert [tag.tag_uri for tag in node_extension.tags] == [tag.tag_uri for tag in extension.tags]
+
+
+def test_node_extensions_lazy():
+    """Extensions are only created when they are asked for."""
+    node_extensions = stnode._stnode._NodeExtensions(MANIFESTS)
+    assert list(node_extensions) == list(stnode.NODE_EXTENSIONS)
+    assert not node_extensions._extensions
+
+    assert [node_extensions.extension_uri(uri) for uri in node_extensions] == [
+        manifest["extension_uri"] for manifest in MANIFESTS
+    ]
+    assert not node_extensions._extensions
+
+    manifest_uri = MANIFESTS[-1]["id"]
+    node_extensions[manifest_uri]
+    assert list(node_extensions._extensions) == [manifest_uri]
+
+
+def test_get_extensions():
+    """The proxies handed to asdf behave like the extensions they stand in for."""
+    *proxies, compression = get_extensions()
+    assert len(proxies) == len(stnode.NODE_EXTENSIONS)
+    assert compression.extension_uri == COMPRESSION_EXTENSION_URI
+    assert [compressor.label for compressor in compression.compressors] == [PARALLEL_LZ4.encode()]
+
+    for proxy, extension in zip(proxies, stnode.NODE_EXTENSIONS.values(), strict=True):
+        assert proxy.extension_uri == extension.extension_uri
+        assert proxy.asdf_standard_requirement == extension.asdf_standard_requirement
+        assert [tag.tag_uri for tag in proxy.tags] == [tag.tag_uri for tag in extension.tags]
+        assert proxy.converters is extension.converters
+
+
 @pytest.mark.parametrize("node_class", stnode.NODE_CLASSES)
 def test_copy(node_class):
     """Demonstrate nodes can copy themselves, but don't always deepcopy."""
@@ -215,30 +262,45 @@ def test_get_latest_schema(object_node, object_node_default_uri, object_node_uri
         assert stnode._schema._get_schema_from_tag(object_node._default_tag) == schema
 
 
+def test_get_schema_uris(object_node_default_uri, object_node_uris):
+    uris = stnode.get_schema_uris(object_node_default_uri)
+
+    assert sorted(uris) == sorted(object_node_uris)
+    assert uris[-1] == object_node_default_uri
+    assert stnode.get_schema_uris(object_node_default_uri.rsplit("-", 1)[0]) == uris
+
+
+def test_get_schema_uris_missing():
+    assert stnode.get_schema_uris("asdf://stsci.edu/datamodels/roman/schemas/not_a_schema-1.0.0") == []
+
+    with pytest.raises(ValueError, match=r"No schema found"):
+        stnode.get_latest_schema("asdf://stsci.edu/datamodels/roman/schemas/not_a_schema")
+
+
 @pytest.mark.parametrize(
     "set_method, value, getattr_type, getitem_type",
     [
-        ("__setattr__", {}, stnode.DNode, dict),
-        ("__setattr__", stnode.DNode({}), stnode.DNode, dict),
-        ("__setitem__", {}, stnode.DNode, dict),
+        ("__setattr__", {}, stnode.DNode, stnode.DNode),
+        ("__setattr__", stnode.DNode({}), stnode.DNode, stnode.DNode),
+        ("__setitem__", {}, stnode.DNode, stnode.DNode),
         ("__setitem__", stnode.DNode({}), stnode.DNode, stnode.DNode),
-        ("__setattr__", [], stnode.LNode, list),
-        ("__setattr__", stnode.LNode([]), stnode.LNode, list),
-        ("__setitem__", [], stnode.LNode, list),
+        ("__setattr__", [], stnode.LNode, stnode.LNode),
+        ("__setattr__", stnode.LNode([]), stnode.LNode, stnode.LNode),
+        ("__setitem__", [], stnode.LNode, stnode.LNode),
         ("__setitem__", stnode.LNode([]), stnode.LNode, stnode.LNode),
     ],
 )
 def test_dnode_unwrapping(set_method, value, getattr_type, getitem_type):
     """
-    Test DNode wraps and unwraps for set/getattr but not for set/getitem
+    Test DNode wraps and unwraps for set/getattr and set/getitem
     """
     node = stnode.DNode()
     key = "a"
     getattr(node, set_method)(key, value)
     assert type(getattr(node, key)) is getattr_type
     assert type(node[key]) is getitem_type
-    if set_method == "__setattr__":
-        assert getattr(node, key) is not value
+    assert getattr(node, key) is not value
+    assert node[key] is getattr(node, key)
 
 
 @pytest.mark.parametrize(
@@ -258,3 +320,114 @@ def test_lnode_unwrapping(value, return_type):
     node[0] = value
     assert type(node[0]) is return_type
     assert node[0] is not value
+
+
+def test_read_only_dnode():
+    node = stnode.ReadOnlyDNode({"a": {"b": [1, {"c": 2}]}, "d": np.zeros(3)})
+
+    assert type(node.a) is stnode.ReadOnlyDNode
+    assert node.a.b == (1, stnode.ReadOnlyDNode({"c": 2}))
+    assert node["a"]["b"][1].c == 2
+    assert not node.d.flags.writeable
+    assert node.to_flat_dict(recursive=True)["a.b.1.c"] == 2
+
+    for modify in (
+        lambda: setattr(node, "a", 1),
+        lambda: node.__setitem__("a", 1),
+        lambda: delattr(node, "a"),
+        lambda: node.__delitem__("a"),
+        lambda: setattr(node.a, "b", 1),
+    ):
+        with pytest.raises(TypeError, match="read-only"):
+            modify()
+
+
+def test_recursive_items():
+    node = stnode.DNode({"a": {"b": [1, {"c": 2}], "d": None, "e": {}}, "f": 3})
+
+    assert list(node._recursive_items()) == [("a.b.0", 1), ("a.b.1.c", 2), ("f", 3)]
+    assert list(node._recursive_items(prefix="a.b")) == [("a.b.0", 1), ("a.b.1.c", 2)]
+    assert list(node._recursive_items(prefix="a.b.1.c")) == [("a.b.1.c", 2)]
+    assert list(node._recursive_items(prefix="a.x")) == []
+    assert list(node._recursive_items(prefix="a.b.x")) == []
+    assert list(node._recursive_items(max_depth=2)) == [("a.b", [1, {"c": 2}]), ("a.e", {}), ("f", 3)]
+    assert list(node._recursive_items(prefix="a", max_depth=2)) == [("a.b", [1, {"c": 2}]), ("a.e", {})]
+
+    assert node.to_flat_dict(recursive=True, prefix="a.b") == {"a.b.0": 1, "a.b.1.c": 2}
+
+
+def test_dnode_wrapper_reuse():
+    node = stnode.DNode({"a": {"b": {"c": 1}}, "d": [1, 2]})
+
+    # The wrappers are the same objects on every access
+    assert node.a is node.a
+    assert node.a.b is node.a.b
+    assert node.d is node.d
+
+    # Until the child is replaced, by any means
+    wrapper = node.a
+    node.a = {"b": {"c": 2}}
+    assert node.a is not wrapper
+    assert node.a.b.c == 2
+
+    wrapper = node.a
+    node["a"] = {"b": {"c": 3}}
+    assert node.a is not wrapper
+    assert node.a.b.c == 3
+
+    wrapper = node.a
+    node._data["a"] = {"b": {"c": 4}}
+    assert node.a is not wrapper
+    assert node.a.b.c == 4
+
+    # Copies have their own wrappers, except for the children shared by shallow copies
+    copied = copy.deepcopy(node)
+    assert copied.a is not node.a
+    assert copied.a._data is copied._data["a"]
+    assert node.copy().a is node.a
+
+
+@pytest.mark.parametrize("items", [[1, 2, 3], [1.0, 2.5, 3.0], ["a", "b", "a"]])
+def test_compact_list(items):
+    compact = stnode.CompactList(items)
+    assert compact._type is type(items[0])
+    assert compact == items
+    assert items == compact
+    assert compact[1] == items[1]
+    assert compact[-1:] == items[-1:]
+
+    compact.append(items[0])
+    compact.insert(0, items[1])
+    compact[1] = items[2]
+    del compact[2]
+    expected = [items[1], items[2], *items[2:], items[0]]
+    assert compact == expected
+    assert compact._type is type(items[0])
+
+    # Items of another type fall back on list storage
+    compact.append(None)
+    assert compact._type is None
+    assert compact == [*expected, None]
+
+    assert copy.deepcopy(compact) == compact
+    assert stnode.LNode(compact)[0] == items[1]
+
+
+def test_compact_lists(tmp_path):
+    model = datamodels.ImageModel.create_fake_data(shape=(8, 8))
+    model.meta.cal_logs = stnode.CalLogs([f"step {index % 4}" for index in range(100)])
+    model.meta["extra"] = {"floats": [float(index) for index in range(100)], "short": [1, 2], "mixed": [1, "a"] * 50}
+
+    assert stnode.compact_lists(model._instance) == 2
+    assert isinstance(model.meta.cal_logs.data, stnode.CompactList)
+    assert isinstance(model.meta["extra"]._data["floats"], stnode.CompactList)
+    assert type(model.meta["extra"]._data["short"]) is list
+    assert type(model.meta["extra"]._data["mixed"]) is list
+    assert model.meta.extra.floats[10] == 10.0
+    assert type(model.meta.extra.floats) is stnode.LNode
+
+    file_path = tmp_path / "test.asdf"
+    model.save(file_path)
+    with datamodels.open(file_path) as new_model:
+        assert list(new_model.meta.cal_logs) == list(model.meta.cal_logs)
+        assert list(new_model.meta["extra"]["floats"]) == [float(index) for index in range(100)]